@@ -0,0 +1,25 @@
+import argparse
+import logging
+import os
+
+from core.data import SHARED_DATA_DIR, data_engine
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Build the memory-mappable serving snapshot that the API attaches to when SHARED_DATA_DIR is set."
+    )
+    parser.add_argument("--out", default=SHARED_DATA_DIR, help="Snapshot root directory (default: $SHARED_DATA_DIR)")
+    parser.add_argument("--force", action="store_true", help="Build a new version even if the current one matches the sources")
+    args = parser.parse_args()
+    if not args.out:
+        parser.error("--out is required when SHARED_DATA_DIR is not set")
+
+    version = data_engine.publish_snapshot(args.out, force=args.force)
+    print(f"Current snapshot: {os.path.join(args.out, version)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from core.shared_store import PackedBytes
+
+# Combining accents left after NFKD decomposition ("é" -> "e" + U+0301), as Python and RE2 (pyarrow) patterns
+_COMBINING = "[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]"
+_COMBINING_RE2 = "[\\x{0300}-\\x{036f}\\x{1ab0}-\\x{1aff}\\x{1dc0}-\\x{1dff}\\x{20d0}-\\x{20ff}\\x{fe20}-\\x{fe2f}]"
+# Most suggestions one lookup returns (the autocomplete endpoint's limit bound)
+MAX_SUGGESTIONS = 50
+# Short prefixes match a large share of the catalog; their top MAX_SUGGESTIONS are kept once computed
+_MEMO_PREFIX_LENGTH = 2
+# Typo fallback: a title word matches a query word sharing at least this share of its trigrams
+_TRIGRAM_MIN_SHARE = 0.5
+_FUZZY_WORDS_PER_TERM = 8
+_FUZZY_TITLES_PER_WORD = 256
+
+
+def fold(text: str) -> str:
+    """Case- and accent-folded text with punctuation collapsed to single spaces ("Amélie!" -> "amelie")."""
+    text = re.sub(_COMBINING, "", unicodedata.normalize("NFKD", text))
+    return re.sub(r"[\W_]+", " ", text.lower()).strip()
+
+
+def fold_array(titles: pd.Series) -> pa.Array:
+    """`fold` for a whole column, vectorized with pyarrow compute."""
+    folded = pa.array(titles.astype(object).where(titles.notna(), ""), type=pa.string())
+    folded = pc.replace_substring_regex(pc.utf8_normalize(folded, "NFKD"), _COMBINING_RE2, "")
+    return pc.utf8_trim_whitespace(pc.replace_substring_regex(pc.utf8_lower(folded), r"[^\pL\pN]+", " "))
+
+
+def trigrams(word: str) -> set[str]:
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleIndex:
+    """
+    In-memory lexical index over movie titles for search-as-you-type.
+
+    Titles are folded and numbered in popularity order (rank 0 = most
+    popular). Every word start of a title is a key, sorted by the text that
+    follows it, so a prefix such as "incep" or "godf" is two binary searches
+    over the keys. When prefixes find too little, query words are matched to
+    title words by trigram overlap, which tolerates typos. Results are
+    metadata row positions, most popular first.
+    """
+
+    def __init__(self, titles: pd.Series | None = None, order: np.ndarray | None = None):
+        self._memo: dict[str, np.ndarray] = {}
+        if titles is None:  # filled in by from_arrays
+            return
+        self.positions = np.asarray(order, dtype=np.int64)  # rank -> metadata row position
+        folded = fold_array(titles.reset_index(drop=True).iloc[self.positions])
+        self.titles = folded.to_pylist()
+
+        # One key per word start: offset = lengths of the preceding words plus one space each
+        split = pc.split_pattern(folded, " ")
+        words = pc.list_flatten(split)
+        nonempty = pc.not_equal(words, "")
+        key_ranks = pc.list_parent_indices(split).filter(nonempty).to_numpy().astype(np.int64)
+        words = words.filter(nonempty)
+        lengths = pc.utf8_length(words).to_numpy().astype(np.int64) + 1
+        ends = np.cumsum(lengths)
+        row_start = np.searchsorted(key_ranks, key_ranks)  # first word of each title
+        key_offsets = ends - lengths - (ends[row_start] - lengths[row_start])
+        suffixes = [self.titles[r][o:] for r, o in zip(key_ranks.tolist(), key_offsets.tolist())]
+        keys = sorted(range(len(suffixes)), key=suffixes.__getitem__)
+        self.key_ranks = key_ranks[keys].astype(np.int32)
+        self.key_offsets = key_offsets[keys].astype(np.int32)
+
+        # Numbers and one- or two-letter words are left to prefix matching
+        vocabulary = pc.unique(words)
+        keep = pc.and_(pc.greater_equal(pc.utf8_length(vocabulary), 3), pc.invert(pc.utf8_is_digit(vocabulary)))
+        self.vocabulary = vocabulary.filter(keep).to_pylist()
+        postings: dict[str, list[int]] = {}
+        for i, word in enumerate(self.vocabulary):
+            for gram in trigrams(word):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Plain arrays for a serving snapshot; `from_arrays` restores them without re-sorting the keys."""
+        grams = list(self.postings)
+        lengths = np.fromiter((len(self.postings[g]) for g in grams), dtype=np.int64, count=len(grams))
+        posting_offsets = np.zeros(len(grams) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=posting_offsets[1:])
+        return {
+            "positions": self.positions,
+            "key_ranks": self.key_ranks,
+            "key_offsets": self.key_offsets,
+            **PackedBytes.from_strings(self.titles).to_arrays("titles"),
+            **PackedBytes.from_strings(self.vocabulary).to_arrays("vocabulary"),
+            **PackedBytes.from_strings(grams).to_arrays("grams"),
+            "posting_offsets": posting_offsets,
+            "posting_ids": np.concatenate([self.postings[g] for g in grams]) if grams else np.zeros(0, dtype=np.int32),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "TitleIndex":
+        index = cls()
+        index.positions = arrays["positions"]
+        index.key_ranks = arrays["key_ranks"]
+        index.key_offsets = arrays["key_offsets"]
+        index.titles = PackedBytes.from_arrays(arrays, "titles").to_strings()
+        index.vocabulary = PackedBytes.from_arrays(arrays, "vocabulary").to_strings()
+        offsets, ids = arrays["posting_offsets"], arrays["posting_ids"]
+        grams = PackedBytes.from_arrays(arrays, "grams").to_strings()
+        index.postings = {gram: ids[offsets[i]:offsets[i + 1]] for i, gram in enumerate(grams)}
+        return index
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def search(self, query: str, limit: int = 10) -> np.ndarray:
+        """Metadata row positions of titles matching `query`, prefix matches first, by popularity."""
+        folded = fold(query)
+        if not folded or limit <= 0:
+            return np.empty(0, dtype=np.int64)
+        ranks = self._prefix_ranks(folded, limit)
+        if len(ranks) < limit:
+            extra = self._fuzzy_ranks(folded, limit)
+            ranks = np.concatenate([ranks, extra[~np.isin(extra, ranks)]])[:limit]
+        return self.positions[ranks]
+
+    def _key_range(self, prefix: str) -> np.ndarray:
+        width = len(prefix)
+        key = lambda i: self.titles[self.key_ranks[i]][self.key_offsets[i]:self.key_offsets[i] + width]
+        keys = range(len(self.key_ranks))
+        lo = bisect_left(keys, prefix, key=key)
+        return self.key_ranks[lo:bisect_right(keys, prefix, lo=lo, key=key)]
+
+    @staticmethod
+    def _most_popular(ranks: np.ndarray, limit: int) -> np.ndarray:
+        # Smallest ranks are the most popular; over-take so titles matching twice still leave `limit`
+        if len(ranks) > limit * 4:
+            ranks = np.partition(ranks, limit * 4)[:limit * 4]
+        return np.unique(ranks)[:limit].astype(np.int64)
+
+    def _prefix_ranks(self, folded: str, limit: int) -> np.ndarray:
+        if len(folded) > _MEMO_PREFIX_LENGTH or limit > MAX_SUGGESTIONS:
+            return self._most_popular(self._key_range(folded), limit)
+        # Keyed on the prefix alone so every limit shares one entry
+        ranks = self._memo.get(folded)
+        if ranks is None:
+            ranks = self._memo[folded] = self._most_popular(self._key_range(folded), MAX_SUGGESTIONS)
+        return ranks[:limit]
+
+    def _similar_words(self, term: str) -> list[str]:
+        grams = trigrams(term)
+        lists = [self.postings[g] for g in grams if g in self.postings]
+        if not lists:
+            return []
+        ids, shared = np.unique(np.concatenate(lists), return_counts=True)
+        keep = shared >= np.ceil(len(grams) * _TRIGRAM_MIN_SHARE)
+        best = np.argsort(-shared[keep], kind="stable")[:_FUZZY_WORDS_PER_TERM]
+        return [self.vocabulary[i] for i in ids[keep][best]]
+
+    def _fuzzy_ranks(self, folded: str, limit: int) -> np.ndarray:
+        """Titles containing words similar to the query's words; more matched query words first."""
+        matched = []
+        for term in folded.split(" "):
+            term_ranks = [
+                self._most_popular(self._key_range(word), _FUZZY_TITLES_PER_WORD)
+                for word in self._similar_words(term)
+            ]
+            if term_ranks:
+                matched.append(np.unique(np.concatenate(term_ranks)))
+        if not matched:
+            return np.empty(0, dtype=np.int64)
+        ranks, terms = np.unique(np.concatenate(matched), return_counts=True)
+        order = np.lexsort((ranks, -terms))[:limit]
+        return ranks[order].astype(np.int64)
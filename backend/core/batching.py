@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item calls into batched calls.
+
+    `process_batch` receives a list of items and must return one result per
+    item, in order. A background worker takes the first waiting item, then keeps
+    collecting for up to `max_wait_ms` or until `max_batch_size` items are
+    queued, and runs them together. Requests that arrive while a batch is
+    running simply form the next batch, so the added latency stays bounded by
+    `max_wait_ms`. With `max_batch_size <= 1` calls run inline on the caller's
+    thread.
+
+    If `executor` is given (anything with a `submit(fn, *args)` method that
+    returns a future), each batch runs on it instead of on the worker thread,
+    e.g. so model inference is accounted to its own pool. The worker still
+    waits for that batch before collecting the next one: one batch is in
+    flight at a time and the pool never sees more than that from here.
+    Back-pressure belongs where requests are admitted (the executor that
+    calls `run`), not on individual micro-batches.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[list], list],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: str = "batcher",
+        executor=None,
+    ):
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max(max_wait_ms, 0.0) / 1000.0
+        self.name = name
+        self.executor = executor
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        if self.max_batch_size > 1:
+            with self._lock:
+                if not self._closed:
+                    self._ensure_worker()
+                    self._queue.put((item, future))
+                    return future
+        self._run([(item, future)])
+        return future
+
+    def run(self, item: Any) -> Any:
+        """Submits one item and blocks until its result is ready."""
+        return self.submit(item).result()
+
+    def close(self) -> None:
+        # Items already queued are still processed; later submits run inline instead of restarting the worker
+        with self._lock:
+            self._closed = True
+            worker = self._worker
+            self._worker = None
+        if worker is not None:
+            self._queue.put(_STOP)
+            worker.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    def _ensure_worker(self) -> None:
+        # Called with self._lock held
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._loop, name=self.name, daemon=True)
+            self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+            self._dispatch(batch)
+            if stop:
+                return
+
+    def _dispatch(self, batch: list) -> None:
+        if self.executor is None:
+            self._run(batch)
+            return
+        try:
+            done = self.executor.submit(self._run, batch)
+        except Exception as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        # Requests arriving meanwhile queue up and form the next batch
+        done.result()
+
+    def _run(self, batch: list) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: process_batch returned {len(results)} results for {len(items)} items")
+        except Exception as exc:
+            logger.exception("%s: batch of %s failed", self.name, len(items))
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.items += len(items)
+            self.largest_batch = max(self.largest_batch, len(items))
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
@@ -1,12 +1,45 @@
 import pandas as pd
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
+import gc
+import json
 import os
+import threading
 import time
 import logging
 from typing import Optional
 
+from core.autocomplete import TitleIndex
+from core.batching import MicroBatcher
+from core.embedding_cache import QueryEmbeddingCache
+from core.encoder import load_encoder
+from core.executors import embedding_executor
+from core.filters import AttributeFilters
+from core.frustum import ViewCone
+from core.http_cache import EncodedBody, ResponseCache, encode_body
+from core.metadata_store import HeavyColumns, load_metadata, process_rss_bytes
+from core.neighbors import NeighborGraph, build_id_to_row, rows_for_ids
+from core.rankings import build_rankings
+from core.shared_store import (
+    PackedBytes,
+    current_version,
+    link_or_copy,
+    new_version,
+    publish_lock,
+    read_array,
+    read_frame,
+    read_index_mmap,
+    read_manifest,
+    set_current_version,
+    source_fingerprint,
+    write_array,
+    write_frame,
+    write_manifest,
+)
+from core.spatial import SpatialGrid
+from core.tiles import GalaxyTiles
+from core.wire import STAR_MEDIA_TYPE, StarBuffers
+
 logger = logging.getLogger(__name__)
 
 # Absolute paths based on project structure
@@ -17,68 +50,183 @@ METADATA_PATH = os.path.join(DATA_DEV_DIR, "metadata.parquet")
 FAISS_INDEX_PATH = os.path.join(DATA_DEV_DIR, "faiss_index.faiss")
 EMBEDDINGS_PATH = os.path.join(DATA_DEV_DIR, "embeddings.npy")
 GALAXY_COORDS_PATH = os.path.join(DATA_DEV_DIR, "galaxy_coords.parquet")
+GALAXY_TILES_PATH = os.path.join(DATA_DEV_DIR, "galaxy_tiles.npz")
+NEIGHBOR_GRAPH_PATH = os.path.join(DATA_DEV_DIR, "neighbor_graph.npz")
+
+# Set SHARED_DATA_DIR (e.g. /dev/shm/movie-galaxy) to serve from a prebuilt snapshot (backend/build_snapshot.py):
+# every file is memory-mapped, so startup skips parquet decoding and several uvicorn workers share one copy.
+# A missing or stale snapshot is built by the first worker to start.
+SHARED_DATA_DIR = os.getenv("SHARED_DATA_DIR") or None
+
+# Poll the data files every N seconds and hot-reload when they change (0 disables; see EngineHandle)
+RELOAD_WATCH_SECONDS = float(os.getenv("RELOAD_WATCH_SECONDS", "0"))
+
+# Load the SentenceTransformer in the background at startup instead of on the first semantic search
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") not in ("0", "false", "False")
+
+# Query encoder: "torch" (reference) or "onnx" (ONNX Runtime, see backend/export_encoder.py).
+# QUERY_ENCODER_MODEL points at an exported model directory, QUERY_ENCODER_FILE picks the file in it
+# (e.g. onnx/model_qint8_avx512_vnni.onnx for the int8 export).
+QUERY_ENCODER_BACKEND = os.getenv("QUERY_ENCODER_BACKEND", "torch")
+QUERY_ENCODER_MODEL = os.getenv("QUERY_ENCODER_MODEL") or "nomic-ai/nomic-embed-text-v1.5"
+QUERY_ENCODER_FILE = os.getenv("QUERY_ENCODER_FILE") or None
+
+# Query embedding cache; set QUERY_CACHE_PATH (e.g. data_dev/query_cache.npz) to keep it warm across restarts
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH") or None
+
+# Runtime knobs for approximate indexes (ignored by indexes without IVF lists / an HNSW graph)
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "0")) or None
+FAISS_EF_SEARCH = int(os.getenv("FAISS_EF_SEARCH", "0")) or None
+
+# Re-score this many index candidates against the full-precision embeddings (0 disables). Pair with
+# a truncated (--dims) or quantized (flat-sq8, ivf-sq8, ivf-pq) index to win back most of their recall.
+SEARCH_RERANK = int(os.getenv("SEARCH_RERANK", "0"))
+
+# Micro-batching of concurrent semantic searches; SEARCH_BATCH_MAX_SIZE=1 disables it
+SEARCH_BATCH_MAX_SIZE = int(os.getenv("SEARCH_BATCH_MAX_SIZE", "32"))
+SEARCH_BATCH_WAIT_MS = float(os.getenv("SEARCH_BATCH_WAIT_MS", "2"))
+
+GALAXY_STAR_COLUMNS = ['vector_id', 'x', 'y', 'z', 'title', 'vote_average', 'genres']
+
+# Camera-view queries load a tile's finer level once the tile covers this share of the view height
+GALAXY_VIEW_DETAIL = float(os.getenv("GALAXY_VIEW_DETAIL", "0.125"))
+
+# Ranking entries whose records are serialized at load; deeper pages are materialized per request
+RANKING_PRECOMPUTE = int(os.getenv("RANKING_PRECOMPUTE", "200"))
+
+# Whole-galaxy limits the clients request (mobile / tablet / desktop); only these responses are cached
+GALAXY_CACHED_LIMITS = {int(limit) for limit in os.getenv("GALAXY_CACHED_LIMITS", "3000,8000,20000").split(",")}
+
+# Memory for encoded + compressed responses that are fixed for a snapshot (galaxy, rankings, movie details)
+RESPONSE_CACHE_BYTES = int(float(os.getenv("RESPONSE_CACHE_MB", "256")) * 1024 * 1024)
+
+# Fields the movie card UI needs (rows, search grid, dropdown); "full" projections return every column
+CARD_COLUMNS = [
+    'vector_id', 'id', 'title', 'poster_path', 'release_date', 'year',
+    'vote_average', 'popularity', 'genres',
+]
+
+
+def current_sources() -> dict[str, dict] | None:
+    """Fingerprint of the data files a snapshot is built from, including the optional LOD tiles and neighbor graph."""
+    return source_fingerprint(
+        {
+            "metadata": METADATA_PATH,
+            "faiss_index": FAISS_INDEX_PATH,
+            "embeddings": EMBEDDINGS_PATH,
+            "galaxy_coords": GALAXY_COORDS_PATH,
+        },
+        optional={"galaxy_tiles": GALAXY_TILES_PATH, "neighbor_graph": NEIGHBOR_GRAPH_PATH},
+    )
 
 
 class DataEngine:
     def __init__(self):
-        self.metadata_df = None
+        self.metadata_df = None  # Hot columns only, compact dtypes
+        self.heavy_columns: Optional[HeavyColumns] = None  # overview/cast/writers, read from disk on demand
+        self.metadata_columns: list[str] = []  # Column order of full records
         self.faiss_index = None
         self.embeddings = None
+        self.search_rerank = SEARCH_RERANK
         self.model = None
-        self.model_name = "nomic-ai/nomic-embed-text-v1.5"
+        self.model_name = QUERY_ENCODER_MODEL
+        self.encoder_backend = QUERY_ENCODER_BACKEND
+        self.model_error: Optional[str] = None
+        self._model_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self.query_cache = QueryEmbeddingCache(max_size=QUERY_CACHE_SIZE, persist_path=QUERY_CACHE_PATH)
+        self.encode_batcher = MicroBatcher(
+            self._encode_batch,
+            SEARCH_BATCH_MAX_SIZE,
+            SEARCH_BATCH_WAIT_MS,
+            name="encode-batcher",
+            executor=embedding_executor,
+        )
+        self.search_batcher = MicroBatcher(
+            self._search_batch, SEARCH_BATCH_MAX_SIZE, SEARCH_BATCH_WAIT_MS, name="search-batcher"
+        )
+        self.attribute_filters: Optional[AttributeFilters] = None  # genre/year/rating/language masks
+        self.rankings: dict[str, np.ndarray] = {}  # ranking name -> metadata row positions in order
+        self._ranking_json: dict[tuple[str, str], PackedBytes] = {}  # (ranking, fields) -> encoded head records
+        self.title_index: Optional[TitleIndex] = None  # Folded titles for search-as-you-type
         self.galaxy_df = None       # Raw galaxy_coords.parquet
         self.galaxy_full = None     # Pre-joined with titles for fast serving
+        self.galaxy_serving = None  # galaxy_full star columns, cleaned once for JSON
+        self.star_buffers: Optional[StarBuffers] = None   # galaxy_serving packed for format=binary
+        self.spatial_index: Optional[SpatialGrid] = None  # Grid over galaxy_full x/y/z
+        self.galaxy_tiles: Optional[GalaxyTiles] = None   # Precomputed octree LOD tiles
+        self.galaxy_tiles_path: Optional[str] = None
+        self.galaxy_row_of: Optional[np.ndarray] = None  # vector_id -> galaxy_full row position (-1 if not a star)
+        self.neighbor_graph: Optional[NeighborGraph] = None  # Precomputed top-k neighbors per star
+        self.neighbor_graph_path: Optional[str] = None
+        self._tile_payloads: dict[tuple[int, int, int, int, str], bytes] = {}
+        self.response_cache = ResponseCache(RESPONSE_CACHE_BYTES)  # Encoded responses for this snapshot
+        self.data_version: Optional[str] = None  # Snapshot version being served, None when loaded from sources
         self.ready = False
         self.load_error: Optional[str] = None
 
-    def load_all(self, strict: bool = True):
+    def load_all(self, strict: bool = True, validate: bool = False):
+        """
+        Loads every serving structure. With `validate`, row-count mismatches
+        between metadata, the FAISS index, embeddings and galaxy stars are
+        errors instead of warnings (used before swapping in a reload).
+        """
         logger.info("Initializing Data Engine...")
         start_time = time.time()
         self.ready = False
         self.load_error = None
 
         try:
-            # 1. Load Metadata
-            logger.info(f"Loading metadata from {METADATA_PATH}")
-            self.metadata_df = pd.read_parquet(METADATA_PATH)
-
-            if "vector_id" not in self.metadata_df.columns:
-                logger.warning("metadata.parquet has no vector_id column; creating sequential vector_id values.")
-                self.metadata_df = self.metadata_df.reset_index(drop=True)
-                self.metadata_df["vector_id"] = self.metadata_df.index.astype(int)
-            self.metadata_df.set_index("vector_id", drop=False, inplace=True)
-
-            # 2. Load FAISS Index
-            logger.info(f"Loading FAISS index from {FAISS_INDEX_PATH}")
-            self.faiss_index = faiss.read_index(FAISS_INDEX_PATH)
-
-            # 3. Load Embeddings (Memory Mapped)
-            logger.info(f"Loading embeddings from {EMBEDDINGS_PATH} (mmap_mode='r')")
-            self.embeddings = np.load(EMBEDDINGS_PATH, mmap_mode="r")
-
-            if self.faiss_index.ntotal != len(self.metadata_df):
-                logger.warning(
-                    "FAISS index row count (%s) does not match metadata row count (%s).",
-                    self.faiss_index.ntotal,
-                    len(self.metadata_df),
-                )
-            if len(self.embeddings) != len(self.metadata_df):
-                logger.warning(
-                    "Embeddings row count (%s) does not match metadata row count (%s).",
-                    len(self.embeddings),
-                    len(self.metadata_df),
-                )
+            if SHARED_DATA_DIR:
+                self._attach_snapshot(os.path.join(SHARED_DATA_DIR, self.publish_snapshot(SHARED_DATA_DIR)))
+            else:
+                self._load_sources()
+                self.data_version = None
+
+            logger.info("FAISS index: %s", self.index_info())
+            for problem in self._row_count_problems():
+                if validate:
+                    raise ValueError(problem)
+                logger.warning(problem)
+
+            self._build_derived()
 
-            # 4. Load Galaxy Coordinates (20k UMAP 3D positions)
-            logger.info(f"Loading galaxy coordinates from {GALAXY_COORDS_PATH}")
-            self.galaxy_df = pd.read_parquet(GALAXY_COORDS_PATH)  # columns: vector_id, x, y, z
+            # Spatial index so region/neighbor queries only touch nearby cells
+            self.spatial_index = SpatialGrid(self.galaxy_full[["x", "y", "z"]].to_numpy())
+            logger.info(
+                "Built spatial grid over %s stars (%s^3 cells)",
+                len(self.spatial_index),
+                self.spatial_index.resolution,
+            )
 
-            # Pre-join with titles so we avoid repeated merges per HTTP request
-            title_series = self.metadata_df[["vector_id", "title", "vote_average", "genres"]].reset_index(drop=True)
-            self.galaxy_full = self.galaxy_df.merge(title_series, on="vector_id", how="left")
+            self.galaxy_row_of = build_id_to_row(self.galaxy_full["vector_id"].to_numpy())
+
+            # Optional LOD tiles built offline by data_scripts/galaxy_tiles.py
+            self._tile_payloads = {}
+            if self.galaxy_tiles_path and os.path.exists(self.galaxy_tiles_path):
+                logger.info(f"Loading galaxy LOD tiles from {self.galaxy_tiles_path}")
+                self.galaxy_tiles = GalaxyTiles(self.galaxy_tiles_path, self.galaxy_full["vector_id"].to_numpy())
+            else:
+                self.galaxy_tiles = None
+                logger.warning("No galaxy_tiles.npz found; /api/galaxy/tiles is disabled until it is built.")
+
+            # Optional top-k neighbor graph built offline by data_scripts/neighbor_graph.py
+            self.neighbor_graph = None
+            if self.neighbor_graph_path and os.path.exists(self.neighbor_graph_path):
+                logger.info(f"Loading neighbor graph from {self.neighbor_graph_path}")
+                try:
+                    self.neighbor_graph = NeighborGraph(self.neighbor_graph_path, self.galaxy_row_of, len(self.galaxy_full))
+                    logger.info("Neighbor graph: k=%s spaces=%s", self.neighbor_graph.k, self.neighbor_graph.spaces)
+                except ValueError as exc:
+                    # e.g. stars added since the graph was built; knn queries search per request meanwhile
+                    logger.warning(f"Ignoring {self.neighbor_graph_path}: {exc}")
+            else:
+                logger.warning("No neighbor_graph.npz found; neighbors?mode=knn searches per request until it is built.")
 
             self.ready = True
             logger.info(f"Data Engine loaded successfully in {time.time() - start_time:.2f}s")
+            logger.info("Memory: %s", self.memory_info())
         except Exception as exc:
             self.ready = False
             self.load_error = str(exc)
@@ -86,66 +234,650 @@ class DataEngine:
             if strict:
                 raise
 
+    def _build_derived(self):
+        """
+        Serving structures computed from the loaded data: encoded ranking
+        heads, the title index, galaxy star buffers and the default response
+        bodies. Anything already attached from a snapshot is kept as is.
+        """
+        if not self._ranking_json:
+            for name, positions in self.rankings.items():
+                for fields in ("card", "full"):
+                    records = self.take_records(positions[:RANKING_PRECOMPUTE], fields=fields)
+                    self._ranking_json[(name, fields)] = PackedBytes.from_list([json.dumps(r).encode("utf-8") for r in records])
+            logger.info("Precomputed rankings: %s", {name: len(p) for name, p in self.rankings.items()})
+
+        if self.title_index is None:
+            index_start = time.time()
+            self.title_index = TitleIndex(self.metadata_df["title"], self.rankings["trending"])
+            logger.info(f"Built title autocomplete index over {len(self.title_index)} titles in {time.time() - index_start:.2f}s")
+
+        # Galaxy serving structures
+        self.galaxy_serving = self._build_galaxy_serving(self.galaxy_full)
+        if self.star_buffers is None:
+            self.star_buffers = StarBuffers(self.galaxy_serving)
+
+        # Bodies of the default first-load requests, encoded and compressed before serving starts
+        self.get_galaxy_response(fmt="json")
+        self.get_galaxy_response(fmt="binary")
+        self.get_ranked_response("trending")
+        logger.info("Response cache: %s", self.response_cache.stats())
+
+    def _row_count_problems(self) -> list[str]:
+        rows = len(self.metadata_df)
+        problems = []
+        if self.faiss_index.ntotal != rows:
+            problems.append(f"FAISS index row count ({self.faiss_index.ntotal}) does not match metadata row count ({rows}).")
+        if len(self.embeddings) != rows:
+            problems.append(f"Embeddings row count ({len(self.embeddings)}) does not match metadata row count ({rows}).")
+        if self.faiss_index.d > self.embeddings.shape[1]:
+            problems.append(f"FAISS index dimension ({self.faiss_index.d}) exceeds the embedding dimension ({self.embeddings.shape[1]}).")
+        unknown_stars = int((~self.galaxy_full["vector_id"].isin(self.metadata_df.index)).sum())
+        if unknown_stars:
+            problems.append(f"{unknown_stars} galaxy stars reference vector_ids missing from metadata.")
+        return problems
+
+    def _load_sources(self):
+        """Reads metadata, the FAISS index and galaxy coordinates into this process."""
+        logger.info(f"Loading metadata from {METADATA_PATH}")
+        self.metadata_df, self.heavy_columns, self.metadata_columns = load_metadata(METADATA_PATH)
+
+        if "vector_id" not in self.metadata_df.columns:
+            logger.warning("metadata.parquet has no vector_id column; creating sequential vector_id values.")
+            self.metadata_df = self.metadata_df.reset_index(drop=True)
+            self.metadata_df["vector_id"] = self.metadata_df.index.astype(int)
+            self.metadata_columns = ["vector_id"] + self.metadata_columns
+        self.metadata_df.set_index("vector_id", drop=False, inplace=True)
+        if self.heavy_columns is not None:
+            logger.info(
+                "Heavy metadata columns %s stay on disk (%s row groups, up to %s rows each)",
+                self.heavy_columns.columns,
+                len(self.heavy_columns.row_group_starts) - 1,
+                self.heavy_columns.max_row_group_rows,
+            )
+
+        logger.info(f"Loading FAISS index from {FAISS_INDEX_PATH}")
+        self.faiss_index = faiss.read_index(FAISS_INDEX_PATH)
+
+        logger.info(f"Loading galaxy coordinates from {GALAXY_COORDS_PATH}")
+        self.galaxy_df = pd.read_parquet(GALAXY_COORDS_PATH)  # columns: vector_id, x, y, z
+
+        # Pre-join with titles so we avoid repeated merges per HTTP request
+        title_series = self.metadata_df[["vector_id", "title", "vote_average", "genres"]].reset_index(drop=True)
+        self.galaxy_full = self.galaxy_df.merge(title_series, on="vector_id", how="left")
+        self.galaxy_tiles_path = GALAXY_TILES_PATH
+        self.neighbor_graph_path = NEIGHBOR_GRAPH_PATH
+
+        logger.info(f"Loading embeddings from {EMBEDDINGS_PATH} (mmap_mode='r')")
+        self.embeddings = np.load(EMBEDDINGS_PATH, mmap_mode="r")
+        self.configure_search_params(nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH)
+
+        self.attribute_filters = AttributeFilters(self.metadata_df)
+        # Static rankings (trending, top rated, ...) sorted once instead of per request
+        self.rankings = build_rankings(self.metadata_df)
+
+        # Built from these sources by _build_derived
+        self._ranking_json = {}
+        self.title_index = None
+        self.star_buffers = None
+        self.response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+
+    def publish_snapshot(self, root: str, force: bool = False) -> str:
+        """
+        Returns the snapshot version under `root` that matches the current source
+        files, building it first if it is missing or stale (or when `force`).
+        Holds the publish lock, so concurrent workers build it only once.
+        """
+        sources = current_sources()
+        with publish_lock(root):
+            version = current_version(root)
+            manifest = read_manifest(os.path.join(root, version)) if version else None
+            if manifest is not None and not force and (sources is None or manifest["sources"] == sources):
+                return version
+
+            logger.info(f"Building serving snapshot in {root}")
+            self._load_sources()
+            self._build_derived()
+            version = self._write_snapshot(root, sources)
+            set_current_version(root, version)
+            logger.info(f"Published snapshot {version}")
+            return version
+
+    def _write_snapshot(self, root: str, sources: dict | None) -> str:
+        version = new_version(sources)
+        building = os.path.join(root, f".building-{version}")
+        os.makedirs(building)
+
+        write_frame(self.metadata_df.reset_index(drop=True), os.path.join(building, "metadata.arrow"))
+        write_frame(self.galaxy_full, os.path.join(building, "galaxy.arrow"))
+        for name, positions in self.rankings.items():
+            write_array(os.path.join(building, f"ranking.{name}.npy"), positions)
+        filter_arrays = self.attribute_filters.to_arrays()
+        for name, array in filter_arrays.items():
+            write_array(os.path.join(building, f"filters.{name}.npy"), array)
+
+        # Source files the server maps directly; linked, so a snapshot does not change under a rebuild
+        link_or_copy(FAISS_INDEX_PATH, os.path.join(building, "faiss_index.faiss"))
+        link_or_copy(EMBEDDINGS_PATH, os.path.join(building, "embeddings.npy"))
+        if self.heavy_columns is not None:
+            link_or_copy(METADATA_PATH, os.path.join(building, "metadata.parquet"))
+        has_tiles = os.path.exists(GALAXY_TILES_PATH)
+        if has_tiles:
+            link_or_copy(GALAXY_TILES_PATH, os.path.join(building, "galaxy_tiles.npz"))
+        has_neighbor_graph = os.path.exists(NEIGHBOR_GRAPH_PATH)
+        if has_neighbor_graph:
+            link_or_copy(NEIGHBOR_GRAPH_PATH, os.path.join(building, "neighbor_graph.npz"))
+
+        # Derived structures, so attaching workers map them instead of rebuilding them
+        for (name, fields), encoded in self._ranking_json.items():
+            for key, array in encoded.to_arrays("records").items():
+                write_array(os.path.join(building, f"ranking_json.{name}.{fields}.{key}.npy"), array)
+        title_arrays = self.title_index.to_arrays()
+        for name, array in title_arrays.items():
+            write_array(os.path.join(building, f"title_index.{name}.npy"), array)
+        star_arrays = self.star_buffers.to_arrays()
+        for name, array in star_arrays.items():
+            write_array(os.path.join(building, f"stars.{name}.npy"), array)
+        responses = [
+            {"key": list(key), **body.to_files(os.path.join(building, f"response.{i}"))}
+            for i, (key, body) in enumerate(self.response_cache.items())
+        ]
+
+        write_manifest(building, {
+            "version": version,
+            "sources": sources,
+            "rows": len(self.metadata_df),
+            "metadata_columns": self.metadata_columns,
+            "heavy_columns": self.heavy_columns.columns if self.heavy_columns is not None else [],
+            "rankings": list(self.rankings),
+            "filters": list(filter_arrays),
+            "galaxy_tiles": has_tiles,
+            "neighbor_graph": has_neighbor_graph,
+            "ranking_json": {"precompute": RANKING_PRECOMPUTE, "keys": [list(key) for key in self._ranking_json]},
+            "title_index": list(title_arrays),
+            "star_buffers": list(star_arrays),
+            "responses": responses,
+        })
+        os.rename(building, os.path.join(root, version))
+        return version
+
+    def _attach_snapshot(self, directory: str):
+        """Maps every serving structure of the snapshot in `directory` read-only."""
+        manifest = read_manifest(directory)
+        if manifest is None:
+            raise ValueError(f"No readable snapshot manifest in {directory}")
+        path = lambda name: os.path.join(directory, name)
+        logger.info(f"Attaching snapshot {manifest['version']} from {directory}")
+
+        self.metadata_df = read_frame(path("metadata.arrow"))
+        self.metadata_df.set_index("vector_id", drop=False, inplace=True)
+        self.metadata_columns = manifest["metadata_columns"]
+        heavy = manifest["heavy_columns"]
+        self.heavy_columns = HeavyColumns(path("metadata.parquet"), heavy) if heavy else None
+
+        self.galaxy_full = read_frame(path("galaxy.arrow"))
+        self.galaxy_df = self.galaxy_full[["vector_id", "x", "y", "z"]]
+        self.galaxy_tiles_path = path("galaxy_tiles.npz") if manifest["galaxy_tiles"] else None
+        self.neighbor_graph_path = path("neighbor_graph.npz") if manifest.get("neighbor_graph") else None
+
+        self.faiss_index = read_index_mmap(path("faiss_index.faiss"))
+        self.configure_search_params(nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH)
+        self.embeddings = np.load(path("embeddings.npy"), mmap_mode="r")
+
+        self.rankings = {name: read_array(path(f"ranking.{name}.npy")) for name in manifest["rankings"]}
+        self.attribute_filters = AttributeFilters.from_arrays(
+            {name: read_array(path(f"filters.{name}.npy")) for name in manifest["filters"]}
+        )
+
+        ranking_json = manifest["ranking_json"]
+        self._ranking_json = {}
+        if ranking_json["precompute"] == RANKING_PRECOMPUTE:  # Otherwise re-encoded at the configured depth
+            self._ranking_json = {
+                (name, fields): PackedBytes.from_arrays(
+                    {key: read_array(path(f"ranking_json.{name}.{fields}.{key}.npy")) for key in ("records_blob", "records_offsets")},
+                    "records",
+                )
+                for name, fields in ranking_json["keys"]
+            }
+        self.title_index = TitleIndex.from_arrays({name: read_array(path(f"title_index.{name}.npy")) for name in manifest["title_index"]})
+        self.star_buffers = StarBuffers.from_arrays({name: read_array(path(f"stars.{name}.npy")) for name in manifest["star_buffers"]})
+        self.response_cache = ResponseCache(RESPONSE_CACHE_BYTES)
+        for i, stored in enumerate(manifest["responses"]):
+            self.response_cache.put(tuple(stored["key"]), EncodedBody.from_files(path(f"response.{i}"), stored))
+        self.data_version = manifest["version"]
+
+    def configure_search_params(self, nprobe: int | None = None, ef_search: int | None = None) -> dict:
+        """
+        Sets recall/latency knobs on the loaded index: `nprobe` for IVF indexes,
+        `ef_search` for HNSW. Knobs that do not apply to the index are ignored.
+        """
+        if self.faiss_index is None:
+            return {}
+        if nprobe is not None:
+            ivf = self._ivf_index()
+            if ivf is not None:
+                ivf.nprobe = int(nprobe)
+        if ef_search is not None:
+            hnsw = getattr(faiss.downcast_index(self.faiss_index), "hnsw", None)
+            if hnsw is not None:
+                hnsw.efSearch = int(ef_search)
+        return self.index_info()
+
+    def index_info(self) -> dict:
+        if self.faiss_index is None:
+            return {}
+        index = faiss.downcast_index(self.faiss_index)
+        info = {"type": type(index).__name__, "ntotal": int(index.ntotal), "dim": int(index.d)}
+        ivf = self._ivf_index()
+        if ivf is not None:
+            info["nlist"] = int(ivf.nlist)
+            info["nprobe"] = int(ivf.nprobe)
+        if hasattr(index, "hnsw"):
+            info["ef_search"] = int(index.hnsw.efSearch)
+        if self.search_rerank:
+            info["rerank"] = self.search_rerank
+        return info
+
+    def _ivf_index(self):
+        try:
+            return faiss.extract_index_ivf(self.faiss_index)
+        except RuntimeError:
+            return None
+
     def _ensure_model_loaded(self):
         if self.model is not None:
             return
-        logger.info("Loading SentenceTransformer model '%s'", self.model_name)
-        self.model = SentenceTransformer(self.model_name, trust_remote_code=True)
+        with self._model_lock:
+            if self.model is not None:
+                return
+            start_time = time.time()
+            logger.info("Loading query encoder '%s' (%s backend)", self.model_name, self.encoder_backend)
+            self.model = load_encoder(self.model_name, self.encoder_backend, QUERY_ENCODER_FILE)
+            self.model_error = None
+            logger.info(f"Query encoder loaded in {time.time() - start_time:.2f}s")
+
+    def start_model_warmup(self):
+        """Loads the model (and runs one encode) on a background thread so browse traffic is served meanwhile."""
+        if self.model is not None or (self._warmup_thread is not None and self._warmup_thread.is_alive()):
+            return
+        self._warmup_thread = threading.Thread(target=self._warm_model, name="model-warmup", daemon=True)
+        self._warmup_thread.start()
+
+    def _warm_model(self):
+        start_time = time.time()
+        try:
+            self._ensure_model_loaded()
+            self.model.encode(["warm-up"], normalize_embeddings=True)
+            logger.info(f"Model warm-up finished in {time.time() - start_time:.2f}s")
+        except Exception as exc:
+            self.model_error = str(exc)
+            logger.exception("Model warm-up failed: %s", exc)
+
+    def status(self) -> dict:
+        """
+        Readiness: "loading" -> "browse_ready" (data served, model still warming)
+        -> "search_ready"; "failed" when the data could not be loaded.
+        """
+        if self.ready:
+            state = "search_ready" if self.model is not None else "browse_ready"
+        else:
+            state = "failed" if self.load_error else "loading"
+        return {
+            "state": state,
+            "data_version": self.data_version,
+            "load_error": self.load_error,
+            "model_error": self.model_error,
+            "encoder_backend": self.encoder_backend,
+        }
 
     def embed_query(self, text: str) -> np.ndarray:
+        # The nomic tokenizer is uncased, so case/whitespace-normalized cache keys are safe
+        cached = self.query_cache.get(text)
+        if cached is not None:
+            return cached[None, :]
+        vector = self.encode_batcher.run(text)
+        self.query_cache.put(text, vector)
+        return vector[None, :]
+
+    def embed_queries(self, texts: list[str]) -> np.ndarray:
+        """
+        Vectors for several queries, one row each. Cache misses are submitted
+        together, so the encode batcher runs them as one model call.
+        """
+        vectors: dict[str, np.ndarray] = {}
+        pending = {}
+        for text in texts:
+            key = self.query_cache.normalize(text)
+            if key in vectors or key in pending:
+                continue
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                vectors[key] = cached
+            else:
+                pending[key] = (text, self.encode_batcher.submit(text))
+        for key, (text, future) in pending.items():
+            vectors[key] = future.result()
+            self.query_cache.put(text, vectors[key])
+        return np.stack([vectors[self.query_cache.normalize(text)] for text in texts]).astype(np.float32, copy=False)
+
+    def _encode_batch(self, texts: list[str]) -> list[np.ndarray]:
         self._ensure_model_loaded()
-        return self.model.encode([text], normalize_embeddings=True)
+        vectors = self.model.encode(texts, normalize_embeddings=True)
+        return list(np.asarray(vectors, dtype=np.float32))
+
+    def search_vector(self, query_vector: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """FAISS search for one query vector, coalesced with concurrent searches into one multi-row call."""
+        vector = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+        return self.search_batcher.run((vector, k))
+
+    def _search_batch(self, requests: list[tuple[np.ndarray, int]]) -> list[tuple[np.ndarray, np.ndarray]]:
+        # One multi-row search at the largest requested k, then trim each row to its own k
+        queries = np.stack([vector for vector, _ in requests])
+        max_k = max(k for _, k in requests)
+        distances, indices = self.faiss_index.search(self._index_queries(queries), max(max_k, self.search_rerank))
+        if self.search_rerank:
+            distances, indices = self._rerank(queries, distances, indices, max_k)
+        return [(distances[i:i + 1, :k], indices[i:i + 1, :k]) for i, (_, k) in enumerate(requests)]
+
+    def _index_queries(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Query vectors as the index expects them: Matryoshka-truncated to the
+        index dimension and re-normalized when the index was built with --dims.
+        """
+        dim = self.faiss_index.d
+        if queries.shape[1] <= dim:
+            return queries
+        truncated = np.array(queries[:, :dim], dtype=np.float32)  # A copy: normalized in place below
+        truncated /= np.maximum(np.linalg.norm(truncated, axis=1, keepdims=True), 1e-12)
+        return truncated
+
+    def _rerank(self, queries: np.ndarray, distances: np.ndarray, indices: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Re-scores index candidates by exact inner product with the stored
+        (memory-mapped) embeddings and keeps the best `k` per query. Only the
+        candidate rows are read from the mapping.
+        """
+        if self.embeddings is None or self.embeddings.shape[1] != queries.shape[1]:
+            return distances[:, :k], indices[:, :k]
+        rows = np.clip(indices, 0, len(self.embeddings) - 1)
+        candidates = np.asarray(self.embeddings[rows.ravel()], dtype=np.float32).reshape(*rows.shape, -1)
+        scores = np.einsum("qcd,qd->qc", candidates, queries)
+        scores[indices < 0] = -np.inf
+        top = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(scores, top, axis=1), np.take_along_axis(indices, top, axis=1)
 
     def get_movie_by_vector_id(self, vector_id: int) -> dict:
-        if self.metadata_df is None:
+        position = self._metadata_position(vector_id)
+        if position is None:
             return None
-        try:
-            if vector_id in self.metadata_df.index:
-                return self.metadata_df.loc[vector_id].to_dict()
+        return self.take_records(np.array([position]), fields="full")[0]
+
+    def get_movies_by_vector_ids(self, vector_ids: list[int], fields: str = "full") -> tuple[list[dict], list[int]]:
+        """
+        Records for many vector_ids with one index lookup and one take, in
+        request order. Returns (records, unknown vector_ids).
+        """
+        ids = np.asarray(vector_ids, dtype=np.int64)
+        positions = self.metadata_df.index.get_indexer(ids)
+        found = positions >= 0
+        return self.take_records(positions[found], fields=fields), ids[~found].tolist()
+
+    def _metadata_position(self, vector_id: int) -> int | None:
+        if self.metadata_df is None or vector_id not in self.metadata_df.index:
             return None
-        except KeyError:
+        position = self.metadata_df.index.get_loc(vector_id)
+        if not isinstance(position, (int, np.integer)):
             return None
+        return int(position)
+
+    def take_records(self, positions: np.ndarray, fields: str = "full") -> list[dict]:
+        """
+        Gathers metadata rows at `positions` (FAISS / row positions) in one
+        columnar take and returns JSON-ready dicts: native Python scalars,
+        NaN converted to None once per column. "full" records also read the
+        heavy text columns from disk.
+        """
+        df = self.metadata_df
+        block = df.take(positions)
+
+        if fields == "full":
+            columns = [c for c in self.metadata_columns if c in df.columns or self._is_heavy(c)]
+            columns += [c for c in df.columns if c not in columns]
+            heavy = self.heavy_columns.take(positions) if self.heavy_columns is not None else {}
+        else:
+            columns = [c for c in CARD_COLUMNS if c in df.columns]
+            heavy = {}
+
+        column_values = []
+        for column in columns:
+            if column in heavy:
+                column_values.append(heavy[column])
+                continue
+            series = block[column]
+            values = series.tolist()
+            missing = series.isna().to_numpy()
+            if missing.any():
+                for i in np.flatnonzero(missing):
+                    values[i] = None
+            column_values.append(values)
+
+        return [dict(zip(columns, row)) for row in zip(*column_values)]
+
+    def _is_heavy(self, column: str) -> bool:
+        return self.heavy_columns is not None and column in self.heavy_columns.columns
 
     def get_movie_by_faiss_position(self, idx: int) -> dict:
         if self.metadata_df is None or idx < 0 or idx >= len(self.metadata_df):
             return None
-        return self.metadata_df.iloc[idx].to_dict()
+        return self.take_records(np.array([idx]), fields="full")[0]
 
-    def search_similar(self, query: str, k: int = 10):
-        query_vector = self.embed_query(query)
-        query_vector_float32 = np.array(query_vector, dtype=np.float32)
-        distances, indices = self.faiss_index.search(query_vector_float32, k)
+    def memory_info(self) -> dict:
+        """Resident metadata size and process RSS in MB, reported at startup and in /api/stats."""
+        mb = 1024 * 1024
+        info = {}
+        if self.metadata_df is not None:
+            info["metadata_mb"] = round(float(self.metadata_df.memory_usage(deep=True).sum()) / mb, 1)
+        rss = process_rss_bytes()
+        if rss is not None:
+            info["rss_mb"] = round(rss / mb, 1)
+        return info
 
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx != -1:
-                movie = self.get_movie_by_faiss_position(int(idx))
-                if movie:
-                    movie_copy = movie.copy()
-                    movie_copy['similarity_distance'] = float(dist)
-                    for key, val in list(movie_copy.items()):
-                        if pd.isna(val) or val is None:
-                            movie_copy[key] = None
-                    results.append(movie_copy)
+    def search_similar(self, query: str, k: int = 10, fields: str = "full", filters: dict | None = None):
+        """
+        Semantic search, optionally restricted by `filters` (keyword arguments of
+        `AttributeFilters.select`: genres, year_min, year_max, min_rating, languages).
+        """
+        return self._search_embedded(self.embed_query(query), k, fields, filters)
 
+    def search_similar_batch(self, searches: list[dict]) -> list[list[dict]]:
+        """
+        Several semantic searches in one call; each item holds the keyword
+        arguments of `search_similar` (query, k, fields, filters). Queries are
+        encoded together and unfiltered searches share one FAISS call.
+        """
+        vectors = self.embed_queries([search["query"] for search in searches])
+        futures = [
+            self.search_batcher.submit((vector, search.get("k", 10))) if not search.get("filters") else None
+            for vector, search in zip(vectors, searches)
+        ]
+        results = []
+        for vector, future, search in zip(vectors, futures, searches):
+            fields = search.get("fields", "full")
+            if future is not None:
+                distances, indices = future.result()
+                results.append(self._hits_to_records(distances[0], indices[0], fields))
+            else:
+                results.append(self._search_embedded(vector[None, :], search.get("k", 10), fields, search["filters"]))
         return results
 
-    def get_trending_movies(self, limit: int = 10):
-        if 'popularity' in self.metadata_df.columns:
-            trending_df = self.metadata_df.sort_values(by='popularity', ascending=False).head(limit)
+    def _search_embedded(self, query_vector: np.ndarray, k: int, fields: str, filters: dict | None) -> list[dict]:
+        mask = self.attribute_filters.select(**filters) if filters else None
+        if mask is None:
+            distances, indices = self.search_vector(query_vector, k)
         else:
-            trending_df = self.metadata_df.head(limit)
+            distances, indices = self.search_vector_filtered(query_vector, k, mask)
+        return self._hits_to_records(distances[0], indices[0], fields)
 
-        results = []
-        for _, row in trending_df.iterrows():
-            movie_dict = row.to_dict()
-            for key, val in list(movie_dict.items()):
-                if pd.isna(val) or val is None:
-                    movie_dict[key] = None
-            results.append(movie_dict)
+    def autocomplete(self, query: str, limit: int = 8, fields: str = "card", hybrid: bool = False) -> list[dict]:
+        """
+        Title matches for a partial query, most popular first, without the
+        model. With `hybrid`, semantic hits fill the remaining slots (this one
+        does encode the query).
+        """
+        positions = self.title_index.search(query, limit)
+        results = self.take_records(positions, fields=fields)
+        if hybrid and len(results) < limit:
+            seen = set(int(p) for p in positions)
+            for movie in self.search_similar(query, k=limit, fields=fields):
+                if len(results) >= limit:
+                    break
+                if movie["vector_id"] not in seen:
+                    results.append(movie)
+        return results
+
+    def search_vector_filtered(self, query_vector: np.ndarray, k: int, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        FAISS search restricted to rows where `mask` is True.
+
+        The mask is handed to FAISS as an ID selector so non-matching rows are
+        skipped during the scan (pre-filtering). Index types that reject
+        selectors fall back to searching with a growing k and post-filtering.
+        """
+        query = np.asarray(query_vector, dtype=np.float32).reshape(1, -1)
+        if not mask.any():
+            return np.empty((1, 0), dtype=np.float32), np.empty((1, 0), dtype=np.int64)
+        if not self.search_rerank:
+            return self._search_masked(self._index_queries(query), k, mask)
+        distances, indices = self._search_masked(self._index_queries(query), max(k, self.search_rerank), mask)
+        return self._rerank(query, distances, indices, k)
+
+    def _search_masked(self, query: np.ndarray, k: int, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        bitmap = np.packbits(mask, bitorder="little")
+        selector = faiss.IDSelectorBitmap(len(mask), faiss.swig_ptr(bitmap))
+        try:
+            params = self._selector_params(selector)
+            distances, indices = self.faiss_index.search(query, k, params=params)
+            valid = indices[0] >= 0
+            return distances[:, valid], indices[:, valid]
+        except RuntimeError as exc:
+            logger.debug("ID selector not supported by %s (%s); using k expansion", type(self.faiss_index).__name__, exc)
+
+        ntotal = self.faiss_index.ntotal
+        fetch = max(k * 4, 32)
+        while True:
+            fetch = min(fetch, ntotal)
+            distances, indices = self.faiss_index.search(query, fetch)
+            hits = indices[0][(indices[0] >= 0) & (indices[0] < len(mask))]
+            keep = np.isin(indices[0], hits[mask[hits]])
+            if keep.sum() >= k or fetch >= ntotal:
+                return distances[:, keep][:, :k], indices[:, keep][:, :k]
+            fetch *= 4
 
+    def _selector_params(self, selector):
+        ivf = self._ivf_index()
+        if ivf is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        hnsw = getattr(faiss.downcast_index(self.faiss_index), "hnsw", None)
+        if hnsw is not None:
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=hnsw.efSearch)
+        return faiss.SearchParameters(sel=selector)
+
+    def get_similar_movies(self, vector_id: int, k: int = 10, fields: str = "card") -> list[dict] | None:
+        """
+        "More like this": searches with the movie's stored embedding, so no query
+        encoding (and no model load) is needed. Returns None for unknown ids.
+        """
+        position = self._metadata_position(vector_id)
+        if position is None:
+            return None
+        # One extra hit for the movie itself, but never more than the index holds
+        k = min(k, self.faiss_index.ntotal - 1)
+        if k <= 0:
+            return []
+        distances, indices = self.search_vector(self._stored_vector(position), k + 1)
+        keep = indices[0] != position
+        return self._hits_to_records(distances[0][keep][:k], indices[0][keep][:k], fields)
+
+    def _stored_vector(self, position: int) -> np.ndarray:
+        if self.embeddings is not None and position < len(self.embeddings):
+            return np.asarray(self.embeddings[position], dtype=np.float32)
+        return self.faiss_index.reconstruct(position)
+
+    def _hits_to_records(self, distances: np.ndarray, indices: np.ndarray, fields: str) -> list[dict]:
+        valid = (indices >= 0) & (indices < len(self.metadata_df))
+        results = self.take_records(indices[valid], fields=fields)
+        for movie, dist in zip(results, distances[valid].tolist()):
+            movie['similarity_distance'] = dist
         return results
 
+    def get_trending_movies(self, limit: int = 10, offset: int = 0, fields: str = "full"):
+        return self.get_ranked_movies("trending", limit=limit, offset=offset, fields=fields)
+
+    def get_ranked_movies(self, ranking: str, limit: int = 10, offset: int = 0, fields: str = "full") -> list[dict] | None:
+        positions = self.rankings.get(ranking)
+        if positions is None:
+            return None
+        offset = max(offset, 0)
+        return self.take_records(positions[offset:offset + max(limit, 0)], fields=fields)
+
+    def get_ranked_payload(self, ranking: str, limit: int = 10, offset: int = 0, fields: str = "full") -> bytes | None:
+        """
+        JSON response body for one page of a precomputed ranking, or None if the
+        ranking does not exist. Pages inside the precomputed head are a join of
+        already-encoded records; deeper pages fall back to `take_records`.
+        """
+        positions = self.rankings.get(ranking)
+        if positions is None:
+            return None
+        offset = max(offset, 0)
+        limit = max(limit, 0)
+        end = min(offset + limit, len(positions))
+
+        encoded = self._ranking_json.get((ranking, fields), [])
+        if end <= len(encoded):
+            items = encoded[offset:end]
+        else:
+            items = [json.dumps(r).encode("utf-8") for r in self.take_records(positions[offset:end], fields=fields)]
+
+        header = json.dumps({"ranking": ranking, "offset": offset, "limit": limit, "total": len(positions)})
+        return header[:-1].encode("utf-8") + b', "results": [' + b", ".join(items) + b"]}"
+
+    def get_movie_response(self, vector_id: int) -> EncodedBody | None:
+        """`get_movie_by_vector_id` as an encoded JSON body, kept in the response cache; None for unknown ids."""
+        def build():
+            movie = self.get_movie_by_vector_id(vector_id)
+            return None if movie is None else encode_body(json.dumps(movie).encode("utf-8"), "application/json")
+        return self.response_cache.get(("movie", vector_id), build)
+
+    def get_ranked_response(self, ranking: str, limit: int = 10, offset: int = 0, fields: str = "full") -> EncodedBody | None:
+        """`get_ranked_payload` as a cached encoded body; None for unknown rankings."""
+        def build():
+            payload = self.get_ranked_payload(ranking, limit=limit, offset=offset, fields=fields)
+            return None if payload is None else encode_body(payload, "application/json")
+        return self.response_cache.get(("ranked", ranking, max(limit, 0), max(offset, 0), fields), build)
+
+    def get_galaxy_response(self, limit: int = 20000, fmt: str = "json") -> EncodedBody:
+        """
+        The whole-galaxy response (no region) for `limit`. Limits in
+        GALAXY_CACHED_LIMITS, and any limit covering every star, are encoded
+        and compressed once per snapshot; other limits are built per request
+        with fast compression, so arbitrary limits cannot churn the cache.
+        """
+        total = len(self.galaxy_serving)
+        cached = limit in GALAXY_CACHED_LIMITS or limit >= total
+
+        def build():
+            if fmt == "binary":
+                return encode_body(self.get_galaxy_binary(limit=limit), STAR_MEDIA_TYPE, on_demand=not cached)
+            stars = self.get_galaxy_data(limit=limit)
+            body = json.dumps({"count": len(stars), "stars": stars}).encode("utf-8")
+            return encode_body(body, "application/json", on_demand=not cached)
+
+        if not cached:
+            return build()
+        # Every limit at or above the star count is the same full response
+        return self.response_cache.get(("galaxy", min(limit, total), fmt), build)
+
     def get_galaxy_data(
         self,
         limit: int = 20000,
@@ -166,28 +898,218 @@ class DataEngine:
           - Provide region_x/y/z + radius to get only stars in a spatial sphere,
             enabling progressive loading during Explore Mode without disk I/O.
         """
-        df = self.galaxy_full
+        positions = self._galaxy_positions(limit, region_x, region_y, region_z, radius)
+        df = self.galaxy_serving if positions is None else self.galaxy_serving.iloc[positions]
+        return df.to_dict(orient='records')
+
+    def get_galaxy_binary(
+        self,
+        limit: int = 20000,
+        region_x: float | None = None,
+        region_y: float | None = None,
+        region_z: float | None = None,
+        radius: float | None = None,
+    ) -> bytes:
+        """Same selection as `get_galaxy_data`, packed in the binary star format (core/wire.py)."""
+        positions = self._galaxy_positions(limit, region_x, region_y, region_z, radius)
+        return self.star_buffers.encode(positions)
+
+    def _galaxy_positions(self, limit, region_x, region_y, region_z, radius) -> np.ndarray | None:
+        # None means "every star", which lets the binary path reuse its prebuilt full payload
+        positions = None
 
         # Optional spatial sphere filter (Phase 4 Explore Mode)
         if region_x is not None and region_y is not None and region_z is not None and radius is not None:
-            dx = df['x'] - region_x
-            dy = df['y'] - region_y
-            dz = df['z'] - region_z
-            dist_sq = dx**2 + dy**2 + dz**2
-            df = df[dist_sq <= radius**2]
+            positions = self.spatial_index.query_sphere((region_x, region_y, region_z), radius)
 
         # Adaptive limit – use uniform-step sampling to preserve galaxy shape
-        total = len(df)
+        total = len(self.galaxy_serving) if positions is None else len(positions)
         if limit < total:
             step = max(1, total // limit)
-            df = df.iloc[::step].head(limit)
+            if positions is None:
+                positions = np.arange(total)
+            positions = positions[::step][:limit]
+
+        return positions
+
+    def get_galaxy_view(self, view: ViewCone, limit: int = 5000, cursor: str | None = None) -> dict:
+        """
+        Stars in the camera's view that the client has not received yet, most
+        important on screen first. Used by Explore Mode instead of a sphere
+        around the camera.
+
+        With LOD tiles, whole tiles are sent (coarse, popular stars first,
+        finer levels only where they are large on screen) and `cursor`, echoed
+        back by the client, lists the tiles it already has. Without tiles,
+        single stars are culled and ranked by apparent size, and no cursor is
+        returned. `complete` is False while visible stars remain unsent; without
+        a cursor the server cannot page past the first `limit` stars, so that
+        answer is always complete until the camera moves.
+        """
+        positions, cursor, complete = self._view_positions(view, limit, cursor)
+        stars = self.galaxy_serving.iloc[positions].to_dict(orient='records')
+        return {"count": len(stars), "stars": stars, "cursor": cursor, "complete": complete}
+
+    def get_galaxy_view_binary(self, view: ViewCone, limit: int = 5000, cursor: str | None = None) -> tuple[bytes, str | None, bool]:
+        """`get_galaxy_view` in the binary star format; the cursor and completeness are returned alongside."""
+        positions, cursor, complete = self._view_positions(view, limit, cursor)
+        return self.star_buffers.encode(positions), cursor, complete
+
+    def _view_positions(self, view: ViewCone, limit: int, cursor: str | None) -> tuple[np.ndarray, str | None, bool]:
+        if self.galaxy_tiles is not None:
+            have = self.galaxy_tiles.decode_cursor(cursor)
+            sent, complete = self.galaxy_tiles.visible_tiles(view, have, limit, GALAXY_VIEW_DETAIL)
+            have[sent] = True
+            return self.galaxy_tiles.rows_of_tiles(sent), self.galaxy_tiles.encode_cursor(have), complete
 
-        # Drop NaNs and cast to native Python types for JSON serialization
-        df_out = df[['vector_id', 'x', 'y', 'z', 'title', 'vote_average', 'genres']].copy()
-        df_out['title'] = df_out['title'].fillna('Unknown')
-        df_out['genres'] = df_out['genres'].fillna('')
+        # Every point of the cone lies within far / cos(half-angle) of the camera
+        candidates = self.spatial_index.query_sphere(view.position, view.far / view.cos_half)
+        visible = candidates[view.contains(self.spatial_index.points[candidates])]
+        depth = np.maximum(view.depth(self.spatial_index.points[visible]), 1e-6)
+        # Stars are drawn larger for higher ratings and shrink with depth
+        rating = np.nan_to_num(self.galaxy_full["vote_average"].to_numpy(dtype=np.float64)[visible])
+        importance = (1.0 + rating) / depth
+        if len(visible) > limit:
+            top = np.argpartition(-importance, limit - 1)[:limit]
+        else:
+            top = np.arange(len(visible))
+        top = top[np.argsort(-importance[top], kind="stable")]
+        # Asking again for the same view would return the same stars
+        return visible[top], None, True
+
+    def get_neighbors_by_vector_id(
+        self,
+        vector_id: int,
+        radius: float = 0.3,
+        mode: str = "radius",
+        k: int = 32,
+        space: str = "umap",
+    ) -> list[dict]:
+        """
+        Returns stars around the movie at vector_id, for Explore Mode cluster zoom.
+        Used by /api/galaxy/neighbors.
+
+          - mode="radius": every star within `radius` UMAP units, however many
+            the local density puts there.
+          - mode="knn": the movie's own star, then its `k` nearest stars in
+            `space` ("umap" = 3D distance, "embedding" = semantic similarity),
+            nearest first with a `neighbor_score` each.
+        """
+        if mode == "knn":
+            hit = self._knn_positions(vector_id, k, space)
+            if hit is None:
+                return []
+            positions, scores = hit
+            stars = self.galaxy_serving.iloc[positions].to_dict(orient='records')
+            for star, score in zip(stars[1:], scores.tolist()):
+                star["neighbor_score"] = score
+            return stars
+        positions = self._neighbor_positions(vector_id, radius)
+        if positions is None:
+            return []
+        return self.galaxy_serving.iloc[positions].to_dict(orient='records')
+
+    def get_neighbors_binary(
+        self,
+        vector_id: int,
+        radius: float = 0.3,
+        mode: str = "radius",
+        k: int = 32,
+        space: str = "umap",
+    ) -> bytes:
+        if mode == "knn":
+            hit = self._knn_positions(vector_id, k, space)
+            positions = None if hit is None else hit[0]
+        else:
+            positions = self._neighbor_positions(vector_id, radius)
+        return self.star_buffers.encode(np.empty(0, dtype=np.int64) if positions is None else positions)
+
+    def _galaxy_row(self, vector_id: int) -> int | None:
+        row = int(rows_for_ids(self.galaxy_row_of, [vector_id])[0])
+        return row if row >= 0 else None
+
+    def _neighbor_positions(self, vector_id: int, radius: float) -> np.ndarray | None:
+        row = self._galaxy_row(vector_id)
+        if row is None:
+            return None
+        return self.spatial_index.query_sphere(self.spatial_index.points[row], radius)
+
+    def _knn_positions(self, vector_id: int, k: int, space: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Galaxy rows of the movie's star followed by its `k` nearest stars, and
+        the neighbors' scores; None for movies without a star. Answered from the
+        precomputed neighbor graph when it covers `space` and `k`.
+        """
+        row = self._galaxy_row(vector_id)
+        if row is None:
+            return None
+        hit = self.neighbor_graph.neighbors(row, space, k) if self.neighbor_graph is not None else None
+        if hit is None:
+            hit = self._search_knn(row, vector_id, k, space)
+        rows, scores = hit
+        return np.concatenate([np.array([row], dtype=np.int64), rows]), scores
+
+    def _search_knn(self, row: int, vector_id: int, k: int, space: str) -> tuple[np.ndarray, np.ndarray]:
+        # Per-request fallback for a missing graph or k beyond the stored lists
+        if space == "embedding":
+            position = self._metadata_position(vector_id)
+            if position is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            # Over-fetch so movies without a star can be dropped and k still remain
+            distances, indices = self.search_vector(self._stored_vector(position), k * 2 + 1)
+            valid = (indices[0] >= 0) & (indices[0] < len(self.metadata_df))
+            ids = self.metadata_df["vector_id"].to_numpy()[indices[0][valid]]
+            rows = rows_for_ids(self.galaxy_row_of, ids)
+            keep = (rows >= 0) & (rows != row)
+            return rows[keep][:k].astype(np.int64), distances[0][valid][keep][:k]
+
+        return self.spatial_index.nearest(self.spatial_index.points[row], k, exclude=row)
+
+    def get_galaxy_tile_manifest(self) -> dict | None:
+        if self.galaxy_tiles is None:
+            return None
+        return self.galaxy_tiles.manifest()
+
+    def get_galaxy_tile_payload(self, level: int, x: int, y: int, z: int, fmt: str = "json") -> bytes | None:
+        """
+        Returns the encoded stars of one LOD tile, or None if it does not exist.
+
+        Tiles never overlap, so a client zooming in only fetches the new detail
+        tiles. Each tile is encoded once per format and then served from memory.
+        """
+        if self.galaxy_tiles is None:
+            return None
+        key = (level, x, y, z, fmt)
+        payload = self._tile_payloads.get(key)
+        if payload is not None:
+            return payload
+
+        positions = self.galaxy_tiles.tile_rows(level, x, y, z)
+        if positions is None:
+            return None
+        if fmt == "binary":
+            payload = self.star_buffers.encode(positions)
+            self._tile_payloads[key] = payload
+            return payload
+
+        stars = self.galaxy_serving.iloc[positions].to_dict(orient='records')
+        bounds_min, bounds_max = self.galaxy_tiles.tile_bounds(level, x, y, z)
+        payload = json.dumps({
+            "level": level, "x": x, "y": y, "z": z,
+            "bounds_min": bounds_min, "bounds_max": bounds_max,
+            "count": len(stars), "stars": stars,
+        }).encode("utf-8")
+        self._tile_payloads[key] = payload
+        return payload
+
+    @staticmethod
+    def _build_galaxy_serving(galaxy_full: pd.DataFrame) -> pd.DataFrame:
+        # Drop NaNs and cast to native Python types for JSON serialization, once per load
+        df_out = galaxy_full[GALAXY_STAR_COLUMNS].copy()
+        df_out['title'] = df_out['title'].astype('string').fillna('Unknown')
+        df_out['genres'] = df_out['genres'].astype('string').fillna('')
         df_out['vote_average'] = pd.to_numeric(df_out['vote_average'], errors='coerce').fillna(0.0)
-        df_out = df_out.astype({
+        return df_out.astype({
             'vector_id': 'int',
             'x': 'float',
             'y': 'float',
@@ -197,33 +1119,115 @@ class DataEngine:
             'genres': 'str',
         })
 
-        return df_out.to_dict(orient='records')
 
-    def get_neighbors_by_vector_id(self, vector_id: int, radius: float = 0.3) -> list[dict]:
+class EngineHandle:
+    """
+    The module-level `data_engine`: forwards attribute access to the live
+    DataEngine, which `reload` replaces with a freshly loaded one.
+
+    Looking up a method binds it to the engine that is live at that moment, so
+    a request that started before a swap finishes against the old data; the
+    old engine is freed once its last request returns.
+    """
+
+    def __init__(self, engine: DataEngine):
+        object.__setattr__(self, "_engine", engine)
+        object.__setattr__(self, "_reload_lock", threading.Lock())
+        object.__setattr__(self, "reload_state", {"state": "idle", "error": None, "finished": None})
+
+    @property
+    def engine(self) -> DataEngine:
+        return self._engine
+
+    def __getattr__(self, name):
+        return getattr(self._engine, name)
+
+    def __setattr__(self, name, value):
+        if hasattr(type(self), name) or name in self.__dict__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._engine, name, value)
+
+    def __delattr__(self, name):
+        if name in self.__dict__:
+            object.__delattr__(self, name)
+        else:
+            delattr(self._engine, name)
+
+    def reload(self) -> bool:
         """
-        Returns stars within `radius` UMAP units of the movie at vector_id.
-        Used by /api/galaxy/neighbors for Explore Mode cluster zoom.
+        Loads the current data files into a new engine and swaps it in. The
+        query cache and the loaded model carry over. Returns False if a reload
+        is already running; raises (keeping the old engine) if loading or
+        validation fails.
         """
-        row = self.galaxy_full[self.galaxy_full['vector_id'] == vector_id]
-        if row.empty:
-            return []
-        cx, cy, cz = float(row.iloc[0]['x']), float(row.iloc[0]['y']), float(row.iloc[0]['z'])
-
-        df = self.galaxy_full
-        dx = df['x'] - cx
-        dy = df['y'] - cy
-        dz = df['z'] - cz
-        neighbors = df[(dx**2 + dy**2 + dz**2) <= radius**2].copy()
-
-        neighbors['title'] = neighbors['title'].fillna('Unknown')
-        neighbors['genres'] = neighbors['genres'].fillna('')
-        neighbors['vote_average'] = pd.to_numeric(neighbors['vote_average'], errors='coerce').fillna(0.0)
-        neighbors = neighbors.astype({
-            'vector_id': 'int', 'x': 'float', 'y': 'float', 'z': 'float',
-            'title': 'str', 'vote_average': 'float', 'genres': 'str',
-        })
-        return neighbors[['vector_id', 'x', 'y', 'z', 'title', 'vote_average', 'genres']].to_dict(orient='records')
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self.reload_state.update(state="running", error=None)
+            old = self._engine
+            fresh = DataEngine()
+            fresh.query_cache = old.query_cache
+            fresh.model_name = old.model_name
+            fresh.encoder_backend = old.encoder_backend
+            fresh.model = old.model
+            fresh.load_all(strict=True, validate=True)
+
+            object.__setattr__(self, "_engine", fresh)
+            logger.info("Swapped in reloaded data (version %s)", fresh.data_version)
+            if fresh.model is None and MODEL_WARMUP:
+                fresh.start_model_warmup()
+            # Requests still holding the old engine run their remaining batches inline
+            old.encode_batcher.close()
+            old.search_batcher.close()
+            del old
+            gc.collect()
+            self.reload_state.update(state="idle", finished=time.time())
+            return True
+        except Exception as exc:
+            self.reload_state.update(state="failed", error=str(exc), finished=time.time())
+            logger.exception("Reload failed; still serving the previous data: %s", exc)
+            raise
+        finally:
+            self._reload_lock.release()
+
+    def start_reload(self) -> bool:
+        """Runs `reload` on a background thread; False if one is already running."""
+        if self._reload_lock.locked():
+            return False
+        threading.Thread(target=self._reload_quietly, name="data-reload", daemon=True).start()
+        return True
+
+    def _reload_quietly(self):
+        try:
+            self.reload()
+        except Exception:
+            pass  # Logged and recorded in reload_state
+
+    def watch_sources(self, interval: float, stop: threading.Event):
+        """
+        Polls the source files every `interval` seconds and reloads once a
+        change has been stable for one full interval (so half-written files
+        are not picked up). Returns when `stop` is set.
+        """
+        loaded = current_sources()
+        pending = None
+        while not stop.wait(interval):
+            current = current_sources()
+            if current is None or current == loaded:
+                pending = None
+                continue
+            if current != pending:
+                pending = current
+                continue
+            logger.info("Source files changed; reloading data")
+            try:
+                self.reload()
+                loaded = current
+            except Exception:
+                loaded = current  # Do not retry a broken build until it changes again
+            pending = None
 
 
 # Singleton instance
-data_engine = DataEngine()
+data_engine = EngineHandle(DataEngine())
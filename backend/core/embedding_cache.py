@@ -0,0 +1,101 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class QueryEmbeddingCache:
+    """
+    Bounded LRU cache of query text -> embedding vector.
+
+    Keys are normalized (whitespace collapsed, case-folded) so trivially
+    different spellings of the same homepage query share one entry. When
+    `persist_path` is set, entries can be saved to and restored from an .npz
+    file so popular queries stay warm across restarts.
+    """
+
+    def __init__(self, max_size: int = 1024, persist_path: Optional[str] = None):
+        self.max_size = max_size
+        self.persist_path = persist_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split()).casefold()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.normalize(text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, text: str, vector: np.ndarray) -> None:
+        if self.max_size <= 0:
+            return
+        vector = np.array(vector, dtype=np.float32).reshape(-1)
+        vector.flags.writeable = False
+        key = self.normalize(text)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persist_path": self.persist_path,
+            }
+
+    def load(self) -> int:
+        """Restores entries from `persist_path`; returns how many were loaded."""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return 0
+        try:
+            with np.load(self.persist_path, allow_pickle=False) as data:
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+        except Exception as exc:
+            logger.warning("Ignoring unreadable query cache %s: %s", self.persist_path, exc)
+            return 0
+        # Stored oldest first, so replaying keeps the saved recency order.
+        for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+            self.put(key, vector)
+        logger.info("Loaded %s cached query embeddings from %s", len(self._entries), self.persist_path)
+        return len(self._entries)
+
+    def save(self) -> None:
+        if not self.persist_path:
+            return
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = list(self._entries.values())
+        if not keys:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.persist_path)), exist_ok=True)
+        tmp_path = f"{self.persist_path}.tmp.npz"
+        np.savez(tmp_path, keys=np.array(keys, dtype=str), vectors=np.stack(vectors))
+        os.replace(tmp_path, self.persist_path)
+        logger.info("Saved %s cached query embeddings to %s", len(keys), self.persist_path)
@@ -0,0 +1,79 @@
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENCODER_BACKENDS = ("torch", "onnx")
+QUANTIZATION_TARGETS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+# Queries used to compare an exported encoder with the reference model
+PARITY_QUERIES = [
+    "a heist movie with a twist ending",
+    "romantic comedy set in Paris",
+    "space exploration and the loneliness of astronauts",
+    "animated film about toys that come alive",
+    "gritty detective story in a rainy city",
+    "coming of age drama about a summer friendship",
+    "superhero team saves the world from an alien invasion",
+    "documentary about climate change",
+    "horror film in an isolated cabin in the woods",
+    "musical about a struggling jazz pianist",
+    "Inception",
+    "movies like The Godfather",
+]
+
+
+def load_encoder(model_name: str, backend: str = "torch", file_name: str | None = None):
+    """
+    Loads the query encoder as a SentenceTransformer on the given backend.
+
+    "torch" is the reference PyTorch model. "onnx" runs the model with ONNX
+    Runtime (needs `sentence-transformers[onnx]`); `file_name` selects a file
+    inside the model directory, e.g. the int8 export
+    "onnx/model_qint8_avx512_vnni.onnx" written by export_encoder.py.
+    """
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{backend}'. Expected one of {ENCODER_BACKENDS}.")
+    # Imported here: torch/transformers take seconds to import and browse traffic never needs them
+    from sentence_transformers import SentenceTransformer
+
+    model_kwargs = {"file_name": file_name} if file_name else None
+    return SentenceTransformer(model_name, trust_remote_code=True, backend=backend, model_kwargs=model_kwargs)
+
+
+def export_onnx_encoder(model_name: str, out_dir: str, quantize: str | None = None) -> str:
+    """
+    Exports `model_name` to ONNX in `out_dir` and, with `quantize` (one of
+    QUANTIZATION_TARGETS), adds an int8 dynamically quantized copy. Returns the
+    model file to serve, relative to `out_dir`.
+    """
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    model = load_encoder(model_name, backend="onnx")
+    model.save_pretrained(out_dir)
+    if not quantize:
+        return os.path.join("onnx", "model.onnx")
+    if quantize not in QUANTIZATION_TARGETS:
+        raise ValueError(f"Unknown quantization target '{quantize}'. Expected one of {QUANTIZATION_TARGETS}.")
+    export_dynamic_quantized_onnx_model(model, quantize, out_dir)
+    return os.path.join("onnx", f"model_qint8_{quantize}.onnx")
+
+
+def parity_report(reference, candidate, texts: list[str] = PARITY_QUERIES) -> dict:
+    """
+    Compares normalized query vectors of `candidate` against `reference`:
+    per-query cosine similarity and the largest absolute component difference.
+    """
+    expected = np.asarray(reference.encode(texts, normalize_embeddings=True), dtype=np.float32)
+    actual = np.asarray(candidate.encode(texts, normalize_embeddings=True), dtype=np.float32)
+    if expected.shape != actual.shape:
+        raise ValueError(f"Encoder output shapes differ: {expected.shape} vs {actual.shape}")
+    cosine = np.sum(expected * actual, axis=1)
+    return {
+        "queries": len(texts),
+        "min_cosine": float(cosine.min()),
+        "mean_cosine": float(cosine.mean()),
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+    }
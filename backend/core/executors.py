@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(RuntimeError):
+    """Raised when a pool already holds as much work as its queue limit allows."""
+
+    def __init__(self, name: str):
+        super().__init__(f"The {name} executor is saturated")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a cap on in-flight work (running + queued).
+
+    `submit` fails fast with ExecutorSaturated instead of queueing without
+    bound, so a burst of one kind of request is rejected rather than starving
+    everything else. A slot is released when the work actually finishes, even
+    if the awaiting request was cancelled.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rejected = 0
+        self.completed = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(self.name)
+            self._in_flight += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(partial(fn, *args, **kwargs)))
+
+    def _release(self, _future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+def _pool_from_env(name: str, prefix: str, workers: int, queue: int) -> BoundedExecutor:
+    return BoundedExecutor(
+        name,
+        max_workers=int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+    )
+
+
+# Model inference batches (fed by DataEngine.encode_batcher)
+embedding_executor = _pool_from_env("embedding", "EMBED", workers=1, queue=8)
+# Semantic search requests: waits on encoding, then runs the FAISS search + result materialization.
+# Needs enough workers for concurrent queries to meet in the same micro-batch.
+search_executor = _pool_from_env("search", "SEARCH", workers=16, queue=64)
+# Galaxy star queries (regions, neighbors, tiles)
+galaxy_executor = _pool_from_env("galaxy", "GALAXY", workers=4, queue=64)
+# Hybrid autocomplete (title matches topped up with semantic hits); lexical-only suggestions don't use a pool
+suggest_executor = _pool_from_env("suggest", "SUGGEST", workers=2, queue=16)
+
+EXECUTORS = {
+    "embedding": embedding_executor,
+    "search": search_executor,
+    "galaxy": galaxy_executor,
+    "suggest": suggest_executor,
+}
+
+
+def executor_stats() -> dict:
+    return {name: pool.stats() for name, pool in EXECUTORS.items()}
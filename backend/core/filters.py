@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+
+class AttributeFilters:
+    """
+    Per-attribute lookup arrays over metadata rows, built once at load.
+
+    Genres are stored as one boolean mask per genre, year/rating as typed
+    arrays and language as categorical codes, so combining filters is a few
+    vectorized comparisons. `select` returns a boolean mask over row (FAISS)
+    positions, or None when no filter is active.
+    """
+
+    def __init__(self, metadata_df: pd.DataFrame | None = None):
+        if metadata_df is None:  # filled in by from_arrays
+            return
+        self.size = len(metadata_df)
+
+        self.genre_masks: dict[str, np.ndarray] = {}
+        if "genres" in metadata_df.columns:
+            genre_lists = metadata_df["genres"].astype("string").fillna("").str.split(",")
+            pairs = pd.DataFrame({
+                "row": np.repeat(np.arange(self.size), genre_lists.str.len().to_numpy()),
+                "genre": genre_lists.explode().str.strip().str.casefold().to_numpy(),
+            })
+            for genre, rows in pairs[pairs["genre"] != ""].groupby("genre")["row"]:
+                mask = np.zeros(self.size, dtype=bool)
+                mask[rows.to_numpy()] = True
+                self.genre_masks[genre] = mask
+
+        self.year = self._numeric(metadata_df, "year", np.int32, fill=0)  # 0 = unknown
+        self.rating = self._numeric(metadata_df, "vote_average", np.float32, fill=np.nan)
+
+        self.language_codes = None
+        self.languages: dict[str, int] = {}
+        if "original_language" in metadata_df.columns:
+            codes, uniques = pd.factorize(metadata_df["original_language"].astype("string").str.casefold())
+            self.language_codes = codes.astype(np.int32)
+            self.languages = {lang: i for i, lang in enumerate(uniques)}
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Plain arrays for a serving snapshot; `from_arrays` restores them (possibly memory-mapped)."""
+        genres = sorted(self.genre_masks)
+        arrays = {
+            "genre_names": np.array(genres, dtype=str),
+            "genre_masks": np.stack([self.genre_masks[g] for g in genres]) if genres else np.zeros((0, self.size), dtype=bool),
+            "language_names": np.array(list(self.languages), dtype=str),
+        }
+        for name in ("year", "rating", "language_codes"):
+            value = getattr(self, name)
+            if value is not None:
+                arrays[name] = value
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "AttributeFilters":
+        filters = cls()
+        filters.size = arrays["genre_masks"].shape[1]
+        filters.genre_masks = {str(g): arrays["genre_masks"][i] for i, g in enumerate(arrays["genre_names"])}
+        filters.year = arrays.get("year")
+        filters.rating = arrays.get("rating")
+        filters.language_codes = arrays.get("language_codes")
+        filters.languages = {str(lang): i for i, lang in enumerate(arrays["language_names"])}
+        return filters
+
+    @staticmethod
+    def _numeric(df: pd.DataFrame, column: str, dtype, fill) -> np.ndarray | None:
+        if column not in df.columns:
+            return None
+        return pd.to_numeric(df[column], errors="coerce").fillna(fill).to_numpy(dtype=dtype)
+
+    def select(
+        self,
+        genres: list[str] | None = None,
+        year_min: int | None = None,
+        year_max: int | None = None,
+        min_rating: float | None = None,
+        languages: list[str] | None = None,
+    ) -> np.ndarray | None:
+        """Rows matching every given filter; a movie must carry all listed genres."""
+        mask = None
+
+        def narrow(condition: np.ndarray) -> None:
+            nonlocal mask
+            mask = condition if mask is None else mask & condition
+
+        empty = np.zeros(self.size, dtype=bool)
+        for genre in genres or []:
+            narrow(self.genre_masks.get(genre.strip().casefold(), empty))
+        if year_min is not None:
+            narrow(self.year >= year_min if self.year is not None else empty)
+        if year_max is not None:
+            narrow((self.year > 0) & (self.year <= year_max) if self.year is not None else empty)
+        if min_rating is not None:
+            narrow(self.rating >= min_rating if self.rating is not None else empty)
+        if languages:
+            codes = [self.languages[lang.casefold()] for lang in languages if lang.casefold() in self.languages]
+            narrow(np.isin(self.language_codes, codes) if codes else empty)
+        return mask
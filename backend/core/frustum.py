@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+
+
+class ViewCone:
+    """
+    Conservative bound of a perspective camera's view frustum, in galaxy (UMAP) units.
+
+    The cone runs along the view direction with the half-angle that reaches
+    the frustum's corners (from the vertical `fov` in degrees and the width /
+    height `aspect`), and is cut at the `far` plane. Anything inside the
+    frustum is inside the cone; the cone only adds slivers beyond the corners.
+    """
+
+    def __init__(self, position, direction, fov: float, aspect: float, far: float):
+        direction = np.asarray(direction, dtype=np.float64)
+        norm = float(np.linalg.norm(direction))
+        if not norm > 0:
+            raise ValueError("View direction must be non-zero")
+        if not 0 < fov < 180:
+            raise ValueError("fov must be between 0 and 180 degrees")
+        if not aspect > 0 or not far > 0:
+            raise ValueError("aspect and far must be positive")
+
+        self.position = np.asarray(position, dtype=np.float64)
+        self.direction = direction / norm
+        self.far = float(far)
+        self.tan_half_fov = math.tan(math.radians(fov) / 2)
+        self.half_angle = math.atan(self.tan_half_fov * math.sqrt(1 + aspect * aspect))
+        self.cos_half = math.cos(self.half_angle)
+
+    def depth(self, points: np.ndarray) -> np.ndarray:
+        """Distance along the view direction (negative behind the camera)."""
+        return (np.asarray(points, dtype=np.float64) - self.position) @ self.direction
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        offset = np.asarray(points, dtype=np.float64) - self.position
+        depth = offset @ self.direction
+        return (depth <= self.far) & (depth >= np.linalg.norm(offset, axis=1) * self.cos_half)
+
+    def intersects_spheres(self, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """Whether each bounding sphere reaches into the cone (conservative)."""
+        offset = np.asarray(centers, dtype=np.float64) - self.position
+        depth = offset @ self.direction
+        distance = np.linalg.norm(offset, axis=1)
+        safe = np.maximum(distance, 1e-12)
+        # A sphere seen at angle a from the axis reaches the cone when a - asin(r / d) <= half-angle
+        angle = np.arccos(np.clip(depth / safe, -1.0, 1.0))
+        widen = np.arcsin(np.clip(radii / safe, 0.0, 1.0))
+        in_cone = angle - widen <= self.half_angle
+        return (distance <= radii) | (in_cone & (depth - radii <= self.far))
+
+    def screen_share(self, sizes: np.ndarray, centers: np.ndarray, radii: np.ndarray) -> np.ndarray:
+        """Share of the view height an object of `sizes` covers at its bounding sphere's nearest point."""
+        distance = np.linalg.norm(np.asarray(centers, dtype=np.float64) - self.position, axis=1)
+        nearest = np.maximum(distance - radii, 1e-6)
+        return sizes / (2 * self.tan_half_fov * nearest)
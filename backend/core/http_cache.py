@@ -0,0 +1,173 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+try:
+    import brotli  # Optional: pip install brotli
+except ImportError:
+    brotli = None
+
+# Bodies are compressed once per snapshot, so spend more CPU than a per-request middleware would
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9
+# Bodies built per request and not kept get fast settings instead
+ON_DEMAND_GZIP_LEVEL = 1
+ON_DEMAND_BROTLI_QUALITY = 1
+# Below this size compression saves less than the headers cost
+MIN_COMPRESS_BYTES = 512
+# Content codings in order of preference when a client accepts several
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+class EncodedBody:
+    """One response body with its ETag and pre-compressed variants ("br", "gzip") that are smaller."""
+
+    def __init__(self, body: bytes, media_type: str, etag: str, encodings: dict[str, bytes] | None = None):
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+        self.encodings = encodings or {}
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(b) for b in self.encodings.values())
+
+    def representation(self, accept_encoding: str | None) -> tuple[bytes, str | None, str]:
+        """Body, Content-Encoding and ETag to send for an Accept-Encoding header."""
+        coding = negotiate_encoding(accept_encoding, self.encodings)
+        if coding is None:
+            return self.body, None, self.etag
+        # Each coding is its own representation, so it gets its own strong validator
+        return self.encodings[coding], coding, f'{self.etag[:-1]}-{coding}"'
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Whether an If-None-Match header names any representation of this body."""
+        if not if_none_match:
+            return False
+        base = self.etag.strip('"')
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            tag = tag.removeprefix("W/").strip('"')
+            if tag == base or any(tag == f"{base}-{coding}" for coding in self.encodings):
+                return True
+        return False
+
+    def to_files(self, path: str) -> dict:
+        """Writes the body to `path` and each coding to `path.<coding>`; returns what `from_files` needs."""
+        for suffix, data in [("", self.body)] + [(f".{coding}", data) for coding, data in self.encodings.items()]:
+            with open(f"{path}{suffix}", "wb") as f:
+                f.write(data)
+        return {"media_type": self.media_type, "etag": self.etag, "encodings": list(self.encodings)}
+
+    @classmethod
+    def from_files(cls, path: str, stored: dict) -> "EncodedBody":
+        def read(suffix: str) -> bytes:
+            with open(f"{path}{suffix}", "rb") as f:
+                return f.read()
+        encodings = {coding: read(f".{coding}") for coding in stored["encodings"]}
+        return cls(body=read(""), media_type=stored["media_type"], etag=stored["etag"], encodings=encodings)
+
+
+def encode_body(body: bytes, media_type: str, on_demand: bool = False) -> EncodedBody:
+    """
+    Hashes and compresses `body`; the ETag depends only on the bytes, so every
+    worker agrees on it. `on_demand` bodies (served once, not cached) use
+    fast compression settings.
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    encodings = {}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        gzip_level, brotli_quality = (ON_DEMAND_GZIP_LEVEL, ON_DEMAND_BROTLI_QUALITY) if on_demand else (GZIP_LEVEL, BROTLI_QUALITY)
+        candidates = {"gzip": gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+        if brotli is not None:
+            candidates["br"] = brotli.compress(body, quality=brotli_quality)
+        encodings = {coding: data for coding, data in candidates.items() if len(data) < len(body)}
+    return EncodedBody(body=body, media_type=media_type, etag=etag, encodings=encodings)
+
+
+def negotiate_encoding(accept_encoding: str | None, available) -> str | None:
+    """Preferred coding in `available` that Accept-Encoding allows (q > 0), or None for identity."""
+    if not accept_encoding or not available:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip().lower()] = q
+    for coding in PREFERRED_ENCODINGS:
+        if coding in available and weights.get(coding, weights.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class ResponseCache:
+    """
+    Encoded response bodies, least recently used evicted past `max_bytes`.
+
+    A cache belongs to one loaded engine and so to one data snapshot: a
+    reload builds a new engine with an empty cache, and nothing is ever
+    invalidated in place. Builders run outside the lock, so two requests
+    missing the same key at once may both build it; the bodies are equal.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, EncodedBody] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], EncodedBody | None]) -> EncodedBody | None:
+        """Cached body for `key`, built on a miss; None results (e.g. unknown ids) are not kept."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        entry = build()
+        if entry is not None:
+            self.put(key, entry)
+        return entry
+
+    def put(self, key: Hashable, entry: EncodedBody) -> None:
+        """Stores `entry` (e.g. a body published with the snapshot) unless it alone exceeds the budget."""
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._entries[key] = entry
+            self._bytes += entry.nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def items(self) -> list[tuple[Hashable, EncodedBody]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "brotli": brotli is not None,
+            }
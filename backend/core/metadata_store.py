@@ -0,0 +1,145 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Long text only the detail view needs; kept on disk and read per requested row on demand
+HEAVY_COLUMNS = tuple(
+    c.strip() for c in os.getenv("METADATA_HEAVY_COLUMNS", "overview,movie_cast,writers").split(",") if c.strip()
+)
+
+# Text columns with few distinct values are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrinks a metadata frame in place of Python objects: repeated strings
+    (genres, languages) become categoricals, other text becomes Arrow-backed
+    strings, and integers are downcast. Floats are kept as float64 so values
+    serialize exactly as stored.
+    """
+    out = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_integer_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            out[column] = pd.to_numeric(series, downcast="integer")
+        elif pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype):
+            if series.nunique(dropna=True) <= CATEGORY_MAX_RATIO * max(len(series), 1):
+                out[column] = series.astype("category")
+            else:
+                out[column] = series.astype(pd.StringDtype("pyarrow"))
+        else:
+            out[column] = series
+    return pd.DataFrame(out, index=df.index)
+
+
+class HeavyColumns:
+    """
+    Row-position access to heavy text columns of a Parquet file.
+
+    The file is memory-mapped and only the row groups holding requested rows
+    are decoded; of each decoded group just the requested rows are kept, in a
+    row-level LRU, so a detail page (or a page of search results) costs at
+    most one read per row group it touches and a batch spread over many row
+    groups never evicts whole groups it does not need.
+
+    Safe to share between executor threads: the cache is guarded by a lock
+    and every thread reads through its own `ParquetFile`.
+    """
+
+    def __init__(self, path: str, columns: list[str], cached_rows: int = 4096):
+        self.path = path
+        self.columns = list(columns)
+        self.cached_rows = cached_rows
+        self._local = threading.local()
+        metadata = self._reader().metadata
+        sizes = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+        self.row_group_starts = np.concatenate([[0], np.cumsum(sizes, dtype=np.int64)])
+        self._cache: OrderedDict[int, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return int(self.row_group_starts[-1])
+
+    @property
+    def max_row_group_rows(self) -> int:
+        return int(np.diff(self.row_group_starts).max(initial=0))
+
+    def _reader(self) -> pq.ParquetFile:
+        reader = getattr(self._local, "file", None)
+        if reader is None:
+            reader = self._local.file = pq.ParquetFile(self.path, memory_map=True)
+        return reader
+
+    def _read_rows(self, group: int, local: np.ndarray) -> list[tuple]:
+        """Heavy values of rows `local` (offsets within `group`); the decoded group is dropped right away."""
+        block = self._reader().read_row_group(group, columns=self.columns).take(local)
+        return list(zip(*(block.column(column).to_pylist() for column in self.columns)))
+
+    def take(self, positions: np.ndarray) -> dict[str, list]:
+        """Values of every heavy column at `positions`, in the given order (None for nulls)."""
+        positions = np.asarray(positions, dtype=np.int64)
+        if not self.columns or len(positions) == 0:
+            return {column: [None] * len(positions) for column in self.columns}
+
+        rows: dict[int, tuple] = {}
+        with self._lock:
+            for position in positions.tolist():
+                row = self._cache.get(position)
+                if row is not None:
+                    self._cache.move_to_end(position)
+                    rows[position] = row
+
+        missing = np.unique(positions[[p not in rows for p in positions.tolist()]])
+        if len(missing):
+            # Decoded outside the lock so other requests can read meanwhile
+            groups = np.searchsorted(self.row_group_starts, missing, side="right") - 1
+            for group in np.unique(groups):
+                wanted = missing[groups == group]
+                local = wanted - self.row_group_starts[group]
+                rows.update(zip(wanted.tolist(), self._read_rows(int(group), local)))
+            with self._lock:
+                for position in missing.tolist():
+                    self._cache[position] = rows[position]
+                    self._cache.move_to_end(position)
+                while len(self._cache) > self.cached_rows:
+                    self._cache.popitem(last=False)
+
+        ordered = [rows[position] for position in positions.tolist()]
+        return {column: [row[i] for row in ordered] for i, column in enumerate(self.columns)}
+
+
+def load_metadata(path: str, heavy_columns=HEAVY_COLUMNS) -> tuple[pd.DataFrame, HeavyColumns | None, list[str]]:
+    """
+    Reads the hot metadata columns into a compact frame and opens the heavy
+    ones for lazy access. Also returns the file's column order so full
+    records keep their original layout.
+    """
+    schema = pq.read_schema(path)
+    columns = [name for name in schema.names if not name.startswith("__index_level_")]
+    heavy = [c for c in columns if c in heavy_columns]
+    hot = [c for c in columns if c not in heavy]
+
+    df = compact_frame(pd.read_parquet(path, columns=hot))
+    return df, HeavyColumns(path, heavy) if heavy else None, columns
+
+
+def process_rss_bytes() -> int | None:
+    """Resident set size of this process, where the platform exposes it."""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak, KiB on Linux
+    except (ImportError, OSError):
+        return None
@@ -0,0 +1,66 @@
+import numpy as np
+
+NEIGHBOR_SPACES = ("umap", "embedding")
+
+
+def build_id_to_row(vector_ids: np.ndarray) -> np.ndarray:
+    """Dense vector_id -> row position lookup (-1 for ids without a row)."""
+    vector_ids = np.asarray(vector_ids, dtype=np.int64)
+    size = int(vector_ids.max()) + 1 if len(vector_ids) else 0
+    id_to_row = np.full(size, -1, dtype=np.int32)
+    id_to_row[vector_ids] = np.arange(len(vector_ids), dtype=np.int32)
+    return id_to_row
+
+
+def rows_for_ids(id_to_row: np.ndarray, vector_ids) -> np.ndarray:
+    """Row positions for `vector_ids`; -1 for ids that are negative, out of range or unknown."""
+    ids = np.asarray(vector_ids, dtype=np.int64)
+    inside = (ids >= 0) & (ids < len(id_to_row))
+    return np.where(inside, id_to_row[np.where(inside, ids, 0)], -1)
+
+
+class NeighborGraph:
+    """
+    Top-k neighbor lists produced by `data_scripts/neighbor_graph.py`.
+
+    Lists are re-keyed at load time to row positions into
+    `DataEngine.galaxy_full` and stored in galaxy row order, so the neighbors
+    of a star are one fixed-width slice: `neighbors(row, space, k)` does no
+    searching. Each row is nearest first and padded with -1 when a star has
+    fewer than k neighbors.
+    """
+
+    def __init__(self, path: str, id_to_row: np.ndarray, n_rows: int):
+        self.rows: dict[str, np.ndarray] = {}
+        self.scores: dict[str, np.ndarray] = {}
+        with np.load(path) as data:
+            graph_rows = rows_for_ids(id_to_row, data["vector_id"])
+            self.k = int(data["k"])
+            if (graph_rows < 0).any() or len(np.unique(graph_rows)) != n_rows:
+                raise ValueError("neighbor_graph.npz does not match galaxy_coords.parquet; rebuild the neighbor graph.")
+            for space in NEIGHBOR_SPACES:
+                if f"{space}_neighbors" not in data:
+                    continue
+                neighbor_ids = data[f"{space}_neighbors"]
+                rows = np.full((n_rows, self.k), -1, dtype=np.int32)
+                rows[graph_rows] = np.where(neighbor_ids >= 0, rows_for_ids(id_to_row, neighbor_ids), -1)
+                scores = np.zeros((n_rows, self.k), dtype=np.float16)
+                scores[graph_rows] = data[f"{space}_scores"]
+                self.rows[space] = rows
+                self.scores[space] = scores
+
+    @property
+    def spaces(self) -> list[str]:
+        return list(self.rows)
+
+    def neighbors(self, row: int, space: str, k: int) -> tuple[np.ndarray, np.ndarray] | None:
+        """
+        Up to `k` neighbor rows of galaxy row `row` with their scores (distance
+        for "umap", similarity for "embedding"), or None when the graph cannot
+        answer (space not built, or `k` above the stored k).
+        """
+        if space not in self.rows or k > self.k:
+            return None
+        rows = self.rows[space][row, :k]
+        keep = rows >= 0
+        return rows[keep].astype(np.int64), self.scores[space][row, :k][keep].astype(np.float32)
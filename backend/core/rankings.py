@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Minimum vote counts before a rating-based ranking considers a movie
+RANKING_MIN_VOTES = int(os.getenv("RANKING_MIN_VOTES", "100"))
+
+# name -> (sort columns, descending, (vote count column, minimum) or None).
+# Rankings whose first sort column is missing from metadata are skipped.
+RANKINGS: dict[str, tuple[list[str], bool, tuple[str, int] | None]] = {
+    "trending": (["popularity"], True, None),
+    "top_rated": (["vote_average", "vote_count"], True, ("vote_count", RANKING_MIN_VOTES)),
+    "imdb_top": (["imdb_rating", "imdb_votes"], True, ("imdb_votes", RANKING_MIN_VOTES)),
+    "newest": (["year", "popularity"], True, None),
+}
+
+
+def build_ranking(df: pd.DataFrame, sort_by: list[str], descending: bool, min_votes: tuple[str, int] | None) -> np.ndarray:
+    """Row positions of `df` in ranking order; missing values sort last."""
+    frame = df.reset_index(drop=True)
+    if min_votes is not None and min_votes[0] in frame.columns:
+        column, threshold = min_votes
+        frame = frame[pd.to_numeric(frame[column], errors="coerce").fillna(0) >= threshold]
+    sort_by = [c for c in sort_by if c in frame.columns]
+    ordered = frame.sort_values(by=sort_by, ascending=not descending, kind="stable", na_position="last")
+    return ordered.index.to_numpy(dtype=np.int64)
+
+
+def build_rankings(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    rankings = {}
+    for name, (sort_by, descending, min_votes) in RANKINGS.items():
+        if sort_by[0] in df.columns:
+            rankings[name] = build_ranking(df, sort_by, descending, min_votes)
+    if "trending" not in rankings:
+        # Without popularity, trending falls back to the stored order
+        rankings["trending"] = np.arange(len(df), dtype=np.int64)
+    return rankings
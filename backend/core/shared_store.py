@@ -0,0 +1,225 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+SHARED_FORMAT_VERSION = 3
+MANIFEST_NAME = "manifest.json"
+CURRENT_NAME = "CURRENT"
+LOCK_NAME = ".publish.lock"
+
+
+def faiss_mmap_flags() -> int:
+    """
+    read_index flags that map index data instead of copying it: inverted lists
+    for IVF indexes and (on FAISS builds that support it) flat vector codes.
+    Pages are then shared by every process reading the same file.
+    """
+    import faiss
+
+    flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    return flags | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+def read_index_mmap(path: str):
+    import faiss
+
+    return faiss.read_index(path, faiss_mmap_flags())
+
+
+def write_frame(df: pd.DataFrame, path: str) -> None:
+    """Writes `df` as an uncompressed Arrow IPC file, so readers can map it instead of decoding it."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = f"{path}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _arrow_strings(arrow_type: pa.DataType):
+    # Keeps string columns as Arrow arrays over the mapping instead of converting (or casting) them per process
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+
+def read_frame(path: str) -> pd.DataFrame:
+    """
+    Maps an Arrow IPC file read-only. Numeric columns without nulls and
+    string columns (as `pd.ArrowDtype` strings) are zero-copy views of the
+    mapping; the mapping stays alive as long as the returned frame
+    references it.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_arrow_strings)
+
+
+def write_array(path: str, array: np.ndarray) -> None:
+    np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def read_array(path: str) -> np.ndarray:
+    return np.load(path, mmap_mode="r", allow_pickle=False)
+
+
+class PackedBytes:
+    """
+    A sequence of byte strings held as one uint8 blob plus int64 offsets
+    (item i is blob[offsets[i]:offsets[i + 1]]). Both are plain arrays, so a
+    snapshot stores them with `write_array` and every worker maps them back
+    instead of holding one Python object per item.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    @classmethod
+    def from_list(cls, values) -> "PackedBytes":
+        lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(np.frombuffer(b"".join(values), dtype=np.uint8), offsets)
+
+    @classmethod
+    def from_strings(cls, values) -> "PackedBytes":
+        return cls.from_list([v.encode("utf-8") for v in values])
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        return self.blob[self.offsets[item]:self.offsets[item + 1]].tobytes()
+
+    def take(self, positions) -> "PackedBytes":
+        """Items at `positions`, gathered with array operations rather than per item."""
+        starts = self.offsets[:-1][positions]
+        lengths = self.offsets[1:][positions] - starts
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        index = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return PackedBytes(self.blob[index], offsets)
+
+    def to_strings(self) -> list[str]:
+        """Items decoded as UTF-8, in one pass over the blob."""
+        offsets, blob = np.ascontiguousarray(self.offsets), np.ascontiguousarray(self.blob)
+        return pa.LargeStringArray.from_buffers(len(self), pa.py_buffer(offsets), pa.py_buffer(blob)).to_pylist()
+
+    def to_arrays(self, name: str) -> dict[str, np.ndarray]:
+        return {f"{name}_blob": self.blob, f"{name}_offsets": self.offsets}
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray], name: str) -> "PackedBytes":
+        return cls(arrays[f"{name}_blob"], arrays[f"{name}_offsets"])
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Hard-links `src` into a snapshot (free on the same filesystem), copying across filesystems."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def source_fingerprint(paths: dict[str, str], optional: dict[str, str] | None = None) -> dict[str, dict] | None:
+    """
+    Size and mtime per source file; published data is stale once any of them
+    changes. None when a source is missing (e.g. a box that only received a
+    prebuilt snapshot). `optional` files are recorded as None while absent,
+    so building, rebuilding or deleting one also changes the fingerprint.
+    """
+    fingerprint = {}
+    for name, path in {**paths, **(optional or {})}.items():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if optional and name in optional:
+                fingerprint[name] = None
+                continue
+            return None
+        fingerprint[name] = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return fingerprint
+
+
+def new_version(sources: dict | None) -> str:
+    digest = hashlib.sha1(json.dumps(sources, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{digest}"
+
+
+def current_version(root: str) -> str | None:
+    try:
+        with open(os.path.join(root, CURRENT_NAME)) as f:
+            version = f.read().strip()
+    except OSError:
+        return None
+    return version if version and os.path.isdir(os.path.join(root, version)) else None
+
+
+def set_current_version(root: str, version: str, keep: int = 2) -> None:
+    """Points CURRENT at `version` and removes all but the `keep` newest snapshots."""
+    path = os.path.join(root, CURRENT_NAME)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(version)
+    os.replace(f"{path}.tmp", path)
+
+    versions = sorted(
+        name for name in os.listdir(root)
+        if os.path.isfile(os.path.join(root, name, MANIFEST_NAME))
+    )
+    for old in versions[:-keep] if keep else []:
+        if old != version:
+            # Processes still mapping files from an old snapshot keep them alive until they unmap
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+def read_manifest(directory: str) -> dict | None:
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("format_version") != SHARED_FORMAT_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(directory: str, manifest: dict) -> None:
+    # Written last and renamed into place: readers never see a manifest for partial files
+    manifest = {"format_version": SHARED_FORMAT_VERSION, "created": time.time(), **manifest}
+    path = os.path.join(directory, MANIFEST_NAME)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+@contextmanager
+def publish_lock(directory: str):
+    """
+    Exclusive lock held while one process checks and (re)publishes the shared
+    files; with `uvicorn --workers N` the first worker publishes and the rest
+    wait here, then attach.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), "w") as lock_file:
+        try:
+            import fcntl
+        except ImportError:  # No flock (Windows): single-process deployments only
+            yield
+            return
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class SpatialGrid:
+    """
+    Uniform grid over the 3D galaxy coordinates.
+
+    Points are bucketed into cubic-ish cells and stored sorted by cell key, so a
+    box or sphere query only touches the cells it overlaps instead of scanning
+    every star. Positions returned by queries are row positions into the array
+    the grid was built from, in ascending order.
+    """
+
+    def __init__(self, points: np.ndarray, target_per_cell: int = 32):
+        pts = np.ascontiguousarray(points, dtype=np.float32)
+        if pts.ndim != 2 or pts.shape[1] != 3:
+            raise ValueError(f"SpatialGrid expects an (n, 3) array, got shape {pts.shape}")
+
+        self.points = pts
+        n = len(pts)
+        if n == 0:
+            self.lo = np.zeros(3, dtype=np.float32)
+            self.hi = np.zeros(3, dtype=np.float32)
+        else:
+            self.lo = pts.min(axis=0)
+            self.hi = pts.max(axis=0)
+
+        self.resolution = max(1, int(np.ceil((max(n, 1) / max(target_per_cell, 1)) ** (1.0 / 3.0))))
+        span = np.maximum(self.hi - self.lo, 1e-6)
+        self.cell_size = (span / self.resolution).astype(np.float32)
+
+        keys = self._cell_keys(self._cell_coords(pts))
+        self.order = np.argsort(keys, kind="stable").astype(np.int64)
+        # cell_start[k]..cell_start[k + 1] is the slice of `order` holding cell k
+        self.cell_start = np.searchsorted(keys[self.order], np.arange(self.resolution ** 3 + 1))
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _cell_coords(self, pts: np.ndarray) -> np.ndarray:
+        coords = np.floor((pts - self.lo) / self.cell_size).astype(np.int64)
+        return np.clip(coords, 0, self.resolution - 1)
+
+    def _cell_keys(self, coords: np.ndarray) -> np.ndarray:
+        res = self.resolution
+        return (coords[:, 0] * res + coords[:, 1]) * res + coords[:, 2]
+
+    def _candidates_in_box(self, box_min: np.ndarray, box_max: np.ndarray) -> np.ndarray:
+        if len(self.points) == 0 or np.any(box_max < self.lo) or np.any(box_min > self.hi):
+            return np.empty(0, dtype=np.int64)
+
+        c0 = self._cell_coords(np.asarray(box_min, dtype=np.float32)[None, :])[0]
+        c1 = self._cell_coords(np.asarray(box_max, dtype=np.float32)[None, :])[0]
+
+        # Cells sharing (ix, iy) are contiguous along z, so each column is one slice.
+        ix, iy = np.meshgrid(np.arange(c0[0], c1[0] + 1), np.arange(c0[1], c1[1] + 1), indexing="ij")
+        base = (ix.ravel() * self.resolution + iy.ravel()) * self.resolution
+        starts = self.cell_start[base + c0[2]]
+        ends = self.cell_start[base + c1[2] + 1]
+
+        chunks = [self.order[s:e] for s, e in zip(starts, ends) if e > s]
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate(chunks)
+
+    def query_box(self, box_min, box_max) -> np.ndarray:
+        """Row positions of points inside the axis-aligned box (inclusive)."""
+        box_min = np.asarray(box_min, dtype=np.float32)
+        box_max = np.asarray(box_max, dtype=np.float32)
+        candidates = self._candidates_in_box(box_min, box_max)
+        pts = self.points[candidates]
+        inside = np.all((pts >= box_min) & (pts <= box_max), axis=1)
+        return np.sort(candidates[inside])
+
+    def query_sphere(self, center, radius: float) -> np.ndarray:
+        """Row positions of points within `radius` of `center` (inclusive)."""
+        center = np.asarray(center, dtype=np.float32)
+        candidates = self._candidates_in_box(center - radius, center + radius)
+        diff = self.points[candidates] - center
+        inside = np.einsum("ij,ij->i", diff, diff) <= np.float32(radius) ** 2
+        return np.sort(candidates[inside])
+
+    def nearest(self, center, k: int, exclude: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Row positions and distances of the `k` points closest to `center`,
+        nearest first, leaving out row `exclude`.
+
+        Searches a box around `center` that doubles until it holds `k` points
+        inside the inscribed sphere, so only the cells near the query are read.
+        """
+        center = np.asarray(center, dtype=np.float32)
+        available = len(self.points) - (exclude is not None)
+        k = min(k, available)
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Start at the radius expected to hold k points at the grid's mean density
+        cells = max(1.0, np.ceil((k * self.resolution ** 3 / max(len(self.points), 1)) ** (1.0 / 3.0)))
+        radius = float(self.cell_size.max()) * cells
+        while True:
+            covers_all = np.all(center - radius <= self.lo) and np.all(center + radius >= self.hi)
+            candidates = self._candidates_in_box(center - radius, center + radius)
+            if exclude is not None:
+                candidates = candidates[candidates != exclude]
+            diff = self.points[candidates] - center
+            squared = np.einsum("ij,ij->i", diff, diff)
+            # Points outside the sphere may still have closer ones in unread cells
+            if covers_all or np.count_nonzero(squared <= np.float32(radius) ** 2) >= k:
+                break
+            radius *= 2.0
+
+        nearest = np.argpartition(squared, k - 1)[:k] if k < len(squared) else np.arange(len(squared))
+        nearest = nearest[np.argsort(squared[nearest], kind="stable")]
+        return candidates[nearest].astype(np.int64), np.sqrt(squared[nearest])
@@ -0,0 +1,136 @@
+import base64
+import hashlib
+
+import numpy as np
+
+from core.frustum import ViewCone
+
+
+class GalaxyTiles:
+    """
+    Octree LOD tiles produced by `data_scripts/galaxy_tiles.py`.
+
+    Stars are stored in tile order, so every tile is one contiguous slice of
+    `rows` (row positions into `DataEngine.galaxy_full`).
+
+    Frustum queries (`visible_tiles`) send whole tiles and remember them in a
+    cursor: a bitset over tile indices, prefixed with a hash of the tile set
+    so a cursor from other tiles (after a rebuild) counts as empty.
+    """
+
+    def __init__(self, path: str, galaxy_vector_ids: np.ndarray):
+        with np.load(path) as data:
+            tile_vector_ids = data["vector_id"]
+            levels = data["tile_level"].astype(np.int64)
+            keys = data["tile_key"]
+            starts = data["tile_start"]
+            counts = data["tile_count"]
+            self.origin = data["origin"].astype(np.float64)
+            self.size = float(data["size"])
+            self.max_depth = int(data["max_depth"])
+            self.capacity = int(data["capacity"])
+
+        # Map tile vector_ids onto galaxy_full row positions.
+        sorter = np.argsort(galaxy_vector_ids, kind="stable")
+        found = np.searchsorted(galaxy_vector_ids, tile_vector_ids, sorter=sorter)
+        found = np.clip(found, 0, len(galaxy_vector_ids) - 1)
+        rows = sorter[found]
+        if not np.array_equal(galaxy_vector_ids[rows], tile_vector_ids):
+            raise ValueError("galaxy_tiles.npz references vector_ids missing from galaxy_coords.parquet; rebuild the tiles.")
+        self.rows = rows.astype(np.int64)
+
+        digest = hashlib.sha1()
+        for array in (tile_vector_ids, levels, keys, starts, counts):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        self.version = digest.hexdigest()[:12]
+
+        self._tiles: dict[tuple[int, int], tuple[int, int]] = {
+            (int(level), int(key)): (int(start), int(count))
+            for level, key, start, count in zip(levels, keys, starts, counts)
+        }
+        self._levels = levels
+        self._keys = keys
+        self._starts = starts.astype(np.int64)
+        self._counts = counts.astype(np.int64)
+        res = 2 ** levels
+        self._cells = np.stack([keys // (res * res), (keys // res) % res, keys % res], axis=1)
+        self._edges = self.size / res
+        self._centers = self.origin + (self._cells + 0.5) * self._edges[:, None]
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    @staticmethod
+    def _key(level: int, x: int, y: int, z: int) -> int:
+        res = 2 ** level
+        return (x * res + y) * res + z
+
+    def tile_rows(self, level: int, x: int, y: int, z: int) -> np.ndarray | None:
+        """Row positions for one tile, or None when the tile does not exist."""
+        if level < 0 or level > self.max_depth:
+            return None
+        res = 2 ** level
+        if not (0 <= x < res and 0 <= y < res and 0 <= z < res):
+            return None
+        span = self._tiles.get((level, self._key(level, x, y, z)))
+        if span is None:
+            return None
+        start, count = span
+        return self.rows[start:start + count]
+
+    def tile_bounds(self, level: int, x: int, y: int, z: int) -> tuple[list[float], list[float]]:
+        edge = self.size / 2 ** level
+        lo = self.origin + edge * np.array([x, y, z], dtype=np.float64)
+        return lo.tolist(), (lo + edge).tolist()
+
+    def manifest(self) -> dict:
+        return {
+            "origin": self.origin.tolist(),
+            "size": self.size,
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "tiles": np.column_stack([self._levels, self._cells, self._counts]).tolist(),
+        }
+
+    def visible_tiles(self, view: ViewCone, have: np.ndarray, limit: int, detail: float) -> tuple[np.ndarray, bool]:
+        """
+        Indices of the tiles to send for `view`, largest on screen first.
+
+        A tile is wanted when it reaches into the view and its parent covers at
+        least `detail` of the view height (level 0 always), so far regions stay
+        at coarse levels. Tiles in `have` are skipped, and whole tiles are
+        taken until they would exceed `limit` stars (at least one is sent).
+        Also returns whether that leaves no wanted tile unsent.
+        """
+        radii = self._edges * (np.sqrt(3) / 2)
+        share = view.screen_share(self._edges, self._centers, radii)
+        wanted = view.intersects_spheres(self._centers, radii) & ((self._levels == 0) | (2 * share >= detail))
+        pending = np.flatnonzero(wanted & ~have)
+        # A parent is never smaller on screen than its children, so coarse detail comes first
+        pending = pending[np.argsort(-share[pending], kind="stable")]
+        total = np.cumsum(self._counts[pending])
+        take = max(1, int(np.searchsorted(total, limit, side="right"))) if len(pending) else 0
+        return pending[:take], take == len(pending)
+
+    def rows_of_tiles(self, indices: np.ndarray) -> np.ndarray:
+        if len(indices) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.rows[start:start + count] for start, count in zip(self._starts[indices], self._counts[indices])])
+
+    def encode_cursor(self, have: np.ndarray) -> str:
+        bits = base64.urlsafe_b64encode(np.packbits(have).tobytes()).rstrip(b"=").decode("ascii")
+        return f"{self.version}.{bits}"
+
+    def decode_cursor(self, cursor: str | None) -> np.ndarray:
+        """Tiles a client already has; none for a missing cursor or one issued for other tiles."""
+        have = np.zeros(len(self._levels), dtype=bool)
+        version, _, bits = (cursor or "").partition(".")
+        if version != self.version:
+            return have
+        try:
+            packed = np.frombuffer(base64.urlsafe_b64decode(bits + "=" * (-len(bits) % 4)), dtype=np.uint8)
+        except ValueError:
+            raise ValueError("Malformed galaxy cursor") from None
+        if len(packed) != (len(have) + 7) // 8:
+            raise ValueError("Malformed galaxy cursor")
+        return np.unpackbits(packed)[:len(have)].astype(bool)
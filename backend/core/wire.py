@@ -0,0 +1,139 @@
+import struct
+
+import numpy as np
+import pandas as pd
+
+from core.shared_store import PackedBytes
+
+# Binary galaxy star format (little-endian), served for `format=binary`:
+#
+#   header   magic "MVGS", u16 version, u16 flags (0), u32 count, u32 genre_count
+#   int32    vector_id[count]
+#   float32  xyz[count * 3]              interleaved x, y, z (BufferGeometry "position")
+#   float32  vote_average[count]
+#   uint32   genre_index[count]          index into this response's genre table
+#   uint32   title_offsets[count + 1]    byte offsets into the title blob
+#   uint32   genre_offsets[genre_count + 1]
+#   bytes    title blob (UTF-8), then genre blob (UTF-8)
+#
+# Every numeric section starts on a 4-byte boundary, so clients can view them
+# as typed arrays without copying.
+STAR_MAGIC = b"MVGS"
+STAR_FORMAT_VERSION = 1
+STAR_MEDIA_TYPE = "application/x-mvg-stars"
+
+_HEADER = struct.Struct("<4sHHII")
+
+
+class StarBuffers:
+    """Columnar copies of the galaxy star fields, ready to pack into the binary format."""
+
+    def __init__(self, galaxy_serving: pd.DataFrame | None = None):
+        self._full_payload: bytes | None = None
+        if galaxy_serving is None:  # filled in by from_arrays
+            return
+        self.vector_id = galaxy_serving["vector_id"].to_numpy(dtype="<i4")
+        self.xyz = np.ascontiguousarray(galaxy_serving[["x", "y", "z"]].to_numpy(dtype="<f4"))
+        self.vote_average = galaxy_serving["vote_average"].to_numpy(dtype="<f4")
+
+        self.titles = PackedBytes.from_strings(galaxy_serving["title"])
+        codes, uniques = pd.factorize(galaxy_serving["genres"])
+        self.genre_codes = codes.astype(np.int64)
+        self.genre_values = np.array([g.encode("utf-8") for g in uniques], dtype=object)
+        self._full_payload = self.encode(None)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """Plain arrays for a serving snapshot; `from_arrays` restores them (possibly memory-mapped)."""
+        return {
+            "vector_id": self.vector_id,
+            "xyz": self.xyz,
+            "vote_average": self.vote_average,
+            "genre_codes": self.genre_codes,
+            **self.titles.to_arrays("titles"),
+            **PackedBytes.from_list(list(self.genre_values)).to_arrays("genres"),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays: dict[str, np.ndarray]) -> "StarBuffers":
+        buffers = cls()
+        buffers.vector_id = arrays["vector_id"]
+        buffers.xyz = arrays["xyz"]
+        buffers.vote_average = arrays["vote_average"]
+        buffers.titles = PackedBytes.from_arrays(arrays, "titles")
+        buffers.genre_codes = arrays["genre_codes"]
+        buffers.genre_values = np.array(PackedBytes.from_arrays(arrays, "genres")[:], dtype=object)
+        buffers._full_payload = buffers.encode(None)
+        return buffers
+
+    def __len__(self) -> int:
+        return len(self.vector_id)
+
+    def encode(self, positions: np.ndarray | None) -> bytes:
+        """Packs the stars at `positions` (row positions), or every star when None."""
+        if positions is None:
+            if self._full_payload is not None:
+                return self._full_payload
+            positions = np.arange(len(self))
+
+        ids = self.vector_id[positions]
+        xyz = self.xyz[positions]
+        votes = self.vote_average[positions]
+        titles = self.titles.take(positions)
+
+        used_codes, genre_index = np.unique(self.genre_codes[positions], return_inverse=True)
+        genres = self.genre_values[used_codes]
+
+        return b"".join([
+            _HEADER.pack(STAR_MAGIC, STAR_FORMAT_VERSION, 0, len(ids), len(genres)),
+            ids.tobytes(),
+            xyz.tobytes(),
+            votes.tobytes(),
+            genre_index.astype("<u4").tobytes(),
+            titles.offsets.astype("<u4").tobytes(),
+            _offsets(genres).tobytes(),
+            titles.blob.tobytes(),
+            b"".join(genres),
+        ])
+
+
+def _offsets(values: np.ndarray) -> np.ndarray:
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    offsets = np.zeros(len(values) + 1, dtype="<u4")
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def decode_stars(payload: bytes) -> dict[str, np.ndarray | list[str]]:
+    """Inverse of `StarBuffers.encode`, for Python clients and tests."""
+    magic, version, _, count, genre_count = _HEADER.unpack_from(payload, 0)
+    if magic != STAR_MAGIC or version != STAR_FORMAT_VERSION:
+        raise ValueError(f"Unsupported star payload (magic={magic!r}, version={version})")
+
+    offset = _HEADER.size
+
+    def take(dtype: str, n: int) -> np.ndarray:
+        nonlocal offset
+        arr = np.frombuffer(payload, dtype=dtype, count=n, offset=offset)
+        offset += arr.nbytes
+        return arr
+
+    vector_id = take("<i4", count)
+    xyz = take("<f4", count * 3).reshape(count, 3)
+    vote_average = take("<f4", count)
+    genre_index = take("<u4", count)
+    title_offsets = take("<u4", count + 1)
+    genre_offsets = take("<u4", genre_count + 1)
+
+    title_blob = payload[offset:offset + int(title_offsets[-1])]
+    offset += len(title_blob)
+    genre_blob = payload[offset:offset + int(genre_offsets[-1])]
+
+    titles = [title_blob[title_offsets[i]:title_offsets[i + 1]].decode("utf-8") for i in range(count)]
+    genre_table = [genre_blob[genre_offsets[i]:genre_offsets[i + 1]].decode("utf-8") for i in range(genre_count)]
+    return {
+        "vector_id": vector_id,
+        "xyz": xyz,
+        "vote_average": vote_average,
+        "title": titles,
+        "genres": [genre_table[i] for i in genre_index],
+    }
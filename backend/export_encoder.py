@@ -0,0 +1,54 @@
+import argparse
+import logging
+import os
+import sys
+import time
+
+from core.encoder import PARITY_QUERIES, QUANTIZATION_TARGETS, export_onnx_encoder, load_encoder, parity_report
+
+logging.basicConfig(level=logging.INFO)
+
+
+def query_latency_ms(model, texts: list[str] = PARITY_QUERIES, rounds: int = 3) -> float:
+    """Median single-query encode time, as semantic search pays it per request."""
+    model.encode(texts[:1], normalize_embeddings=True)
+    timings = []
+    for _ in range(rounds):
+        for text in texts:
+            start = time.perf_counter()
+            model.encode([text], normalize_embeddings=True)
+            timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export the query encoder to ONNX (optionally int8-quantized) and check it against the PyTorch model."
+    )
+    parser.add_argument("--model-name", default="nomic-ai/nomic-embed-text-v1.5", help="Reference SentenceTransformer model")
+    parser.add_argument("--out", required=True, help="Directory to write the exported model to")
+    parser.add_argument("--quantize", choices=QUANTIZATION_TARGETS, default=None, help="Also write an int8 model for this CPU")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="Lowest acceptable cosine similarity to the reference vectors")
+    args = parser.parse_args()
+
+    file_name = export_onnx_encoder(args.model_name, args.out, quantize=args.quantize)
+    print(f"Exported {os.path.join(args.out, file_name)}")
+
+    reference = load_encoder(args.model_name)
+    exported = load_encoder(args.out, backend="onnx", file_name=file_name)
+    report = parity_report(reference, exported)
+    report["reference_ms"] = round(query_latency_ms(reference), 2)
+    report["exported_ms"] = round(query_latency_ms(exported), 2)
+    print(f"Parity and latency: {report}")
+
+    if report["min_cosine"] < args.min_cosine:
+        print(f"Exported encoder is out of tolerance (min cosine {report['min_cosine']:.4f} < {args.min_cosine}); not using it.")
+        sys.exit(1)
+    print(
+        "Serve it with:\n"
+        f"  QUERY_ENCODER_BACKEND=onnx QUERY_ENCODER_MODEL={os.path.abspath(args.out)} QUERY_ENCODER_FILE={file_name}"
+    )
+
+
+if __name__ == "__main__":
+    main()
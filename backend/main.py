@@ -1,13 +1,20 @@
 import logging
-import math
 import os
+import secrets
+import threading
 from contextlib import asynccontextmanager
-from typing import Optional
-from fastapi import FastAPI, HTTPException
+from typing import Literal, Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-import pandas as pd
-from core.data import data_engine
+from core.autocomplete import MAX_SUGGESTIONS
+from core.data import MODEL_WARMUP, RELOAD_WATCH_SECONDS, data_engine
+from core.executors import ExecutorSaturated, executor_stats, galaxy_executor, search_executor, suggest_executor
+from core.frustum import ViewCone
+from core.http_cache import EncodedBody
+from core.wire import STAR_MEDIA_TYPE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,6 +27,10 @@ def get_cors_origins() -> list[str]:
     return origins or ["http://localhost:3000"]
 
 
+# Enables POST /api/admin/reload for callers sending this value in X-Admin-Token
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN") or None
+
+
 def require_data_ready() -> None:
     if data_engine.ready:
         return
@@ -28,63 +39,194 @@ def require_data_ready() -> None:
         detail = f"{detail} Last load error: {data_engine.load_error}"
     raise HTTPException(status_code=503, detail=detail)
 
-def clean_dict_for_json(d: dict) -> dict:
-    cleaned = {}
-    for key, val in d.items():
-        if isinstance(val, float) and math.isnan(val):
-            cleaned[key] = None
-        elif pd.isna(val):
-            cleaned[key] = None
-        else:
-            cleaned[key] = val
-    return cleaned
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    data_engine.query_cache.load()
     data_engine.load_all(strict=False)
+    if MODEL_WARMUP and data_engine.ready:
+        data_engine.start_model_warmup()
+    stop_watching = threading.Event()
+    if RELOAD_WATCH_SECONDS > 0:
+        threading.Thread(
+            target=data_engine.watch_sources,
+            args=(RELOAD_WATCH_SECONDS, stop_watching),
+            name="data-watch",
+            daemon=True,
+        ).start()
     logger.info("Application lifespan started.")
     yield
+    stop_watching.set()
+    data_engine.encode_batcher.close()
+    data_engine.search_batcher.close()
+    data_engine.query_cache.save()
     logger.info("Application shutdown.")
 
 app = FastAPI(title="Movie Vector Galaxy API", lifespan=lifespan)
 
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    logger.warning("Rejecting %s: %s", request.url.path, exc)
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_cors_origins(),
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Galaxy-Cursor", "X-Galaxy-Complete"],
 )
 
+Projection = Literal["card", "full"]
+
+class SearchFilters(BaseModel):
+    genres: Optional[list[str]] = None  # movie must have all of them
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    min_rating: Optional[float] = None
+    languages: Optional[list[str]] = None  # original_language codes, any of them
+
 class SearchQuery(BaseModel):
     query: str
     limit: int = 10
+    fields: Projection = "card"
+    filters: Optional[SearchFilters] = None
+
+class BatchSearchQuery(BaseModel):
+    searches: list[SearchQuery]
+
+class MovieBatchQuery(BaseModel):
+    vector_ids: list[int]
+    fields: Projection = "full"
+
+StarFormat = Literal["json", "binary"]
+NeighborMode = Literal["radius", "knn"]
+NeighborSpace = Literal["umap", "embedding"]
+
+# Upper bounds per batch request, so one call cannot monopolize the encoder or serialize the whole catalog
+MAX_BATCH_SEARCHES = int(os.getenv("MAX_BATCH_SEARCHES", "16"))
+MAX_BATCH_MOVIES = int(os.getenv("MAX_BATCH_MOVIES", "500"))
+# Browsers and CDNs reuse snapshot-fixed responses this long, then revalidate them with If-None-Match
+CACHE_MAX_AGE = int(os.getenv("CACHE_MAX_AGE", "300"))
+
+# Largest k for /api/galaxy/neighbors?mode=knn; the response is this many stars plus the focus star
+MAX_NEIGHBORS_K = int(os.getenv("MAX_NEIGHBORS_K", "256"))
+
+# Largest limit for /api/movies/{vector_id}/similar (FAISS allocates k-sized result arrays per search)
+MAX_SIMILAR_LIMIT = int(os.getenv("MAX_SIMILAR_LIMIT", "100"))
+
+def cached_response(request: Request, entry: EncodedBody) -> Response:
+    # Picks the pre-compressed variant the client accepts, or answers 304 when it already has the body
+    body, coding, etag = entry.representation(request.headers.get("accept-encoding"))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}", "Vary": "Accept-Encoding"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(content=body, media_type=entry.media_type, headers=headers)
 
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Movie Vector Galaxy Backend is running"}
 
+@app.get("/api/health")
+def get_health():
+    # 200 once browse endpoints are served; "state" tells whether semantic search is warm yet
+    engine = data_engine.engine
+    status = {**engine.status(), "reload": data_engine.reload_state}
+    return JSONResponse(status, status_code=200 if engine.ready else 503)
+
+@app.post("/api/admin/reload", status_code=202)
+def reload_data(x_admin_token: Optional[str] = Header(default=None)):
+    # Loads the current data files in the background and swaps them in; each worker process reloads itself
+    if ADMIN_TOKEN is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    if not data_engine.start_reload():
+        raise HTTPException(status_code=409, detail="A reload is already running")
+    return {"status": "reloading", "data_version": data_engine.data_version}
+
+@app.get("/api/stats")
+def get_stats():
+    return {
+        "query_cache": data_engine.query_cache.stats(),
+        "encode_batcher": data_engine.encode_batcher.stats(),
+        "search_batcher": data_engine.search_batcher.stats(),
+        "executors": executor_stats(),
+        "index": data_engine.index_info(),
+        "memory": data_engine.memory_info(),
+        "response_cache": data_engine.response_cache.stats(),
+    }
+
 @app.get("/api/movies/trending")
-def get_trending_movies(limit: int = 10):
+def get_trending_movies(request: Request, limit: int = 10, offset: int = 0, fields: Projection = "full"):
+    return get_ranked_movies(request, "trending", limit=limit, offset=offset, fields=fields)
+
+@app.get("/api/movies/ranked/{ranking}")
+def get_ranked_movies(request: Request, ranking: str, limit: int = 10, offset: int = 0, fields: Projection = "full"):
     require_data_ready()
     try:
-        movies = data_engine.get_trending_movies(limit=limit)
-        return {"results": [clean_dict_for_json(m) for m in movies]}
+        entry = data_engine.get_ranked_response(ranking, limit=limit, offset=offset, fields=fields)
     except Exception as e:
-        logger.error(f"Error fetching trending movies: {str(e)}")
+        logger.error(f"Error fetching {ranking} movies: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ranking '{ranking}'")
+    return cached_response(request, entry)
 
 @app.get("/api/galaxy")
-def get_galaxy_data(
+async def get_galaxy_data(
+    request: Request,
     limit: int = 20000,
     region_x: Optional[float] = None,
     region_y: Optional[float] = None,
     region_z: Optional[float] = None,
     radius: Optional[float] = None,
+    format: StarFormat = "json",
+    cam_x: Optional[float] = None,
+    cam_y: Optional[float] = None,
+    cam_z: Optional[float] = None,
+    dir_x: Optional[float] = None,
+    dir_y: Optional[float] = None,
+    dir_z: Optional[float] = None,
+    fov: float = 75.0,
+    aspect: float = 1.0,
+    far: float = 10.0,
+    cursor: Optional[str] = None,
 ):
     require_data_ready()
+    camera = (cam_x, cam_y, cam_z, dir_x, dir_y, dir_z)
+    if any(value is not None for value in camera):
+        if any(value is None for value in camera):
+            raise HTTPException(status_code=400, detail="Camera queries need cam_x/y/z and dir_x/y/z")
+        if limit <= 0:
+            raise HTTPException(status_code=400, detail="limit must be positive")
+        try:
+            view = ViewCone((cam_x, cam_y, cam_z), (dir_x, dir_y, dir_z), fov=fov, aspect=aspect, far=far)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return await get_galaxy_view(view, limit, cursor, format)
     try:
-        stars = data_engine.get_galaxy_data(
+        if region_x is None or region_y is None or region_z is None or radius is None:
+            entry = await galaxy_executor.run(data_engine.get_galaxy_response, limit=limit, fmt=format)
+            return cached_response(request, entry)
+        if format == "binary":
+            payload = await galaxy_executor.run(
+                data_engine.get_galaxy_binary,
+                limit=limit,
+                region_x=region_x,
+                region_y=region_y,
+                region_z=region_z,
+                radius=radius,
+            )
+            return Response(content=payload, media_type=STAR_MEDIA_TYPE)
+        stars = await galaxy_executor.run(
+            data_engine.get_galaxy_data,
             limit=limit,
             region_x=region_x,
             region_y=region_y,
@@ -92,36 +234,178 @@ def get_galaxy_data(
             radius=radius,
         )
         return {"count": len(stars), "stars": stars}
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Error fetching galaxy data: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+async def get_galaxy_view(view: ViewCone, limit: int, cursor: Optional[str], format: StarFormat):
+    try:
+        if format == "binary":
+            payload, cursor, complete = await galaxy_executor.run(
+                data_engine.get_galaxy_view_binary, view, limit=limit, cursor=cursor
+            )
+            headers = {"X-Galaxy-Complete": "1" if complete else "0"}
+            if cursor is not None:
+                headers["X-Galaxy-Cursor"] = cursor
+            return Response(content=payload, media_type=STAR_MEDIA_TYPE, headers=headers)
+        return await galaxy_executor.run(data_engine.get_galaxy_view, view, limit=limit, cursor=cursor)
+    except ExecutorSaturated:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching galaxy view: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/api/galaxy/neighbors")
-def get_galaxy_neighbors(vector_id: int, radius: float = 0.3):
+async def get_galaxy_neighbors(
+    vector_id: int,
+    radius: float = 0.3,
+    format: StarFormat = "json",
+    mode: NeighborMode = "radius",
+    k: int = 32,
+    space: NeighborSpace = "umap",
+):
     require_data_ready()
+    if mode == "knn" and not 0 < k <= MAX_NEIGHBORS_K:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_NEIGHBORS_K}")
+    params = dict(vector_id=vector_id, radius=radius, mode=mode, k=k, space=space)
     try:
-        neighbors = data_engine.get_neighbors_by_vector_id(vector_id=vector_id, radius=radius)
+        if format == "binary":
+            payload = await galaxy_executor.run(data_engine.get_neighbors_binary, **params)
+            return Response(content=payload, media_type=STAR_MEDIA_TYPE)
+        neighbors = await galaxy_executor.run(data_engine.get_neighbors_by_vector_id, **params)
         return {"count": len(neighbors), "stars": neighbors}
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Error fetching neighbors for {vector_id}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.get("/api/galaxy/tiles")
+def get_galaxy_tile_manifest():
+    require_data_ready()
+    manifest = data_engine.get_galaxy_tile_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Galaxy LOD tiles have not been built")
+    return manifest
+
+@app.get("/api/galaxy/tiles/{level}/{x}/{y}/{z}")
+async def get_galaxy_tile(level: int, x: int, y: int, z: int, format: StarFormat = "json"):
+    require_data_ready()
+    if data_engine.galaxy_tiles is None:
+        raise HTTPException(status_code=404, detail="Galaxy LOD tiles have not been built")
+    try:
+        payload = await galaxy_executor.run(data_engine.get_galaxy_tile_payload, level, x, y, z, fmt=format)
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching galaxy tile {level}/{x}/{y}/{z}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Tile not found")
+    return Response(content=payload, media_type=STAR_MEDIA_TYPE if format == "binary" else "application/json")
+
+@app.post("/api/movies/batch")
+def get_movies_batch(batch: MovieBatchQuery):
+    require_data_ready()
+    if len(batch.vector_ids) > MAX_BATCH_MOVIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_MOVIES} vector_ids per request")
+    try:
+        results, missing = data_engine.get_movies_by_vector_ids(batch.vector_ids, fields=batch.fields)
+    except Exception as e:
+        logger.error(f"Error fetching movie batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    return JSONResponse({"results": results, "missing": missing})
+
 @app.get("/api/movies/{vector_id}")
-def get_movie_by_id(vector_id: int):
+def get_movie_by_id(request: Request, vector_id: int):
+    require_data_ready()
+    entry = data_engine.get_movie_response(vector_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="Movie not found")
+    return cached_response(request, entry)
+
+@app.get("/api/movies/{vector_id}/similar")
+async def get_similar_movies(vector_id: int, limit: int = Query(10, ge=1, le=MAX_SIMILAR_LIMIT), fields: Projection = "card"):
     require_data_ready()
-    movie = data_engine.get_movie_by_vector_id(vector_id)
-    if not movie:
+    try:
+        results = await search_executor.run(data_engine.get_similar_movies, vector_id, k=limit, fields=fields)
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching movies similar to {vector_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    if results is None:
         raise HTTPException(status_code=404, detail="Movie not found")
-    return clean_dict_for_json(movie)
+    return JSONResponse({"vector_id": vector_id, "results": results})
+
+@app.post("/api/search/semantic/batch")
+async def search_semantic_batch(batch: BatchSearchQuery):
+    require_data_ready()
+    if not 0 < len(batch.searches) <= MAX_BATCH_SEARCHES:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_BATCH_SEARCHES} searches")
+    if any(not search.query.strip() for search in batch.searches):
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    searches = [
+        {
+            "query": search.query,
+            "k": search.limit,
+            "fields": search.fields,
+            "filters": search.filters.model_dump(exclude_none=True) if search.filters else None,
+        }
+        for search in batch.searches
+    ]
+    try:
+        results = await search_executor.run(data_engine.search_similar_batch, searches)
+        return JSONResponse({
+            "results": [{"query": search.query, "results": hits} for search, hits in zip(batch.searches, results)]
+        })
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error during batch semantic search: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error performing semantic search")
+
+@app.get("/api/search/autocomplete")
+async def search_autocomplete(
+    q: str,
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+    fields: Projection = "card",
+    mode: Literal["lexical", "hybrid"] = "lexical",
+):
+    require_data_ready()
+    if not q.strip():
+        return JSONResponse({"query": q, "results": []})
+    try:
+        if mode == "lexical":
+            # Sub-millisecond and model-free: Starlette's threadpool, never queued behind semantic searches
+            results = await run_in_threadpool(data_engine.autocomplete, q, limit=limit, fields=fields)
+        else:
+            results = await suggest_executor.run(data_engine.autocomplete, q, limit=limit, fields=fields, hybrid=True)
+        return JSONResponse({"query": q, "results": results})
+    except ExecutorSaturated:
+        raise
+    except Exception as e:
+        logger.error(f"Error during autocomplete: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error performing autocomplete")
 
 @app.post("/api/search/semantic")
-def search_semantic(query_data: SearchQuery):
+async def search_semantic(query_data: SearchQuery):
     require_data_ready()
     if not query_data.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     try:
-        results = data_engine.search_similar(query_data.query, k=query_data.limit)
-        return {"query": query_data.query, "results": [clean_dict_for_json(m) for m in results]}
+        results = await search_executor.run(
+            data_engine.search_similar, query_data.query, k=query_data.limit, fields=query_data.fields,
+            filters=query_data.filters.model_dump(exclude_none=True) if query_data.filters else None,
+        )
+        # Records are already JSON-native, so skip FastAPI's per-field encoder pass
+        return JSONResponse({"query": query_data.query, "results": results})
+    except ExecutorSaturated:
+        raise
     except Exception as e:
         logger.error(f"Error during semantic search: {str(e)}")
         raise HTTPException(status_code=500, detail="Error performing semantic search")
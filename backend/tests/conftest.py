@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+# Tests never need the real SentenceTransformer; keep app startup from loading it in the background
+os.environ.setdefault("MODEL_WARMUP", "0")
+
+
+@pytest.fixture
+def api_sources(tmp_path, monkeypatch):
+    """Small generated data set for the app's startup load, so API tests never depend on data_dev."""
+    import core.data
+    from test_data_engine import _point_engine_at, _write_sources
+
+    _write_sources(tmp_path)
+    _point_engine_at(monkeypatch, tmp_path)
+    monkeypatch.setattr(core.data, "SHARED_DATA_DIR", None)
+    return tmp_path
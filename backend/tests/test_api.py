@@ -1,6 +1,15 @@
+import threading
+
+import numpy as np
+import pytest
+
 from fastapi.testclient import TestClient
+import main
 from main import app
 from core.data import data_engine
+from core.executors import BoundedExecutor
+
+pytestmark = pytest.mark.usefixtures("api_sources")
 
 
 def test_read_root():
@@ -35,7 +44,7 @@ def test_semantic_search_success(monkeypatch):
     monkeypatch.setattr(
         data_engine,
         "search_similar",
-        lambda query, k=10: [{"vector_id": 1, "title": "Movie A", "similarity_distance": 0.91}],
+        lambda query, k=10, fields="card", filters=None: [{"vector_id": 1, "title": "Movie A", "similarity_distance": 0.91}],
     )
 
     with TestClient(app) as client:
@@ -45,3 +54,230 @@ def test_semantic_search_success(monkeypatch):
         assert payload["query"] == "mind-bending sci-fi"
         assert len(payload["results"]) == 1
         assert payload["results"][0]["vector_id"] == 1
+
+
+def test_semantic_search_passes_only_given_filters(monkeypatch):
+    monkeypatch.setattr(data_engine, "ready", True)
+    monkeypatch.setattr(data_engine, "load_error", None)
+    seen = {}
+
+    def fake_search(query, k=10, fields="card", filters=None):
+        seen["filters"] = filters
+        return []
+
+    monkeypatch.setattr(data_engine, "search_similar", fake_search)
+
+    with TestClient(app) as client:
+        response = client.post(
+            "/api/search/semantic",
+            json={"query": "heist", "filters": {"genres": ["Crime"], "year_min": 1990}},
+        )
+        assert response.status_code == 200
+        assert seen["filters"] == {"genres": ["Crime"], "year_min": 1990}
+
+
+def test_semantic_search_returns_503_when_search_pool_is_saturated(monkeypatch):
+    busy_pool = BoundedExecutor("search", max_workers=1, max_queue=0)
+    release = threading.Event()
+    busy_pool.submit(release.wait)
+    monkeypatch.setattr(main, "search_executor", busy_pool)
+
+    with TestClient(app) as client:
+        monkeypatch.setattr(data_engine, "ready", True)
+        monkeypatch.setattr(data_engine, "load_error", None)
+        response = client.post("/api/search/semantic", json={"query": "space opera", "limit": 5})
+    release.set()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_health_reports_browse_ready_until_model_is_loaded(monkeypatch):
+    monkeypatch.setattr(data_engine, "ready", True)
+    monkeypatch.setattr(data_engine, "load_error", None)
+    monkeypatch.setattr(data_engine, "model", None)
+
+    with TestClient(app) as client:
+        response = client.get("/api/health")
+        assert response.status_code == 200
+        assert response.json()["state"] == "browse_ready"
+
+        monkeypatch.setattr(data_engine, "model", object())
+        assert client.get("/api/health").json()["state"] == "search_ready"
+
+        monkeypatch.setattr(data_engine, "ready", False)
+        monkeypatch.setattr(data_engine, "load_error", "boom")
+        response = client.get("/api/health")
+        assert response.status_code == 503
+        assert response.json()["state"] == "failed"
+
+
+def test_admin_reload_requires_configured_token(monkeypatch):
+    monkeypatch.setattr(main, "ADMIN_TOKEN", None)
+    with TestClient(app) as client:
+        assert client.post("/api/admin/reload").status_code == 404
+
+        monkeypatch.setattr(main, "ADMIN_TOKEN", "secret")
+        assert client.post("/api/admin/reload", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+        started = []
+        monkeypatch.setattr(data_engine, "start_reload", lambda: started.append(True) or True)
+        response = client.post("/api/admin/reload", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 202 and started
+
+
+def test_autocomplete_matches_titles_without_the_model(monkeypatch):
+    with TestClient(app) as client:
+        monkeypatch.setattr(data_engine, "search_similar", lambda *a, **k: (_ for _ in ()).throw(AssertionError("no model")))
+        response = client.get("/api/search/autocomplete", params={"q": "movie 1", "limit": 3})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results and all(r["title"].lower().startswith("movie 1") for r in results)
+        assert set(results[0]) == set(data_engine.take_records(np.array([0]), fields="card")[0])
+
+
+def test_lexical_autocomplete_is_served_while_the_search_pool_is_saturated(monkeypatch):
+    busy_pool = BoundedExecutor("search", max_workers=1, max_queue=0)
+    release = threading.Event()
+    busy_pool.submit(release.wait)
+    monkeypatch.setattr(main, "search_executor", busy_pool)
+
+    with TestClient(app) as client:
+        response = client.get("/api/search/autocomplete", params={"q": "movie 1", "limit": 3})
+    release.set()
+
+    assert response.status_code == 200 and len(response.json()["results"]) == 3
+
+
+def test_autocomplete_rejects_out_of_range_limits():
+    with TestClient(app) as client:
+        for limit in (0, 51, 10_000_000):
+            response = client.get("/api/search/autocomplete", params={"q": "movie", "limit": limit})
+            assert response.status_code == 422
+
+
+def test_similar_movies_reject_out_of_range_limits():
+    with TestClient(app) as client:
+        for limit in (0, -3, 100_000_000):
+            assert client.get("/api/movies/5/similar", params={"limit": limit}).status_code == 422
+        response = client.get("/api/movies/5/similar", params={"limit": 3})
+        assert response.status_code == 200 and len(response.json()["results"]) == 3
+
+
+def test_autocomplete_hybrid_fills_with_semantic_hits(monkeypatch):
+    with TestClient(app) as client:
+        monkeypatch.setattr(
+            data_engine,
+            "search_similar",
+            lambda query, k=10, fields="card", filters=None: [{"vector_id": -1, "title": "Semantic pick"}],
+        )
+        response = client.get("/api/search/autocomplete", params={"q": "zzzz vibes", "limit": 3, "mode": "hybrid"})
+        assert response.status_code == 200
+        assert [r["title"] for r in response.json()["results"]] == ["Semantic pick"]
+
+
+def test_batch_endpoints_validate_and_return_in_request_order(monkeypatch):
+    with TestClient(app) as client:
+        seen = {}
+
+        def fake_batch(searches):
+            seen["searches"] = searches
+            return [[{"vector_id": i}] for i, _ in enumerate(searches)]
+
+        monkeypatch.setattr(data_engine, "search_similar_batch", fake_batch)
+        response = client.post("/api/search/semantic/batch", json={"searches": [
+            {"query": "space opera", "limit": 4},
+            {"query": "heist", "filters": {"year_min": 2000}},
+        ]})
+        assert response.status_code == 200
+        assert [r["query"] for r in response.json()["results"]] == ["space opera", "heist"]
+        assert seen["searches"][0] == {"query": "space opera", "k": 4, "fields": "card", "filters": None}
+        assert seen["searches"][1]["filters"] == {"year_min": 2000}
+        assert client.post("/api/search/semantic/batch", json={"searches": []}).status_code == 400
+        assert client.post("/api/search/semantic/batch", json={"searches": [{"query": " "}]}).status_code == 400
+
+        response = client.post("/api/movies/batch", json={"vector_ids": [5, 123456, 1], "fields": "card"})
+        assert response.status_code == 200
+        assert [m["vector_id"] for m in response.json()["results"]] == [5, 1]
+        assert response.json()["missing"] == [123456]
+        monkeypatch.setattr(main, "MAX_BATCH_MOVIES", 2)
+        assert client.post("/api/movies/batch", json={"vector_ids": [1, 2, 3]}).status_code == 400
+
+
+def test_knn_neighbors_bound_k_and_forward_the_mode(monkeypatch):
+    monkeypatch.setattr(data_engine, "ready", True)
+    monkeypatch.setattr(data_engine, "load_error", None)
+    seen = {}
+    monkeypatch.setattr(data_engine, "get_neighbors_by_vector_id", lambda **kw: seen.update(kw) or [{"vector_id": 7}])
+
+    with TestClient(app) as client:
+        assert client.get("/api/galaxy/neighbors", params={"vector_id": 7, "mode": "knn", "k": 0}).status_code == 400
+        too_many = {"vector_id": 7, "mode": "knn", "k": main.MAX_NEIGHBORS_K + 1}
+        assert client.get("/api/galaxy/neighbors", params=too_many).status_code == 400
+
+        response = client.get("/api/galaxy/neighbors", params={"vector_id": 7, "mode": "knn", "k": 12, "space": "embedding"})
+        assert response.json() == {"count": 1, "stars": [{"vector_id": 7}]}
+        assert seen == {"vector_id": 7, "radius": 0.3, "mode": "knn", "k": 12, "space": "embedding"}
+
+
+def test_galaxy_camera_queries_validate_the_view(monkeypatch):
+    monkeypatch.setattr(data_engine, "ready", True)
+    monkeypatch.setattr(data_engine, "load_error", None)
+    seen = {}
+    monkeypatch.setattr(
+        data_engine,
+        "get_galaxy_view",
+        lambda view, limit, cursor: seen.update(view=view, limit=limit, cursor=cursor) or {"count": 0, "stars": [], "cursor": "v.AA", "complete": True},
+    )
+    camera = {"cam_x": 0, "cam_y": 0, "cam_z": 5, "dir_x": 0, "dir_y": 0, "dir_z": -1}
+
+    with TestClient(app) as client:
+        assert client.get("/api/galaxy", params={"cam_x": 0, "dir_z": -1}).status_code == 400
+        assert client.get("/api/galaxy", params={**camera, "dir_z": 0}).status_code == 400
+        assert client.get("/api/galaxy", params={**camera, "fov": 200}).status_code == 400
+
+        response = client.get("/api/galaxy", params={**camera, "limit": 300, "cursor": "v.AA", "far": 4})
+        assert response.json()["cursor"] == "v.AA"
+        assert seen["limit"] == 300 and seen["cursor"] == "v.AA" and seen["view"].far == 4
+
+
+def test_movie_details_are_cached_and_revalidated(monkeypatch):
+    from core.http_cache import ResponseCache
+
+    monkeypatch.setattr(data_engine, "ready", True)
+    monkeypatch.setattr(data_engine, "load_error", None)
+    monkeypatch.setattr(data_engine, "response_cache", ResponseCache(1 << 20))
+    calls = []
+    monkeypatch.setattr(
+        data_engine,
+        "get_movie_by_vector_id",
+        lambda vector_id: calls.append(vector_id) or ({"vector_id": 3, "overview": "x" * 2000} if vector_id == 3 else None),
+    )
+
+    with TestClient(app) as client:
+        first = client.get("/api/movies/3", headers={"Accept-Encoding": "gzip"})
+        assert first.status_code == 200 and first.headers["content-encoding"] == "gzip"
+        assert first.json()["vector_id"] == 3
+        assert "max-age" in first.headers["cache-control"] and "Accept-Encoding" in first.headers["vary"]
+
+        again = client.get("/api/movies/3", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304 and again.content == b""
+        assert client.get("/api/movies/4").status_code == 404
+        assert calls == [3, 4]
+
+
+def test_only_canonical_galaxy_limits_are_cached(monkeypatch):
+    from core.http_cache import ResponseCache
+
+    with TestClient(app) as client:
+        monkeypatch.setattr(data_engine, "response_cache", ResponseCache(64 << 20))
+        for limit in (7, 8, 9):
+            response = client.get("/api/galaxy", params={"limit": limit}, headers={"Accept-Encoding": "gzip"})
+            assert response.status_code == 200 and response.json()["count"] == limit
+            assert response.headers["etag"]
+        assert data_engine.response_cache.stats()["entries"] == 0
+
+        total = len(data_engine.galaxy_serving)
+        for limit in (3000, total, total + 5):
+            assert client.get("/api/galaxy", params={"limit": limit}).status_code == 200
+        assert data_engine.response_cache.stats()["entries"] == len({min(3000, total), total})
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from core.autocomplete import TitleIndex, fold
+
+
+TITLES = pd.Series([
+    "Dark City", "The Dark Knight", "Inception", "Amélie", "The Godfather",
+    None, "The Godfather Part II", "Spider-Man: No Way Home",
+])
+POPULARITY_ORDER = np.array([1, 4, 2, 6, 7, 3, 0, 5])  # row positions, most popular first
+
+
+def _titles(positions):
+    return TITLES.to_numpy()[positions].tolist()
+
+
+def test_fold_removes_case_accents_and_punctuation():
+    assert fold("  Amélie!  ") == "amelie"
+    assert fold("Spider-Man: No_Way Home") == "spider man no way home"
+
+
+def test_prefixes_match_any_word_start_by_popularity():
+    index = TitleIndex(TITLES, POPULARITY_ORDER)
+    assert _titles(index.search("the", 5)) == ["The Dark Knight", "The Godfather", "The Godfather Part II"]
+    assert _titles(index.search("DARK", 5)) == ["The Dark Knight", "Dark City"]
+    assert _titles(index.search("incep", 5)) == ["Inception"]
+    assert _titles(index.search("amelie", 5)) == ["Amélie"]
+    assert _titles(index.search("the", 1)) == ["The Dark Knight"]
+    assert len(index.search("  ", 5)) == 0
+
+
+def test_short_prefix_memo_is_shared_across_limits():
+    index = TitleIndex(TITLES, POPULARITY_ORDER)
+    for limit in (1, 2, 3, 2):
+        assert _titles(index.search("th", limit)) == ["The Dark Knight", "The Godfather", "The Godfather Part II"][:limit]
+    assert list(index._memo) == ["th"]
+
+
+def test_typos_fall_back_to_trigram_word_matches():
+    index = TitleIndex(TITLES, POPULARITY_ORDER)
+    assert _titles(index.search("godfathr", 5)) == ["The Godfather", "The Godfather Part II"]
+    assert _titles(index.search("spiderman", 5)) == ["Spider-Man: No Way Home"]
+    assert len(index.search("xqzv", 5)) == 0
+
+
+def test_index_restored_from_arrays_answers_the_same():
+    index = TitleIndex(TITLES, POPULARITY_ORDER)
+    restored = TitleIndex.from_arrays(index.to_arrays())
+    for query in ("the", "th", "dark", "amelie", "godfathr", "spiderman"):
+        assert restored.search(query, 5).tolist() == index.search(query, 5).tolist()
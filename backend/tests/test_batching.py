@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from core.batching import MicroBatcher
+
+
+def test_concurrent_calls_are_coalesced_and_fanned_back_out():
+    batch_sizes = []
+
+    def square_all(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.01)
+        return [item * item for item in items]
+
+    batcher = MicroBatcher(square_all, max_batch_size=8, max_wait_ms=20)
+    results = {}
+    barrier = threading.Barrier(8)
+
+    def worker(n):
+        barrier.wait()
+        results[n] = batcher.run(n)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+
+    assert results == {n: n * n for n in range(8)}
+    assert sum(batch_sizes) == 8
+    assert len(batch_sizes) < 8
+    assert batcher.stats()["largest_batch"] == max(batch_sizes)
+
+
+def test_batch_errors_reach_every_caller():
+    def fail(items):
+        raise ValueError("encoder exploded")
+
+    batcher = MicroBatcher(fail, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(ValueError, match="encoder exploded"):
+        batcher.run("query")
+    batcher.close()
+
+
+def test_batch_size_one_runs_inline():
+    caller = threading.current_thread()
+    seen = []
+    batcher = MicroBatcher(lambda items: seen.append(threading.current_thread()) or items, max_batch_size=1)
+
+    assert batcher.run("x") == "x"
+    assert seen == [caller]
+
+
+def test_submit_after_close_runs_inline():
+    batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_batch_size=8, max_wait_ms=1.0)
+    assert batcher.run(1) == 2
+    batcher.close()
+    assert batcher.run(3) == 6
+    assert batcher._worker is None
+
+
+def test_executor_batches_still_coalesce_while_one_runs():
+    from core.executors import BoundedExecutor
+
+    batch_sizes = []
+
+    def slow_encode(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.05)
+        return items
+
+    pool = BoundedExecutor("test-embedding", max_workers=1, max_queue=1)
+    batcher = MicroBatcher(slow_encode, max_batch_size=32, max_wait_ms=2, executor=pool)
+    futures = []
+    for n in range(40):
+        futures.append(batcher.submit(n))
+        time.sleep(0.003)
+    assert [f.result(timeout=5) for f in futures] == list(range(40))
+    batcher.close()
+
+    assert pool.stats()["rejected"] == 0
+    assert len(batch_sizes) < 10 and max(batch_sizes) > 1
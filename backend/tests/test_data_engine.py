@@ -0,0 +1,369 @@
+import faiss
+import numpy as np
+
+from core.data import DataEngine
+
+
+def _normalized(rows, dim, seed=0):
+    vectors = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_search_params_apply_to_ivf_and_hnsw_indexes():
+    vectors = _normalized(500, 16)
+    engine = DataEngine()
+
+    ivf = faiss.index_factory(16, "IVF8,Flat", faiss.METRIC_INNER_PRODUCT)
+    ivf.train(vectors)
+    ivf.add(vectors)
+    engine.faiss_index = ivf
+    info = engine.configure_search_params(nprobe=4, ef_search=99)
+    assert info["nprobe"] == 4 and info["nlist"] == 8
+    assert "ef_search" not in info
+
+    hnsw = faiss.IndexHNSWFlat(16, 8, faiss.METRIC_INNER_PRODUCT)
+    hnsw.add(vectors)
+    engine.faiss_index = hnsw
+    assert engine.configure_search_params(nprobe=4, ef_search=99)["ef_search"] == 99
+
+
+def test_flat_index_ignores_search_params():
+    engine = DataEngine()
+    engine.faiss_index = faiss.IndexFlatIP(16)
+    assert engine.configure_search_params(nprobe=4, ef_search=99) == {"type": "IndexFlatIP", "ntotal": 0, "dim": 16}
+
+
+def test_take_records_projects_and_converts_missing_values():
+    import pandas as pd
+
+    engine = DataEngine()
+    engine.metadata_df = pd.DataFrame({
+        "vector_id": [0, 1, 2],
+        "title": ["A", None, "C"],
+        "overview": ["long text", "more", None],
+        "vote_average": [7.5, float("nan"), 6.0],
+        "year": [1999, 2005, 2010],
+    }).set_index("vector_id", drop=False)
+
+    card = engine.take_records(np.array([2, 1]), fields="card")
+    assert card == [
+        {"vector_id": 2, "title": "C", "vote_average": 6.0, "year": 2010},
+        {"vector_id": 1, "title": None, "vote_average": None, "year": 2005},
+    ]
+    assert type(card[0]["year"]) is int
+
+    assert engine.get_movie_by_vector_id(2)["overview"] is None
+    assert engine.get_movie_by_vector_id(7) is None
+
+
+def test_ranked_payload_pages_through_precomputed_and_deep_entries(monkeypatch):
+    import json
+
+    import pandas as pd
+
+    import core.data
+
+    monkeypatch.setattr(core.data, "RANKING_PRECOMPUTE", 2)
+    engine = DataEngine()
+    engine.metadata_df = pd.DataFrame({
+        "vector_id": [0, 1, 2, 3],
+        "title": ["A", "B", "C", "D"],
+        "popularity": [1.0, 4.0, 3.0, 2.0],
+    }).set_index("vector_id", drop=False)
+    engine.rankings = {"trending": np.array([1, 2, 3, 0])}
+    engine._ranking_json = {
+        ("trending", "full"): [json.dumps(r).encode() for r in engine.take_records(np.array([1, 2]))],
+    }
+
+    head = json.loads(engine.get_ranked_payload("trending", limit=2))
+    deep = json.loads(engine.get_ranked_payload("trending", limit=5, offset=1))
+
+    assert [m["title"] for m in head["results"]] == ["B", "C"]
+    assert [m["title"] for m in deep["results"]] == ["C", "D", "A"]
+    assert deep["total"] == 4 and deep["offset"] == 1
+    assert engine.get_ranked_payload("unknown") is None
+
+
+def test_similar_movies_use_stored_vectors_and_exclude_the_movie():
+    import pandas as pd
+
+    vectors = _normalized(50, 16)
+    engine = DataEngine()
+    engine.metadata_df = pd.DataFrame({
+        "vector_id": np.arange(50),
+        "title": [f"Movie {i}" for i in range(50)],
+    }).set_index("vector_id", drop=False)
+    engine.embeddings = vectors
+    engine.faiss_index = faiss.IndexFlatIP(16)
+    engine.faiss_index.add(vectors)
+    engine.search_batcher.max_batch_size = 1
+    engine._ensure_model_loaded = lambda: (_ for _ in ()).throw(AssertionError("model must not load"))
+
+    results = engine.get_similar_movies(7, k=5)
+
+    expected = np.argsort(-(vectors @ vectors[7]))[1:6]
+    assert [m["vector_id"] for m in results] == expected.tolist()
+    assert engine.get_similar_movies(999) is None
+    assert len(engine.get_similar_movies(7, k=1000)) == 49  # k is clamped to the index size
+    assert engine.get_similar_movies(7, k=0) == []
+
+
+def test_batch_search_and_bulk_lookup_match_single_calls():
+    import pandas as pd
+
+    vectors = _normalized(60, 16, seed=6)
+    engine = DataEngine()
+    engine.metadata_df = pd.DataFrame({
+        "vector_id": np.arange(60),
+        "title": [f"Movie {i}" for i in range(60)],
+        "year": np.arange(60) + 1950,
+    }).set_index("vector_id", drop=False)
+    engine.metadata_columns = ["vector_id", "title", "year"]
+    engine.faiss_index = faiss.IndexFlatIP(16)
+    engine.faiss_index.add(vectors)
+    from core.filters import AttributeFilters
+
+    engine.attribute_filters = AttributeFilters(engine.metadata_df)
+    queries = {"a": vectors[3], "b": vectors[20], "c": vectors[41]}
+    engine.embed_queries = lambda texts: np.stack([queries[t] for t in texts])
+    engine.embed_query = lambda text: queries[text][None, :]
+
+    searches = [
+        {"query": "a", "k": 3, "fields": "card"},
+        {"query": "b", "k": 5, "fields": "full", "filters": {"year_min": 1990}},
+        {"query": "c", "k": 2, "fields": "card"},
+    ]
+    batched = engine.search_similar_batch(searches)
+    assert batched == [engine.search_similar(**search) for search in searches]
+    assert all(movie["year"] >= 1990 for movie in batched[1])
+
+    records, missing = engine.get_movies_by_vector_ids([7, 999, 2, 7], fields="card")
+    assert [r["vector_id"] for r in records] == [7, 2, 7]
+    assert records[1] == engine.take_records(np.array([2]), fields="card")[0]
+    assert missing == [999]
+    engine.search_batcher.close()
+
+
+def test_filtered_search_only_returns_matching_rows_in_exact_order():
+    vectors = _normalized(400, 16, seed=3)
+    mask = np.zeros(400, dtype=bool)
+    mask[::7] = True
+    query = vectors[5]
+    expected = np.flatnonzero(mask)[np.argsort(-(vectors[mask] @ query))[:5]]
+
+    engine = DataEngine()
+    flat = faiss.IndexFlatIP(16)
+    flat.add(vectors)
+    ivf = faiss.index_factory(16, "IVF4,Flat", faiss.METRIC_INNER_PRODUCT)
+    ivf.train(vectors)
+    ivf.add(vectors)
+    for index in (flat, ivf):
+        engine.faiss_index = index
+        engine.configure_search_params(nprobe=4, ef_search=64)
+        _, indices = engine.search_vector_filtered(query, 5, mask)
+        assert indices[0].tolist() == expected.tolist()
+
+    engine.faiss_index = flat
+    assert engine.search_vector_filtered(query, 5, np.zeros(400, dtype=bool))[1].shape == (1, 0)
+
+
+def test_filtered_search_falls_back_to_expanding_k(monkeypatch):
+    vectors = _normalized(400, 16, seed=4)
+    mask = np.zeros(400, dtype=bool)
+    mask[[3, 150, 399]] = True
+    engine = DataEngine()
+    engine.faiss_index = faiss.IndexFlatIP(16)
+    engine.faiss_index.add(vectors)
+
+    def unsupported(selector):
+        raise RuntimeError("selector not supported")
+
+    monkeypatch.setattr(engine, "_selector_params", unsupported)
+    _, indices = engine.search_vector_filtered(vectors[0], 10, mask)
+    assert sorted(indices[0].tolist()) == [3, 150, 399]
+
+
+def test_truncated_quantized_index_with_rerank_matches_exact_search():
+    vectors = _normalized(600, 32, seed=5)
+    truncated = np.ascontiguousarray(vectors[:, :16])
+    truncated /= np.linalg.norm(truncated, axis=1, keepdims=True)
+    index = faiss.IndexScalarQuantizer(16, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    index.train(truncated)
+    index.add(truncated)
+
+    engine = DataEngine()
+    engine.faiss_index = index
+    engine.embeddings = vectors
+    engine.search_batcher.max_batch_size = 1
+    engine.search_rerank = 600
+    query = vectors[11]
+    expected = np.argsort(-(vectors @ query))[:5]
+
+    distances, indices = engine.search_vector(query, 5)
+    assert indices[0].tolist() == expected.tolist()
+    np.testing.assert_allclose(distances[0], (vectors @ query)[expected], rtol=1e-5)
+
+    mask = np.zeros(600, dtype=bool)
+    mask[1::3] = True
+    _, filtered = engine.search_vector_filtered(query, 3, mask)
+    assert filtered[0].tolist() == np.flatnonzero(mask)[np.argsort(-(vectors[mask] @ query))[:3]].tolist()
+
+
+def _write_sources(directory, rows=50, dim=8):
+    import pandas as pd
+
+    vectors = _normalized(rows, dim, seed=5)
+    pd.DataFrame({
+        "vector_id": np.arange(rows),
+        "title": [f"Movie {i}" for i in range(rows)],
+        "vote_average": np.linspace(4.0, 9.0, rows),
+        "popularity": np.arange(rows, dtype=float),
+        "genres": ["Drama", "Comedy, Drama"] * (rows // 2),
+        "overview": [f"Plot {i}" for i in range(rows)],
+    }).to_parquet(directory / "metadata.parquet", index=False)
+    np.save(directory / "embeddings.npy", vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    faiss.write_index(index, str(directory / "faiss_index.faiss"))
+    rng = np.random.default_rng(0)
+    pd.DataFrame({"vector_id": np.arange(rows), "x": rng.random(rows), "y": rng.random(rows), "z": rng.random(rows)}) \
+        .to_parquet(directory / "galaxy_coords.parquet", index=False)
+    return vectors
+
+
+def _point_engine_at(monkeypatch, directory):
+    import core.data as data_module
+
+    monkeypatch.setattr(data_module, "METADATA_PATH", str(directory / "metadata.parquet"))
+    monkeypatch.setattr(data_module, "FAISS_INDEX_PATH", str(directory / "faiss_index.faiss"))
+    monkeypatch.setattr(data_module, "EMBEDDINGS_PATH", str(directory / "embeddings.npy"))
+    monkeypatch.setattr(data_module, "GALAXY_COORDS_PATH", str(directory / "galaxy_coords.parquet"))
+    monkeypatch.setattr(data_module, "GALAXY_TILES_PATH", str(directory / "galaxy_tiles.npz"))
+    monkeypatch.setattr(data_module, "NEIGHBOR_GRAPH_PATH", str(directory / "neighbor_graph.npz"))
+    return data_module
+
+
+def test_workers_attach_to_published_shared_data(tmp_path, monkeypatch):
+    import pandas as pd
+
+    import core.autocomplete
+
+    vectors = _write_sources(tmp_path)
+    data_module = _point_engine_at(monkeypatch, tmp_path)
+
+    private = DataEngine()
+    private.load_all()
+
+    shared_dir = tmp_path / "shared"
+    monkeypatch.setattr(data_module, "SHARED_DATA_DIR", str(shared_dir))
+    publisher, worker = DataEngine(), DataEngine()
+    publisher.load_all()
+
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("derived structures should come from the snapshot")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(core.autocomplete, "fold_array", rebuilt)  # TitleIndex build
+        patched.setattr(data_module, "encode_body", rebuilt)  # default response bodies
+        worker.load_all()
+    assert worker.data_version == publisher.data_version  # attached, not rebuilt
+    assert len([p for p in shared_dir.iterdir() if p.is_dir()]) == 1
+    assert isinstance(worker.metadata_df["title"].dtype, pd.ArrowDtype)  # strings stay in the mapping
+
+    assert worker.get_movie_by_vector_id(7) == private.get_movie_by_vector_id(7)
+    assert worker.get_ranked_movies("trending", limit=3) == private.get_ranked_movies("trending", limit=3)
+    assert worker.get_galaxy_data() == private.get_galaxy_data()
+    assert worker.get_galaxy_binary(limit=5) == private.get_galaxy_binary(limit=5)
+    assert worker.autocomplete("mov", limit=4) == private.autocomplete("mov", limit=4)
+    assert worker.get_galaxy_response(fmt="json").encodings == private.get_galaxy_response(fmt="json").encodings
+    assert worker.search_vector(vectors[3], 4)[1].tolist() == private.search_vector(vectors[3], 4)[1].tolist()
+
+
+def test_changed_sources_publish_a_new_snapshot_version(tmp_path, monkeypatch):
+    import time
+
+    from core.shared_store import read_manifest
+
+    _write_sources(tmp_path)
+    _point_engine_at(monkeypatch, tmp_path)
+    engine = DataEngine()
+    first = engine.publish_snapshot(str(tmp_path / "shared"))
+    assert engine.publish_snapshot(str(tmp_path / "shared")) == first
+
+    time.sleep(1.1)  # versions are timestamped to the second
+    _write_sources(tmp_path)
+    second = engine.publish_snapshot(str(tmp_path / "shared"))
+    assert second != first
+    assert (tmp_path / "shared" / "CURRENT").read_text() == second
+    engine._attach_snapshot(str(tmp_path / "shared" / second))
+    assert engine.attribute_filters.select(genres=["comedy"]).sum() == 25
+    assert engine.rankings["trending"][0] == 49
+
+    # Optional derived files count as sources once present
+    time.sleep(1.1)
+    (tmp_path / "neighbor_graph.npz").write_bytes(b"graph")
+    third = engine.publish_snapshot(str(tmp_path / "shared"))
+    assert third != second
+    assert read_manifest(str(tmp_path / "shared" / third))["neighbor_graph"]
+    assert engine.publish_snapshot(str(tmp_path / "shared")) == third
+
+
+def test_reload_swaps_engines_and_in_flight_calls_finish_on_the_old_one(tmp_path, monkeypatch):
+    import pandas as pd
+
+    from core.data import EngineHandle
+
+    _write_sources(tmp_path)
+    _point_engine_at(monkeypatch, tmp_path)
+    handle = EngineHandle(DataEngine())
+    handle.load_all()
+    old_engine = handle.engine
+    pinned = handle.get_movie_by_vector_id  # bound before the reload, like a request already running
+    handle.query_cache.put("kept", np.ones(8, dtype=np.float32))
+
+    metadata = pd.read_parquet(tmp_path / "metadata.parquet")
+    metadata["title"] = "Renamed " + metadata["title"]
+    metadata.to_parquet(tmp_path / "metadata.parquet", index=False)
+    assert handle.reload()
+
+    assert handle.engine is not old_engine
+    assert handle.get_movie_by_vector_id(3)["title"] == "Renamed Movie 3"
+    assert pinned(3)["title"] == "Movie 3"
+    assert handle.query_cache.get("kept") is not None
+
+
+def test_reload_keeps_serving_when_validation_fails(tmp_path, monkeypatch):
+    import pandas as pd
+    import pytest
+
+    from core.data import EngineHandle
+
+    _write_sources(tmp_path)
+    _point_engine_at(monkeypatch, tmp_path)
+    handle = EngineHandle(DataEngine())
+    handle.load_all()
+    old_engine = handle.engine
+
+    pd.read_parquet(tmp_path / "metadata.parquet").head(10).to_parquet(tmp_path / "metadata.parquet", index=False)
+    with pytest.raises(ValueError, match="row count"):
+        handle.reload()
+    assert handle.engine is old_engine and handle.ready
+    assert handle.reload_state["state"] == "failed"
+
+
+def test_stale_neighbor_graph_is_skipped_not_fatal(tmp_path, monkeypatch):
+    _write_sources(tmp_path)
+    _point_engine_at(monkeypatch, tmp_path)
+    # Built before an incremental run added stars 40..49
+    np.savez(
+        tmp_path / "neighbor_graph.npz",
+        vector_id=np.arange(40, dtype=np.int64),
+        umap_neighbors=np.zeros((40, 2), dtype=np.int32),
+        umap_scores=np.zeros((40, 2), dtype=np.float16),
+        k=np.int64(2),
+    )
+    engine = DataEngine()
+    engine.load_all()
+
+    assert engine.ready and engine.neighbor_graph is None
+    assert len(engine.get_neighbors_by_vector_id(45, mode="knn", k=3)) == 4
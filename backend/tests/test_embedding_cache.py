@@ -0,0 +1,66 @@
+import numpy as np
+
+from core.data import DataEngine
+from core.embedding_cache import QueryEmbeddingCache
+
+
+def test_lru_evicts_least_recently_used_and_counts_lookups():
+    cache = QueryEmbeddingCache(max_size=2)
+    cache.put("a", np.ones(3))
+    cache.put("b", np.ones(3) * 2)
+    assert cache.get("a") is not None  # "a" becomes most recent
+    cache.put("c", np.ones(3) * 3)      # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("  C ") is not None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert len(cache) == 2
+
+
+def test_persisted_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "query_cache.npz")
+    cache = QueryEmbeddingCache(max_size=4, persist_path=path)
+    cache.put("Cinematic visual masterpiece", np.arange(4, dtype=np.float32))
+    cache.save()
+
+    restored = QueryEmbeddingCache(max_size=4, persist_path=path)
+    assert restored.load() == 1
+    np.testing.assert_array_equal(restored.get("cinematic  visual masterpiece"), np.arange(4))
+
+
+def test_embed_query_only_encodes_once_per_normalized_text():
+    calls = []
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            calls.append(texts)
+            return np.ones((len(texts), 4), dtype=np.float32)
+
+    engine = DataEngine()
+    engine.model = FakeModel()
+    first = engine.embed_query("Mind bending thriller")
+    second = engine.embed_query("mind bending   thriller")
+
+    assert len(calls) == 1
+    assert first.shape == second.shape == (1, 4)
+
+
+def test_embed_queries_encodes_distinct_misses_in_one_call():
+    calls = []
+
+    class FakeModel:
+        def encode(self, texts, normalize_embeddings=True):
+            calls.append(list(texts))
+            return np.stack([np.full(4, len(t), dtype=np.float32) for t in texts])
+
+    engine = DataEngine()
+    engine.model = FakeModel()
+    engine.encode_batcher.max_wait = 0.5  # Keep the window open until all misses are queued
+    engine.embed_query("cached")
+    vectors = engine.embed_queries(["space opera", "cached", "Space  Opera", "heist"])
+
+    assert calls == [["cached"], ["space opera", "heist"]]
+    assert vectors.shape == (4, 4)
+    assert vectors[:, 0].tolist() == [11, 6, 11, 5]
+    engine.encode_batcher.close()
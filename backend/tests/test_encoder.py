@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import core.data
+from core.data import DataEngine
+from core.encoder import load_encoder, parity_report
+
+
+class FakeEncoder:
+    def __init__(self, noise=0.0):
+        self.noise = noise
+
+    def encode(self, texts, normalize_embeddings=True):
+        rng = np.random.default_rng(0)
+        vectors = np.stack([np.random.default_rng(len(t)).normal(size=8) for t in texts])
+        vectors = vectors + self.noise * rng.normal(size=vectors.shape)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_parity_report_measures_drift_from_reference():
+    texts = ["one", "three", "eleven chars"]
+    same = parity_report(FakeEncoder(), FakeEncoder(), texts)
+    assert same["queries"] == 3
+    assert same["min_cosine"] == pytest.approx(1.0)
+    assert same["max_abs_diff"] == pytest.approx(0.0, abs=1e-6)
+
+    drifted = parity_report(FakeEncoder(), FakeEncoder(noise=0.5), texts)
+    assert drifted["min_cosine"] < 0.99 and drifted["max_abs_diff"] > 0.01
+
+
+def test_unknown_encoder_backend_is_rejected():
+    with pytest.raises(ValueError):
+        load_encoder("any-model", backend="tensorrt")
+
+
+def test_engine_loads_the_configured_backend(monkeypatch):
+    calls = []
+    monkeypatch.setattr(core.data, "load_encoder", lambda *args: calls.append(args) or FakeEncoder())
+    monkeypatch.setattr(core.data, "QUERY_ENCODER_FILE", "onnx/model_qint8_avx2.onnx")
+    engine = DataEngine()
+    engine.model_name, engine.encoder_backend = "/models/nomic-onnx", "onnx"
+
+    engine._ensure_model_loaded()
+    engine._ensure_model_loaded()
+
+    assert calls == [("/models/nomic-onnx", "onnx", "onnx/model_qint8_avx2.onnx")]
+    assert engine.status()["encoder_backend"] == "onnx"
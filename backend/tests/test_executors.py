@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+import pytest
+
+from core.executors import BoundedExecutor, ExecutorSaturated
+
+
+def test_submit_rejects_work_beyond_workers_plus_queue():
+    pool = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    running = pool.submit(release.wait)
+    queued = pool.submit(lambda: "queued")
+    with pytest.raises(ExecutorSaturated):
+        pool.submit(lambda: "rejected")
+    assert pool.stats()["rejected"] == 1
+
+    release.set()
+    running.result(timeout=5)
+    assert queued.result(timeout=5) == "queued"
+    assert pool.submit(lambda: "accepted again").result(timeout=5) == "accepted again"
+
+
+def test_run_awaits_result_from_pool_thread():
+    pool = BoundedExecutor("test", max_workers=2, max_queue=0)
+    caller = threading.current_thread()
+
+    result = asyncio.run(pool.run(lambda a, b=0: (threading.current_thread() is not caller, a + b), 2, b=3))
+
+    assert result == (True, 5)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+
+from core.filters import AttributeFilters
+
+
+def _filters():
+    return AttributeFilters(pd.DataFrame({
+        "genres": ["Action, Drama", "Drama", None, "Comedy,Action"],
+        "year": [1999, 2010, None, 2021],
+        "vote_average": [7.5, 6.0, 8.0, None],
+        "original_language": ["en", "FR", "en", None],
+    }))
+
+
+def test_no_filters_selects_nothing():
+    assert _filters().select() is None
+
+
+def test_genres_are_combined_and_case_insensitive():
+    filters = _filters()
+    assert np.flatnonzero(filters.select(genres=["action"])).tolist() == [0, 3]
+    assert np.flatnonzero(filters.select(genres=["Action", "Drama"])).tolist() == [0]
+    assert not filters.select(genres=["Western"]).any()
+
+
+def test_year_rating_and_language_filters():
+    filters = _filters()
+    assert np.flatnonzero(filters.select(year_max=2010)).tolist() == [0, 1]
+    assert np.flatnonzero(filters.select(year_min=2000, min_rating=5)).tolist() == [1]
+    assert np.flatnonzero(filters.select(languages=["fr", "EN"])).tolist() == [0, 1, 2]
+    assert not filters.select(languages=["de"]).any()
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data import DataEngine
+from core.frustum import ViewCone
+from core.spatial import SpatialGrid
+
+
+def test_view_cone_keeps_what_is_in_front_and_within_far():
+    view = ViewCone((0, 0, 0), (0, 0, -2), fov=90, aspect=1.0, far=10)
+    points = np.array([
+        [0, 0, -5],    # straight ahead
+        [4, 4, -5],    # near a corner (the cone reaches the corners)
+        [0, 0, 5],     # behind
+        [0, 0, -11],   # beyond the far plane
+        [9, 0, -1],    # far off to the side
+    ])
+    assert view.contains(points).tolist() == [True, True, False, False, False]
+    # A sphere overlapping the cone's edge still counts
+    assert view.intersects_spheres(np.array([[9, 0, -1], [0, 0, 20]]), np.array([8.0, 1.0])).tolist() == [True, False]
+
+    with pytest.raises(ValueError):
+        ViewCone((0, 0, 0), (0, 0, 0), fov=90, aspect=1.0, far=10)
+    with pytest.raises(ValueError):
+        ViewCone((0, 0, 0), (0, 0, -1), fov=180, aspect=1.0, far=10)
+
+
+def test_view_without_tiles_sends_the_largest_stars_on_screen():
+    engine = DataEngine()
+    coords = np.array([[0, 0, -1], [0, 0, -8], [0, 0, 3], [0.1, 0, -4]], dtype=np.float64)
+    engine.galaxy_full = pd.DataFrame({
+        "vector_id": [10, 11, 12, 13],
+        "x": coords[:, 0], "y": coords[:, 1], "z": coords[:, 2],
+        "title": ["near", "far", "behind", "bright"],
+        "vote_average": [1.0, 9.0, 9.0, 9.0],
+        "genres": [None] * 4,
+    })
+    engine.galaxy_serving = engine._build_galaxy_serving(engine.galaxy_full)
+    engine.spatial_index = SpatialGrid(coords)
+    view = ViewCone((0, 0, 0), (0, 0, -1), fov=60, aspect=1.0, far=20)
+
+    page = engine.get_galaxy_view(view, limit=2)
+    assert [s["title"] for s in page["stars"]] == ["bright", "near"]
+    assert page["cursor"] is None and page["complete"]  # nothing more to page without a cursor
+    assert engine.get_galaxy_view(view, limit=5)["count"] == 3
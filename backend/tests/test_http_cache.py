@@ -0,0 +1,44 @@
+import gzip
+
+from core.http_cache import ResponseCache, encode_body, negotiate_encoding
+
+
+def test_encoded_body_serves_compressed_variants_with_their_own_etags():
+    body = b'{"stars": [' + b", ".join(b'{"x": 1.0}' for _ in range(200)) + b"]}"
+    entry = encode_body(body, "application/json")
+
+    data, coding, etag = entry.representation("gzip, deflate")
+    assert coding == "gzip" and gzip.decompress(data) == body
+    assert etag == entry.etag[:-1] + '-gzip"'
+    assert entry.representation("identity") == (body, None, entry.etag)
+    assert entry.representation("gzip;q=0") == (body, None, entry.etag)
+
+    assert entry.matches(etag) and entry.matches(f'"other", W/{entry.etag}') and entry.matches("*")
+    assert not entry.matches('"other"') and not entry.matches(None)
+    # Same bytes, same validator: every worker hands out identical ETags
+    assert encode_body(body, "application/json").etag == entry.etag
+    assert encode_body(b"{}", "application/json").encodings == {}
+
+
+def test_negotiation_prefers_brotli_and_honours_wildcards():
+    assert negotiate_encoding("gzip, br", {"br", "gzip"}) == "br"
+    assert negotiate_encoding("gzip, br;q=0", {"br", "gzip"}) == "gzip"
+    assert negotiate_encoding("*", {"gzip"}) == "gzip"
+    assert negotiate_encoding("deflate", {"gzip"}) is None
+
+
+def test_response_cache_evicts_least_recently_used_bytes():
+    cache = ResponseCache(max_bytes=25)
+    built = []
+
+    def build(key):
+        built.append(key)
+        return encode_body(key.encode() * 10, "text/plain") if key != "missing" else None
+
+    for key in ("a", "b", "a", "c"):
+        cache.get(key, lambda key=key: build(key))
+    assert cache.get("missing", lambda: build("missing")) is None
+    cache.get("b", lambda: build("b"))
+
+    assert built == ["a", "b", "c", "missing", "b"]  # "b" was evicted to make room for "c"
+    assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 20
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from core.metadata_store import HeavyColumns, compact_frame, load_metadata
+
+
+def _write_metadata(path):
+    df = pd.DataFrame({
+        "vector_id": np.arange(10, dtype=np.int64),
+        "title": [f"Movie {i}" for i in range(10)],
+        "genres": ["Drama", "Comedy"] * 5,
+        "vote_average": np.linspace(5.0, 9.5, 10),
+        "overview": [None if i == 4 else f"Overview {i}" for i in range(10)],
+        "writers": [f"Writer {i}" for i in range(10)],
+    })
+    df.to_parquet(path, index=False, row_group_size=3)
+    return df
+
+
+def test_load_metadata_keeps_heavy_columns_on_disk(tmp_path):
+    path = tmp_path / "metadata.parquet"
+    original = _write_metadata(path)
+
+    df, heavy, columns = load_metadata(str(path), heavy_columns=("overview", "writers"))
+    assert columns == list(original.columns)
+    assert "overview" not in df.columns and "writers" not in df.columns
+    assert isinstance(df["genres"].dtype, pd.CategoricalDtype)
+    assert df["vote_average"].tolist() == original["vote_average"].tolist()
+    assert heavy.row_group_starts.tolist() == [0, 3, 6, 9, 10]
+
+    values = heavy.take(np.array([9, 4, 0, 5]))
+    assert values["overview"] == ["Overview 9", None, "Overview 0", "Overview 5"]
+    assert values["writers"] == ["Writer 9", "Writer 4", "Writer 0", "Writer 5"]
+
+
+def test_heavy_columns_cache_is_bounded(tmp_path):
+    path = tmp_path / "metadata.parquet"
+    _write_metadata(path)
+    heavy = HeavyColumns(str(path), ["overview"], cached_rows=2)
+    heavy.take(np.arange(10))
+    assert list(heavy._cache) == [8, 9]
+
+
+def test_heavy_columns_batch_spanning_many_row_groups_reads_each_group_once(tmp_path, monkeypatch):
+    path = tmp_path / "metadata.parquet"
+    n = 2000
+    pd.DataFrame({"overview": [f"Overview {i}" for i in range(n)]}).to_parquet(path, index=False, row_group_size=16)
+    heavy = HeavyColumns(str(path), ["overview"], cached_rows=500)
+    reads = []
+    read_rows = heavy._read_rows
+    monkeypatch.setattr(heavy, "_read_rows", lambda group, local: reads.append(group) or read_rows(group, local))
+
+    batch = np.random.default_rng(0).choice(n, size=500, replace=False)
+    expected = [f"Overview {i}" for i in batch]
+    assert heavy.take(batch)["overview"] == expected
+    touched = np.unique(batch // 16)
+    assert len(touched) > 100
+    assert sorted(reads) == touched.tolist()
+
+    # The whole batch fits in the cache, so repeating it decodes nothing
+    reads.clear()
+    assert heavy.take(batch[::-1])["overview"] == expected[::-1]
+    assert reads == []
+
+
+def test_heavy_columns_serve_concurrent_readers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    path = tmp_path / "metadata.parquet"
+    _write_metadata(path)
+    heavy = HeavyColumns(str(path), ["overview"], cached_rows=3)
+    expected = heavy.take(np.arange(len(heavy)))["overview"]
+    rng = np.random.default_rng(0)
+    batches = [rng.integers(0, len(heavy), size=5) for _ in range(400)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda rows: heavy.take(rows)["overview"], batches))
+    assert all(result == [expected[r] for r in rows] for rows, result in zip(batches, results))
+    assert len(heavy._cache) == 3
+
+
+def test_compact_frame_downcasts_integers_and_text():
+    df = compact_frame(pd.DataFrame({"year": np.array([1999, 2001, 2001], dtype=np.int64), "title": ["a", "b", "c"]}))
+    assert df["year"].dtype == np.int16
+    assert df["title"].tolist() == ["a", "b", "c"]
@@ -0,0 +1,103 @@
+import faiss
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.data import DataEngine
+from core.neighbors import NeighborGraph, build_id_to_row, rows_for_ids
+from core.spatial import SpatialGrid
+
+
+def _engine(n=60, dim=8, seed=0):
+    """Engine whose galaxy holds every other movie, in shuffled order."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    engine = DataEngine()
+    engine.metadata_df = pd.DataFrame({
+        "vector_id": np.arange(n),
+        "title": [f"Movie {i}" for i in range(n)],
+        "vote_average": np.full(n, 7.0),
+        "genres": ["Drama"] * n,
+    }).set_index("vector_id", drop=False)
+    engine.embeddings = vectors
+    engine.faiss_index = faiss.IndexFlatIP(dim)
+    engine.faiss_index.add(vectors)
+
+    star_ids = rng.permutation(np.arange(0, n, 2))
+    coords = rng.normal(size=(len(star_ids), 3))
+    engine.galaxy_full = pd.DataFrame({"vector_id": star_ids, "x": coords[:, 0], "y": coords[:, 1], "z": coords[:, 2]})
+    engine.galaxy_full = engine.galaxy_full.merge(engine.metadata_df.reset_index(drop=True), on="vector_id", how="left")
+    engine.galaxy_serving = engine._build_galaxy_serving(engine.galaxy_full)
+    engine.spatial_index = SpatialGrid(coords)
+    engine.galaxy_row_of = build_id_to_row(star_ids)
+    return engine, vectors, star_ids, coords
+
+
+def _write_graph(path, star_ids, coords, vectors, k):
+    # Same layout as data_scripts/neighbor_graph.py, from brute force
+    d = np.linalg.norm(coords[:, None] - coords[None], axis=2)
+    np.fill_diagonal(d, np.inf)
+    umap = np.argsort(d, axis=1, kind="stable")[:, :k]
+    sims = vectors[star_ids] @ vectors[star_ids].T
+    np.fill_diagonal(sims, -np.inf)
+    emb = np.argsort(-sims, axis=1, kind="stable")[:, :k]
+    np.savez(
+        path,
+        vector_id=star_ids.astype(np.int64),
+        umap_neighbors=star_ids[umap].astype(np.int32),
+        umap_scores=np.take_along_axis(d, umap, axis=1).astype(np.float16),
+        embedding_neighbors=star_ids[emb].astype(np.int32),
+        embedding_scores=np.take_along_axis(sims, emb, axis=1).astype(np.float16),
+        k=np.int64(k),
+    )
+
+
+def test_id_to_row_lookup_handles_unknown_ids():
+    id_to_row = build_id_to_row(np.array([4, 0, 2]))
+    np.testing.assert_array_equal(rows_for_ids(id_to_row, [0, 2, 4, 1, 5, -3]), [1, 2, 0, -1, -1, -1])
+
+
+def test_knn_graph_matches_per_request_search(tmp_path):
+    engine, vectors, star_ids, coords = _engine()
+    focus = int(star_ids[3])
+
+    for space in ("umap", "embedding"):
+        searched = engine.get_neighbors_by_vector_id(focus, mode="knn", k=5, space=space)
+        assert len(searched) == 6 and searched[0]["vector_id"] == focus
+        assert all(star["vector_id"] in set(star_ids.tolist()) for star in searched)
+
+        path = tmp_path / "neighbor_graph.npz"
+        _write_graph(path, star_ids, coords, vectors, k=8)
+        engine.neighbor_graph = NeighborGraph(str(path), engine.galaxy_row_of, len(engine.galaxy_full))
+        from_graph = engine.get_neighbors_by_vector_id(focus, mode="knn", k=5, space=space)
+        engine.neighbor_graph = None
+
+        assert [s["vector_id"] for s in from_graph] == [s["vector_id"] for s in searched]
+        np.testing.assert_allclose(
+            [s["neighbor_score"] for s in from_graph[1:]],
+            [s["neighbor_score"] for s in searched[1:]],
+            atol=1e-2,
+        )
+
+    # Movies without a star, and k beyond the stored lists (falls back to searching)
+    assert engine.get_neighbors_by_vector_id(1, mode="knn", k=5) == []
+    engine.neighbor_graph = NeighborGraph(str(path), engine.galaxy_row_of, len(engine.galaxy_full))
+    assert len(engine.get_neighbors_by_vector_id(focus, mode="knn", k=20)) == 21
+
+
+def test_neighbor_graph_rejects_a_stale_build(tmp_path):
+    engine, vectors, star_ids, coords = _engine()
+    path = tmp_path / "neighbor_graph.npz"
+    _write_graph(path, star_ids[:-1], coords[:-1], vectors, k=4)
+    with pytest.raises(ValueError, match="rebuild"):
+        NeighborGraph(str(path), engine.galaxy_row_of, len(engine.galaxy_full))
+
+
+def test_radius_mode_uses_the_id_lookup():
+    engine, _, star_ids, coords = _engine()
+    focus_row = 5
+    stars = engine.get_neighbors_by_vector_id(int(star_ids[focus_row]), radius=0.8)
+    inside = np.linalg.norm(coords - coords[focus_row], axis=1) <= 0.8
+    assert sorted(s["vector_id"] for s in stars) == sorted(star_ids[inside].tolist())
+    assert engine.get_neighbors_by_vector_id(10_000, radius=0.8) == []
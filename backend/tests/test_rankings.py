@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from core.rankings import build_ranking, build_rankings
+
+
+def _metadata():
+    return pd.DataFrame({
+        "vector_id": [10, 11, 12, 13],
+        "popularity": [5.0, np.nan, 9.0, 7.0],
+        "vote_average": [9.5, 8.0, 6.0, 7.0],
+        "vote_count": [10, 500, 800, 300],
+        "year": [2001, 2020, 2020, 1999],
+    }).set_index("vector_id", drop=False)
+
+
+def test_rankings_are_row_positions_with_missing_values_last():
+    rankings = build_rankings(_metadata())
+
+    assert rankings["trending"].tolist() == [2, 3, 0, 1]
+    assert rankings["newest"].tolist() == [2, 1, 0, 3]
+    assert "imdb_top" not in rankings
+
+
+def test_rating_rankings_require_minimum_votes():
+    order = build_ranking(_metadata(), ["vote_average"], True, ("vote_count", 100))
+    assert order.tolist() == [1, 3, 2]
+
+
+def test_trending_falls_back_to_stored_order_without_popularity():
+    assert build_rankings(pd.DataFrame({"title": ["a", "b"]}))["trending"].tolist() == [0, 1]
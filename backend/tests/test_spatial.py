@@ -0,0 +1,65 @@
+import numpy as np
+
+from core.spatial import SpatialGrid
+
+
+def _brute_sphere(points, center, radius):
+    diff = points - np.asarray(center, dtype=np.float32)
+    return np.flatnonzero((diff ** 2).sum(axis=1) <= np.float32(radius) ** 2)
+
+
+def test_sphere_query_matches_full_scan():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(5000, 3)).astype(np.float32)
+    grid = SpatialGrid(points, target_per_cell=16)
+
+    for center, radius in [((0, 0, 0), 0.5), ((1.2, -0.4, 0.3), 0.8), ((5, 5, 5), 1.0), ((0, 0, 0), 10.0)]:
+        np.testing.assert_array_equal(grid.query_sphere(center, radius), _brute_sphere(points, center, radius))
+
+
+def test_box_query_matches_full_scan():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(-3, 3, size=(3000, 3)).astype(np.float32)
+    grid = SpatialGrid(points)
+
+    box_min, box_max = np.array([-1, 0, -2], dtype=np.float32), np.array([0.5, 2, 1], dtype=np.float32)
+    expected = np.flatnonzero(np.all((points >= box_min) & (points <= box_max), axis=1))
+    np.testing.assert_array_equal(grid.query_box(box_min, box_max), expected)
+
+
+def test_empty_grid_returns_no_positions():
+    grid = SpatialGrid(np.empty((0, 3), dtype=np.float32))
+    assert len(grid.query_sphere((0, 0, 0), 1.0)) == 0
+
+
+def test_nearest_matches_full_scan():
+    rng = np.random.default_rng(2)
+    points = rng.normal(size=(4000, 3)).astype(np.float32)
+    grid = SpatialGrid(points, target_per_cell=16)
+
+    for row, k in [(0, 1), (17, 10), (999, 50), (3, 200)]:
+        diff = points - points[row]
+        squared = (diff ** 2).sum(axis=1)
+        squared[row] = np.inf
+        expected = np.argsort(squared, kind="stable")[:k]
+        rows, distances = grid.nearest(points[row], k, exclude=row)
+        np.testing.assert_array_equal(rows, expected)
+        np.testing.assert_allclose(distances, np.sqrt(squared[expected]), rtol=1e-5)
+
+    far_rows, _ = grid.nearest((40, 40, 40), 5)
+    assert len(far_rows) == 5
+    assert len(grid.nearest(points[0], 10_000, exclude=0)[0]) == len(points) - 1
+    assert len(SpatialGrid(np.empty((0, 3), dtype=np.float32)).nearest((0, 0, 0), 3)[0]) == 0
+
+
+def test_nearest_only_reads_cells_near_the_query(monkeypatch):
+    rng = np.random.default_rng(3)
+    points = rng.uniform(-10, 10, size=(20000, 3)).astype(np.float32)
+    grid = SpatialGrid(points)
+    read = []
+    candidates_in_box = grid._candidates_in_box
+    monkeypatch.setattr(grid, "_candidates_in_box", lambda lo, hi: read.append(len(out := candidates_in_box(lo, hi))) or out)
+
+    rows, _ = grid.nearest(points[42], 10, exclude=42)
+    assert len(rows) == 10 and 42 not in rows
+    assert sum(read) < len(points) // 20
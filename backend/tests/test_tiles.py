@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from core.frustum import ViewCone
+from core.tiles import GalaxyTiles
+
+
+def _write_tiles(path, vector_ids):
+    # Level 0 holds two stars; level 1 tile (1, 0, 1) holds the third.
+    np.savez(
+        path,
+        vector_id=np.asarray(vector_ids, dtype=np.int64),
+        tile_level=np.array([0, 1], dtype=np.int8),
+        tile_key=np.array([0, (1 * 2 + 0) * 2 + 1], dtype=np.int64),
+        tile_start=np.array([0, 2], dtype=np.int64),
+        tile_count=np.array([2, 1], dtype=np.int64),
+        origin=np.zeros(3),
+        size=np.float64(4.0),
+        max_depth=np.int64(1),
+        capacity=np.int64(2),
+    )
+
+
+def test_tile_rows_map_vector_ids_to_galaxy_rows(tmp_path):
+    path = tmp_path / "galaxy_tiles.npz"
+    _write_tiles(path, [30, 10, 20])
+    tiles = GalaxyTiles(str(path), np.array([10, 20, 30], dtype=np.int64))
+
+    np.testing.assert_array_equal(tiles.tile_rows(0, 0, 0, 0), [2, 0])
+    np.testing.assert_array_equal(tiles.tile_rows(1, 1, 0, 1), [1])
+    assert tiles.tile_rows(1, 0, 0, 0) is None
+    assert tiles.tile_rows(2, 0, 0, 0) is None
+    assert tiles.tile_bounds(1, 1, 0, 1) == ([2.0, 0.0, 2.0], [4.0, 2.0, 4.0])
+    assert tiles.manifest()["tiles"] == [[0, 0, 0, 0, 2], [1, 1, 0, 1, 1]]
+
+
+def test_tiles_reject_unknown_vector_ids(tmp_path):
+    path = tmp_path / "galaxy_tiles.npz"
+    _write_tiles(path, [30, 10, 99])
+    with pytest.raises(ValueError, match="rebuild"):
+        GalaxyTiles(str(path), np.array([10, 20, 30], dtype=np.int64))
+
+
+def test_visible_tiles_stream_coarse_first_and_track_the_cursor(tmp_path):
+    path = tmp_path / "galaxy_tiles.npz"
+    _write_tiles(path, [30, 10, 20])
+    tiles = GalaxyTiles(str(path), np.array([10, 20, 30], dtype=np.int64))
+    view = ViewCone((2, 2, 20), (0, 0, -1), fov=75, aspect=1.0, far=50)
+
+    have = tiles.decode_cursor(None)
+    sent, complete = tiles.visible_tiles(view, have, limit=1, detail=0.125)
+    assert sent.tolist() == [0] and not complete  # over the limit, but one tile always goes
+    have[sent] = True
+    cursor = tiles.encode_cursor(have)
+
+    have = tiles.decode_cursor(cursor)
+    sent, complete = tiles.visible_tiles(view, have, limit=1, detail=0.125)
+    np.testing.assert_array_equal(tiles.rows_of_tiles(sent), [1])
+    assert complete
+
+    # Too small on screen for its detail level, or out of view
+    assert tiles.visible_tiles(view, tiles.decode_cursor(None), limit=10, detail=0.5)[0].tolist() == [0]
+    behind = ViewCone((2, 2, 20), (0, 0, 1), fov=75, aspect=1.0, far=50)
+    sent, complete = tiles.visible_tiles(behind, tiles.decode_cursor(None), limit=10, detail=0.125)
+    assert len(sent) == 0 and complete
+
+
+def test_cursors_from_other_tiles_start_over(tmp_path):
+    path = tmp_path / "galaxy_tiles.npz"
+    _write_tiles(path, [30, 10, 20])
+    tiles = GalaxyTiles(str(path), np.array([10, 20, 30], dtype=np.int64))
+    full = tiles.encode_cursor(np.ones(2, dtype=bool))
+
+    assert tiles.decode_cursor(full).all()
+    assert not tiles.decode_cursor("0123456789ab" + full[12:]).any()
+    with pytest.raises(ValueError):
+        tiles.decode_cursor(tiles.version + ".AAAA")
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from core.wire import StarBuffers, decode_stars
+
+
+def _serving_frame():
+    return pd.DataFrame({
+        "vector_id": [0, 1, 2, 3],
+        "x": [0.0, 1.0, 2.0, 3.0],
+        "y": [0.5, 1.5, 2.5, 3.5],
+        "z": [-1.0, -2.0, -3.0, -4.0],
+        "title": ["Alpha", "Amélie", "", "Delta"],
+        "vote_average": [7.5, 0.0, 6.25, 8.0],
+        "genres": ["Drama", "Comedy, Romance", "Drama", ""],
+    })
+
+
+def test_full_payload_round_trips():
+    df = _serving_frame()
+    decoded = decode_stars(StarBuffers(df).encode(None))
+
+    np.testing.assert_array_equal(decoded["vector_id"], df["vector_id"])
+    np.testing.assert_allclose(decoded["xyz"], df[["x", "y", "z"]].to_numpy())
+    np.testing.assert_allclose(decoded["vote_average"], df["vote_average"])
+    assert decoded["title"] == df["title"].tolist()
+    assert decoded["genres"] == df["genres"].tolist()
+
+
+def test_subset_payload_only_carries_used_genres():
+    buffers = StarBuffers(_serving_frame())
+    payload = buffers.encode(np.array([2, 0]))
+    decoded = decode_stars(payload)
+
+    assert decoded["vector_id"].tolist() == [2, 0]
+    assert decoded["title"] == ["", "Alpha"]
+    assert decoded["genres"] == ["Drama", "Drama"]
+    assert b"Romance" not in payload
+
+    assert decode_stars(buffers.encode(np.empty(0, dtype=np.int64)))["title"] == []
+
+
+def test_buffers_restored_from_arrays_encode_the_same_payloads():
+    buffers = StarBuffers(_serving_frame())
+    restored = StarBuffers.from_arrays(buffers.to_arrays())
+
+    assert restored.encode(None) == buffers.encode(None)
+    assert restored.encode(np.array([3, 1])) == buffers.encode(np.array([3, 1]))
@@ -0,0 +1,25 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+# Row group size of every metadata.parquet written here. Small row groups let the API (backend
+# core/metadata_store.py HeavyColumns) read overview/cast/writers for a few movies without decoding the whole file
+METADATA_ROW_GROUP_SIZE = 16384
+
+
+@contextmanager
+def atomic_path(path: Path):
+    """
+    Yields a temporary sibling of `path` to write to, then renames it over
+    `path`. A running API server that has the old file memory-mapped keeps
+    reading the old contents instead of a half-written or truncated file, and
+    picks up the new one on its next (hot) reload.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.stem}.tmp{path.suffix}")  # keep the suffix: np.save/np.savez append one otherwise
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
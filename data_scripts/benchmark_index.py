@@ -0,0 +1,151 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from index_builder import add_index_args, build_index_from_args, rerank_candidates, truncate_vectors
+
+
+def set_search_param(index, name: str, value: int) -> None:
+    import faiss
+
+    if name == "nprobe":
+        faiss.extract_index_ivf(index).nprobe = value
+    elif name == "efSearch":
+        faiss.downcast_index(index).hnsw.efSearch = value
+
+
+def sweep_param(index) -> tuple[str | None, list[int]]:
+    import faiss
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None:
+        return "nprobe", [p for p in (1, 2, 4, 8, 16, 32, 64, 128, 256) if p <= ivf.nlist]
+    if hasattr(faiss.downcast_index(index), "hnsw"):
+        return "efSearch", [16, 32, 64, 128, 256, 512]
+    return None, [0]
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    hits = sum(len(np.intersect1d(f[f >= 0], t)) for f, t in zip(found, truth))
+    return hits / (len(truth) * k)
+
+
+def timed_search(index, queries: np.ndarray, k: int) -> tuple[np.ndarray, float, float]:
+    # Single-query latency is what an API request sees; the batched figure shows throughput headroom.
+    # Queries are cut to the index's dimension the way the server does it (--dims indexes).
+    queries = truncate_vectors(queries, index.d)
+    start = time.perf_counter()
+    for q in queries:
+        index.search(q[None, :], k)
+    single_ms = (time.perf_counter() - start) * 1000.0 / len(queries)
+
+    start = time.perf_counter()
+    _, found = index.search(queries, k)
+    batch_ms = (time.perf_counter() - start) * 1000.0 / len(queries)
+    return found, single_ms, batch_ms
+
+
+def timed_rerank(index, embeddings: np.ndarray, queries: np.ndarray, k: int, rerank: int) -> tuple[np.ndarray, float]:
+    """Top-`rerank` candidates re-scored from the embeddings memory map; per-query ms of search + re-rank."""
+    start = time.perf_counter()
+    _, candidates = index.search(truncate_vectors(queries, index.d), max(k, rerank))
+    found = rerank_candidates(embeddings, queries, candidates, k)
+    return found, (time.perf_counter() - start) * 1000.0 / len(queries)
+
+
+def run_benchmark(
+    embeddings: np.ndarray,
+    candidate,
+    n_queries: int,
+    k: int,
+    seed: int,
+    flat_index=None,
+    rerank: int = 0,
+) -> list[dict]:
+    import faiss
+
+    rng = np.random.default_rng(seed)
+    query_rows = np.sort(rng.choice(len(embeddings), size=min(n_queries, len(embeddings)), replace=False))
+    queries = np.ascontiguousarray(embeddings[query_rows], dtype=np.float32)
+
+    if flat_index is None:
+        flat_index = faiss.IndexFlatIP(embeddings.shape[1])
+        for start in range(0, len(embeddings), 65536):
+            flat_index.add(np.ascontiguousarray(embeddings[start:start + 65536], dtype=np.float32))
+
+    truth, flat_single, flat_batch = timed_search(flat_index, queries, k)
+    rows = [{"index": "flat", "param": None, "value": None, "recall": 1.0,
+             "single_ms": flat_single, "batch_ms": flat_batch}]
+
+    name, values = sweep_param(candidate)
+    for value in values:
+        if name:
+            set_search_param(candidate, name, value)
+        found, single_ms, batch_ms = timed_search(candidate, queries, k)
+        row = {"index": type(faiss.downcast_index(candidate)).__name__, "param": name,
+               "value": value if name else None, "recall": recall_at_k(found, truth),
+               "single_ms": single_ms, "batch_ms": batch_ms}
+        if rerank:
+            # What the server returns with SEARCH_RERANK: candidates re-scored from the full-precision mmap
+            reranked, rerank_ms = timed_rerank(candidate, embeddings, queries, k, rerank)
+            row.update(rerank_recall=recall_at_k(reranked, truth), rerank_ms=rerank_ms)
+        rows.append(row)
+    return rows
+
+
+def print_report(rows: list[dict], k: int) -> None:
+    reranked = any("rerank_recall" in row for row in rows)
+    header = f"{'index':<22}{'param':<12}{'value':>8}{f'recall@{k}':>12}{'ms/query':>11}{'ms/q batch':>12}"
+    print(header + (f"{'rerank recall':>15}{'ms/q batch':>12}" if reranked else ""))
+    for row in rows:
+        value = "" if row["value"] is None else row["value"]
+        line = (f"{row['index']:<22}{row['param'] or '':<12}{value:>8}{row['recall']:>12.4f}"
+                f"{row['single_ms']:>11.3f}{row['batch_ms']:>12.3f}")
+        if "rerank_recall" in row:
+            line += f"{row['rerank_recall']:>15.4f}{row['rerank_ms']:>12.3f}"
+        print(line)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recall@k vs latency of an approximate FAISS index against exact search.")
+    parser.add_argument("--data-dir", default="data_dev", help="Directory containing embeddings.npy")
+    parser.add_argument("--index-path", default=None, help="Benchmark an existing index file instead of building one")
+    parser.add_argument("--queries", type=int, default=500, help="Number of sampled embedding rows used as queries")
+    parser.add_argument("--k", type=int, default=10, help="Neighbors per query")
+    parser.add_argument("--seed", type=int, default=0, help="Query sampling seed")
+    parser.add_argument("--output", default=None, help="Optional JSON file for the report rows")
+    parser.add_argument("--rerank", type=int, default=0, help="Also report recall after re-ranking this many candidates from embeddings.npy (SEARCH_RERANK)")
+    add_index_args(parser)
+    return parser.parse_args()
+
+
+def main() -> None:
+    import faiss
+
+    args = parse_args()
+    embeddings = np.load(Path(args.data_dir) / "embeddings.npy", mmap_mode="r")
+
+    if args.index_path:
+        candidate = faiss.read_index(args.index_path)
+    else:
+        start = time.perf_counter()
+        candidate = build_index_from_args(embeddings, args)
+        print(f"Built {args.index_type} index in {time.perf_counter() - start:.1f}s")
+
+    rows = run_benchmark(embeddings, candidate, n_queries=args.queries, k=args.k, seed=args.seed, rerank=args.rerank)
+    print_report(rows, args.k)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2))
+        print(f"Saved report: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+
+def length_sorted_order(texts: list[str]) -> np.ndarray:
+    """Positions of `texts` from shortest to longest, so each batch pads to a similar length."""
+    return np.argsort(np.fromiter((len(t) for t in texts), dtype=np.int64, count=len(texts)), kind="stable")
+
+
+def texts_fingerprint(texts: list[str], model_name: str, chunk_size: int) -> str:
+    digest = hashlib.sha1(f"{model_name}\n{chunk_size}\n{len(texts)}\n".encode("utf-8"))
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def progress_path_for(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.stem}.progress.json")
+
+
+def _write_progress(path: Path, progress: dict) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(progress))
+    os.replace(tmp_path, path)
+
+
+def encode_to_memmap(
+    texts: list[str],
+    out_path: Path,
+    model_name: str,
+    batch_size: int = 128,
+    chunk_size: int = 8192,
+    workers: int = 1,
+    model=None,
+) -> np.ndarray:
+    """
+    Encodes `texts` into a preallocated memory-mapped .npy at `out_path`.
+
+    Texts are processed from shortest to longest in chunks of `chunk_size`;
+    each finished chunk is flushed and recorded in `<out>.progress.json`, so an
+    interrupted run resumes after the last finished chunk (as long as the
+    texts, model and chunk size are unchanged). With `workers > 1` batches are
+    encoded by a pool of CPU processes. Returns the (row-aligned) memmap.
+    """
+    out_path = Path(out_path)
+    progress_path = progress_path_for(out_path)
+    fingerprint = texts_fingerprint(texts, model_name, chunk_size)
+    order = length_sorted_order(texts)
+    n_chunks = -(-len(texts) // chunk_size)
+
+    done = 0
+    if out_path.exists() and progress_path.exists():
+        progress = json.loads(progress_path.read_text())
+        if progress.get("fingerprint") == fingerprint:
+            done = int(progress["chunks_done"])
+            print(f"Resuming {out_path} after chunk {done}/{n_chunks}")
+        else:
+            print(f"Inputs changed since the last run; restarting {out_path}")
+    if done >= n_chunks and out_path.exists():
+        return np.load(out_path, mmap_mode="r")
+
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(model_name, trust_remote_code=True)
+
+    if done:
+        out = np.load(out_path, mmap_mode="r+")
+    else:
+        dim = model.get_sentence_embedding_dimension()
+        out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(len(texts), dim))
+        _write_progress(progress_path, {"fingerprint": fingerprint, "chunks_done": 0, "rows": len(texts)})
+
+    pool = model.start_multi_process_pool(target_devices=["cpu"] * workers) if workers > 1 else None
+    try:
+        start = time.perf_counter()
+        encoded = 0
+        for chunk in range(done, n_chunks):
+            rows = order[chunk * chunk_size:(chunk + 1) * chunk_size]
+            chunk_texts = [texts[i] for i in rows]
+            chunk_start = time.perf_counter()
+            if pool is not None:
+                vectors = model.encode_multi_process(
+                    chunk_texts, pool, batch_size=batch_size, normalize_embeddings=True
+                )
+            else:
+                vectors = model.encode(
+                    chunk_texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True
+                )
+            out[rows] = np.asarray(vectors, dtype=np.float32)
+            out.flush()
+            _write_progress(progress_path, {"fingerprint": fingerprint, "chunks_done": chunk + 1, "rows": len(texts)})
+
+            encoded += len(rows)
+            now = time.perf_counter()
+            print(
+                f"Chunk {chunk + 1}/{n_chunks}: {len(rows) / (now - chunk_start):.1f} movies/sec "
+                f"(run average {encoded / (now - start):.1f} movies/sec)"
+            )
+    finally:
+        if pool is not None:
+            model.stop_multi_process_pool(pool)
+
+    del out
+    return np.load(out_path, mmap_mode="r")
+
+
+def add_embedding_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("Embedding")
+    group.add_argument("--chunk-size", type=int, default=8192, help="Texts per checkpointed chunk")
+    group.add_argument("--workers", type=int, default=1, help="CPU encoding processes (1 encodes in this process)")
@@ -0,0 +1,113 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from atomic_write import atomic_path
+
+
+def build_tiles(coords: np.ndarray, importance: np.ndarray, max_depth: int, capacity: int) -> dict[str, np.ndarray]:
+    """
+    Build an octree of LOD tiles over the galaxy coordinates.
+
+    Level 0 is one tile covering the whole galaxy, level L splits it into
+    2^L tiles per axis. Every star is assigned to exactly one tile: walking from
+    the root down, each tile keeps the `capacity` most important stars that no
+    coarser tile has taken yet, and the deepest level keeps whatever is left.
+    Loading a tile therefore only ever adds detail on top of its ancestors.
+    """
+    coords = np.asarray(coords, dtype=np.float64)
+    origin = coords.min(axis=0)
+    size = float((coords.max(axis=0) - origin).max()) or 1.0
+
+    # Rows in descending importance; stable sorts below keep this order within a tile.
+    remaining = np.argsort(-np.asarray(importance, dtype=np.float64), kind="stable")
+
+    rows, tile_level, tile_key, tile_start, tile_count = [], [], [], [], []
+    offset = 0
+    for level in range(max_depth + 1):
+        if len(remaining) == 0:
+            break
+        res = 2 ** level
+        cells = np.floor((coords[remaining] - origin) / size * res).astype(np.int64)
+        cells = np.clip(cells, 0, res - 1)
+        keys = (cells[:, 0] * res + cells[:, 1]) * res + cells[:, 2]
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        first = np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+        rank = np.arange(len(order)) - group_start
+        take = rank < capacity if level < max_depth else np.ones(len(order), dtype=bool)
+
+        chosen = order[take]
+        rows.append(remaining[chosen])
+        level_keys, level_counts = np.unique(keys[chosen], return_counts=True)
+        tile_level.append(np.full(len(level_keys), level, dtype=np.int8))
+        tile_key.append(level_keys)
+        tile_start.append(offset + np.r_[0, np.cumsum(level_counts)[:-1]])
+        tile_count.append(level_counts)
+        offset += len(chosen)
+
+        keep = np.ones(len(remaining), dtype=bool)
+        keep[chosen] = False
+        remaining = remaining[keep]
+
+    return {
+        "rows": np.concatenate(rows).astype(np.int64),
+        "tile_level": np.concatenate(tile_level),
+        "tile_key": np.concatenate(tile_key).astype(np.int64),
+        "tile_start": np.concatenate(tile_start).astype(np.int64),
+        "tile_count": np.concatenate(tile_count).astype(np.int64),
+        "origin": origin.astype(np.float64),
+        "size": np.float64(size),
+    }
+
+
+def create_galaxy_tiles(data_dir: Path, max_depth: int, capacity: int, rank_by: str) -> None:
+    galaxy_df = pd.read_parquet(data_dir / "galaxy_coords.parquet")
+    meta = pd.read_parquet(data_dir / "metadata.parquet", columns=["vector_id", rank_by])
+
+    importance = (
+        galaxy_df[["vector_id"]]
+        .merge(meta, on="vector_id", how="left")[rank_by]
+        .fillna(0)
+        .to_numpy(dtype=np.float64)
+    )
+    tiles = build_tiles(galaxy_df[["x", "y", "z"]].to_numpy(), importance, max_depth=max_depth, capacity=capacity)
+
+    out_path = data_dir / "galaxy_tiles.npz"
+    with atomic_path(out_path) as tmp_path:
+        np.savez(
+            tmp_path,
+            vector_id=galaxy_df["vector_id"].to_numpy(dtype=np.int64)[tiles["rows"]],
+            tile_level=tiles["tile_level"],
+            tile_key=tiles["tile_key"],
+            tile_start=tiles["tile_start"],
+            tile_count=tiles["tile_count"],
+            origin=tiles["origin"],
+            size=tiles["size"],
+            max_depth=np.int64(max_depth),
+            capacity=np.int64(capacity),
+        )
+    levels = np.bincount(tiles["tile_level"].astype(np.int64))
+    print(f"Saved LOD tiles: {out_path} stars={len(tiles['rows'])} tiles={len(tiles['tile_key'])} per_level={levels.tolist()}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute octree LOD tiles for /api/galaxy/tiles.")
+    parser.add_argument("--data-dir", default="data_dev", help="Directory containing galaxy_coords.parquet and metadata.parquet")
+    parser.add_argument("--max-depth", type=int, default=6, help="Deepest octree level (level L has 2^L tiles per axis)")
+    parser.add_argument("--tile-capacity", type=int, default=512, help="Stars kept per tile above the deepest level")
+    parser.add_argument("--rank-by", default="popularity", help="Metadata column used to pick which stars coarse tiles keep")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    create_galaxy_tiles(Path(args.data_dir), max_depth=args.max_depth, capacity=args.tile_capacity, rank_by=args.rank_by)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import argparse
+import pickle
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from atomic_write import atomic_path
+from index_builder import update_index
+
+EMBED_COPY_CHUNK = 65536
+
+
+def diff_catalog(existing: pd.DataFrame, fresh: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """
+    Merges a freshly prepared selection into the existing catalog by TMDB `id`.
+
+    Known movies keep their vector_id and take the fresh metadata; new movies
+    get vector_ids after the current last row, so vector_id stays equal to the
+    row position in metadata, embeddings and the FAISS index. Movies missing
+    from the fresh selection are kept unchanged.
+
+    Returns the merged metadata (ordered by vector_id), the vector_ids whose
+    `text_for_embedding` changed, and the vector_ids of new movies.
+    """
+    existing = existing.sort_values("vector_id").reset_index(drop=True)
+    if not np.array_equal(existing["vector_id"].to_numpy(), np.arange(len(existing))):
+        raise ValueError("Existing metadata vector_id values must be 0..n-1 (one per row).")
+
+    fresh = fresh.drop_duplicates("id").drop(columns=["vector_id"], errors="ignore")
+    vector_ids = pd.Series(existing["vector_id"].to_numpy(), index=existing["id"].to_numpy())
+    known = fresh["id"].isin(vector_ids.index).to_numpy()
+
+    updated = fresh[known].copy()
+    updated["vector_id"] = vector_ids.loc[updated["id"].to_numpy()].to_numpy()
+    previous_text = existing["text_for_embedding"].to_numpy()[updated["vector_id"].to_numpy()]
+    changed = updated["vector_id"].to_numpy()[updated["text_for_embedding"].to_numpy() != previous_text]
+
+    added = fresh[~known].copy()
+    added["vector_id"] = np.arange(len(existing), len(existing) + len(added), dtype=np.int64)
+
+    kept = existing[~existing["vector_id"].isin(updated["vector_id"])]
+    merged = pd.concat([kept, updated, added], ignore_index=True).sort_values("vector_id").reset_index(drop=True)
+    return merged, np.sort(changed).astype(np.int64), added["vector_id"].to_numpy(dtype=np.int64)
+
+
+def write_updated_embeddings(
+    embeddings_path: Path,
+    out_path: Path,
+    ids: np.ndarray,
+    vectors: np.ndarray,
+    total_rows: int,
+) -> None:
+    """
+    Writes to `out_path` a copy of embeddings.npy with rows `ids` replaced or
+    appended, copying the unchanged rows from the memory-mapped old file in
+    chunks.
+    """
+    old = np.load(embeddings_path, mmap_mode="r")
+    out = np.lib.format.open_memmap(out_path, mode="w+", dtype=np.float32, shape=(total_rows, old.shape[1]))
+    for start in range(0, len(old), EMBED_COPY_CHUNK):
+        stop = min(start + EMBED_COPY_CHUNK, len(old))
+        out[start:stop] = old[start:stop]
+    out[ids] = vectors
+    out.flush()
+    del out
+    del old
+
+
+def place_galaxy_stars(data_dir: Path, ids: np.ndarray, vectors: np.ndarray) -> pd.DataFrame | None:
+    """
+    galaxy_coords.parquet contents with changed/new movies placed by the UMAP
+    reducer fitted by subset.py (`transform`, no refit). None when there is no
+    galaxy or no saved reducer to place stars with.
+    """
+    from subset import UMAP_MODEL_NAME, transform_galaxy_coords
+
+    coords_path = data_dir / "galaxy_coords.parquet"
+    model_path = data_dir / UMAP_MODEL_NAME
+    if not coords_path.exists():
+        return None
+    if not model_path.exists():
+        print(f"No {UMAP_MODEL_NAME} in {data_dir}; rerun subset.py to place new movies in the galaxy.")
+        return None
+
+    with open(model_path, "rb") as f:
+        umap_model = pickle.load(f)
+    coords = transform_galaxy_coords(umap_model, vectors)
+
+    galaxy_df = pd.read_parquet(coords_path)
+    placed = pd.DataFrame({"vector_id": ids, "x": coords[:, 0], "y": coords[:, 1], "z": coords[:, 2]})
+    galaxy_df = pd.concat([galaxy_df[~galaxy_df["vector_id"].isin(ids)], placed], ignore_index=True)
+    return galaxy_df.sort_values("vector_id").reset_index(drop=True)
+
+
+def update_outputs(
+    fresh_df: pd.DataFrame,
+    out_dir: Path,
+    model_name: str,
+    batch_size: int,
+    row_group_size: int,
+) -> dict:
+    """
+    Incremental counterpart of movies.py save_outputs: embeds only new or
+    changed movies and patches embeddings.npy, the FAISS index, galaxy
+    coordinates, LOD tiles and the neighbor graph instead of rebuilding them.
+
+    Everything that can fail (embedding, the index update, galaxy placement)
+    runs before any file is touched, and embeddings, index, galaxy and
+    metadata are then renamed into place together, so a failed run never
+    leaves them with different row counts.
+    """
+    import faiss
+
+    from movies import build_natural_text, generate_embeddings
+
+    metadata_path = out_dir / "metadata.parquet"
+    embeddings_path = out_dir / "embeddings.npy"
+    faiss_path = out_dir / "faiss_index.faiss"
+
+    existing = pd.read_parquet(metadata_path)
+    if "text_for_embedding" not in existing.columns:
+        existing["text_for_embedding"] = existing.apply(build_natural_text, axis=1)
+    merged, changed, added = diff_catalog(existing, fresh_df)
+    ids = np.concatenate([changed, added])
+    report = {"rows": len(merged), "changed": len(changed), "added": len(added)}
+    print(f"Catalog diff: {report}")
+
+    galaxy_df = None
+    if len(ids):
+        start = time.perf_counter()
+        texts = merged["text_for_embedding"].to_numpy()[ids].tolist()
+        vectors = generate_embeddings(texts, model_name=model_name, batch_size=batch_size)
+        report["embed_seconds"] = round(time.perf_counter() - start, 1)
+
+        index = faiss.read_index(str(faiss_path))
+        update_index(index, ids, vectors)
+        galaxy_df = place_galaxy_stars(out_dir, ids, vectors)
+    report["galaxy_updated"] = galaxy_df is not None
+
+    # Each output is staged in a temporary sibling; all are renamed over the old files when the block exits
+    with ExitStack() as publish:
+        stage = lambda path: publish.enter_context(atomic_path(path))
+        if len(ids):
+            write_updated_embeddings(embeddings_path, stage(embeddings_path), ids, vectors, total_rows=len(merged))
+            faiss.write_index(index, str(stage(faiss_path)))
+        if galaxy_df is not None:
+            galaxy_df.to_parquet(stage(out_dir / "galaxy_coords.parquet"), index=False)
+        # Metadata is rewritten even without new vectors: votes and popularity change daily
+        merged.to_parquet(stage(metadata_path), index=False, row_group_size=row_group_size)
+
+    tiles_path = out_dir / "galaxy_tiles.npz"
+    if report["galaxy_updated"] and tiles_path.exists():
+        from galaxy_tiles import create_galaxy_tiles
+
+        with np.load(tiles_path) as tiles:
+            max_depth, capacity = int(tiles["max_depth"]), int(tiles["capacity"])
+        create_galaxy_tiles(out_dir, max_depth=max_depth, capacity=capacity, rank_by="popularity")
+
+    # Neighbor lists go stale with any new star or changed embedding; rebuild with the stored settings
+    graph_path = out_dir / "neighbor_graph.npz"
+    if len(ids) and graph_path.exists():
+        from neighbor_graph import create_neighbor_graph
+
+        with np.load(graph_path) as graph:
+            k, has_embedding = int(graph["k"]), "embedding_neighbors" in graph
+        create_neighbor_graph(out_dir, k=k, skip_embedding=not has_embedding)
+
+    print(f"Updated {out_dir}: {report}")
+    return report
+
+
+def add_incremental_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update an existing output directory: embed only new/changed movies and patch the index in place",
+    )
@@ -0,0 +1,238 @@
+import argparse
+import math
+
+import numpy as np
+
+INDEX_TYPES = ("flat", "flat-fp16", "flat-sq8", "ivf-flat", "ivf-sq8", "ivf-pq", "hnsw")
+ADD_CHUNK_SIZE = 65536
+
+
+def truncate_vectors(vectors: np.ndarray, dims: int | None) -> np.ndarray:
+    """
+    Matryoshka truncation: keeps the first `dims` components and re-normalizes
+    to unit length (nomic-embed-text-v1.5 is trained for 768/512/256/128/64).
+    Returns a contiguous float32 array; `dims=None` only converts.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dims is None or dims >= vectors.shape[1]:
+        return np.ascontiguousarray(vectors)
+    truncated = np.array(vectors[:, :dims], dtype=np.float32)  # A copy: normalized in place below
+    truncated /= np.maximum(np.linalg.norm(truncated, axis=1, keepdims=True), 1e-12)
+    return truncated
+
+
+def default_nlist(n_rows: int) -> int:
+    # ~4 * sqrt(n) lists is the usual starting point; keep at least 1 and leave room to train
+    return max(1, min(int(4 * math.sqrt(n_rows)), n_rows // 39 or 1))
+
+
+def build_index(
+    embeddings: np.ndarray,
+    index_type: str = "flat",
+    nlist: int | None = None,
+    pq_m: int = 64,
+    pq_bits: int = 8,
+    hnsw_m: int = 32,
+    ef_construction: int = 200,
+    train_size: int | None = None,
+    seed: int = 42,
+    dims: int | None = None,
+):
+    """
+    Builds an inner-product FAISS index over L2-normalized embeddings.
+
+    `embeddings` may be a memory-mapped array; rows are added in chunks so the
+    full matrix never has to be resident at once. IVF and SQ8 variants are
+    trained on `train_size` randomly sampled rows (default: 64 per list,
+    capped at n). With `dims`, vectors are Matryoshka-truncated before
+    indexing; the server truncates queries to the index dimension to match.
+    """
+    import faiss
+
+    n_rows, full_dim = embeddings.shape
+    dim = min(dims, full_dim) if dims else full_dim
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Expected one of {INDEX_TYPES}.")
+
+    trained = True
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif index_type == "flat-fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    elif index_type == "flat-sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+        trained = False
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        nlist = nlist or default_nlist(n_rows)
+        if index_type == "ivf-flat":
+            factory = f"IVF{nlist},Flat"
+        elif index_type == "ivf-sq8":
+            factory = f"IVF{nlist},SQ8"
+        else:
+            if dim % pq_m != 0:
+                raise ValueError(f"--pq-m ({pq_m}) must divide the embedding dimension ({dim}).")
+            factory = f"IVF{nlist},PQ{pq_m}x{pq_bits}"
+        index = faiss.index_factory(dim, factory, faiss.METRIC_INNER_PRODUCT)
+        train_size = min(n_rows, train_size or nlist * 64)
+        trained = False
+
+    if not trained:
+        train_size = min(n_rows, train_size or 65536)
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n_rows, size=train_size, replace=False))
+        print(f"Training {index_type} index on {train_size} sampled rows")
+        index.train(truncate_vectors(embeddings[sample], dim))
+
+    for start in range(0, n_rows, ADD_CHUNK_SIZE):
+        index.add(truncate_vectors(embeddings[start:start + ADD_CHUNK_SIZE], dim))
+
+    return index
+
+
+def rerank_candidates(embeddings: np.ndarray, queries: np.ndarray, found: np.ndarray, k: int) -> np.ndarray:
+    """
+    Re-orders index candidates by exact inner product with the full-precision
+    (possibly memory-mapped) embeddings and keeps the best `k`, as the server
+    does with SEARCH_RERANK. Only the candidate rows are read.
+    """
+    candidates = np.asarray(embeddings[np.maximum(found, 0).ravel()], dtype=np.float32).reshape(*found.shape, -1)
+    rescored = np.einsum("qcd,qd->qc", candidates, queries)
+    rescored[found < 0] = -np.inf
+    return np.take_along_axis(found, np.argsort(-rescored, axis=1, kind="stable"), axis=1)[:, :k]
+
+
+def measure_recall(
+    index,
+    embeddings: np.ndarray,
+    k: int = 10,
+    n_queries: int = 200,
+    rerank: int = 0,
+    seed: int = 0,
+) -> float:
+    """
+    Recall@k of `index` against exact full-precision search, using sampled
+    stored embeddings as queries. With `rerank`, that many candidates are
+    re-scored with the full embeddings first, as the server does with
+    SEARCH_RERANK.
+    """
+    n_rows = len(embeddings)
+    rng = np.random.default_rng(seed)
+    queries = np.asarray(embeddings[np.sort(rng.choice(n_rows, size=min(n_queries, n_rows), replace=False))], dtype=np.float32)
+
+    # Exact top-k, merged chunk by chunk so memory stays at n_queries x chunk
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_ids = np.empty((len(queries), 0), dtype=np.int64)
+    for start in range(0, n_rows, ADD_CHUNK_SIZE):
+        block = np.asarray(embeddings[start:start + ADD_CHUNK_SIZE], dtype=np.float32)
+        scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+        ids = np.concatenate([best_ids, np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))], axis=1)
+        top = np.argpartition(-scores, min(k, scores.shape[1]) - 1, axis=1)[:, :k]
+        best_scores, best_ids = np.take_along_axis(scores, top, axis=1), np.take_along_axis(ids, top, axis=1)
+
+    _, found = index.search(truncate_vectors(queries, index.d), max(k, rerank))
+    found = rerank_candidates(embeddings, queries, found, k) if rerank else found[:, :k]
+
+    hits = sum(len(np.intersect1d(best_ids[i], found[i])) for i in range(len(queries)))
+    return hits / (len(queries) * k)
+
+
+def report_index(index, embeddings: np.ndarray, rerank: int = 0) -> None:
+    """Prints the index's bytes per vector and measured recall@10 (with and without re-ranking)."""
+    try:
+        bytes_per_vector = index.sa_code_size()
+    except RuntimeError:  # No standalone codec (e.g. HNSW): report the stored float32 vectors
+        bytes_per_vector = index.d * 4
+    full = embeddings.shape[1] * 4
+    print(f"Index: d={index.d}, {bytes_per_vector} bytes/vector ({full / bytes_per_vector:.1f}x smaller than float32 {embeddings.shape[1]}d)")
+    print(f"Recall@10 vs exact search: {measure_recall(index, embeddings):.3f}")
+    if rerank:
+        print(f"Recall@10 with top-{rerank} full-precision re-rank: {measure_recall(index, embeddings, rerank=rerank):.3f}")
+
+
+def add_index_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("FAISS index")
+    group.add_argument("--index-type", choices=INDEX_TYPES, default="flat", help="FAISS index to build")
+    group.add_argument("--nlist", type=int, default=None, help="IVF lists (default: ~4*sqrt(n))")
+    group.add_argument("--pq-m", type=int, default=64, help="IVF-PQ sub-quantizers (must divide the dimension)")
+    group.add_argument("--pq-bits", type=int, default=8, help="IVF-PQ bits per sub-quantizer code")
+    group.add_argument("--hnsw-m", type=int, default=32, help="HNSW neighbors per node")
+    group.add_argument("--ef-construction", type=int, default=200, help="HNSW efConstruction")
+    group.add_argument("--train-size", type=int, default=None, help="Rows sampled to train IVF/SQ8 indexes (default: 64 per list)")
+    group.add_argument("--dims", type=int, default=None, help="Matryoshka-truncate indexed vectors to this many dimensions (e.g. 256, 512)")
+    group.add_argument(
+        "--report-rerank",
+        type=int,
+        default=100,
+        help="Candidates re-ranked at full precision when reporting recall of approximate indexes",
+    )
+
+
+def build_index_from_args(embeddings: np.ndarray, args: argparse.Namespace):
+    index = _build_index_from_args(embeddings, args)
+    if args.index_type != "flat" or args.dims:
+        report_index(index, embeddings, rerank=args.report_rerank)
+    return index
+
+
+def _build_index_from_args(embeddings: np.ndarray, args: argparse.Namespace):
+    return build_index(
+        embeddings,
+        index_type=args.index_type,
+        nlist=args.nlist,
+        pq_m=args.pq_m,
+        pq_bits=args.pq_bits,
+        hnsw_m=args.hnsw_m,
+        ef_construction=args.ef_construction,
+        train_size=args.train_size,
+        dims=args.dims,
+    )
+
+
+def update_index(index, ids: np.ndarray, vectors: np.ndarray) -> None:
+    """
+    Applies changed and new embeddings to an existing index in place.
+
+    `ids` are row positions (vector_id): ids below `index.ntotal` replace that
+    row's vector, the others must continue the sequence from `ntotal`. IVF
+    indexes keep explicit ids, so changed rows are removed and re-added with
+    the same id (`remove_ids` / `add_with_ids`) without retraining. Flat,
+    scalar-quantized and HNSW indexes label rows by position, so the stored
+    codes of changed rows are overwritten in place (encoded with `sa_encode`)
+    and new rows appended; HNSW links of changed rows are not rebuilt, which a
+    periodic full build corrects.
+    """
+    import faiss
+
+    ids = np.asarray(ids, dtype=np.int64)
+    vectors = truncate_vectors(vectors, index.d)
+    ntotal = index.ntotal
+    replace = ids < ntotal
+    order = np.argsort(ids[~replace])
+    new_ids = ids[~replace][order]
+    if not np.array_equal(new_ids, np.arange(ntotal, ntotal + len(new_ids))):
+        raise ValueError("New ids must continue the existing sequence without gaps.")
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None:
+        if replace.any():
+            index.remove_ids(ids[replace])
+        index.add_with_ids(vectors, ids)
+        return
+
+    base = faiss.downcast_index(index)
+    storage = faiss.downcast_index(base.storage) if hasattr(base, "hnsw") else base
+    if not isinstance(storage, faiss.IndexFlatCodes):
+        raise ValueError(f"Cannot update {type(base).__name__} in place; rebuild it with build_index.")
+    if replace.any():
+        codes = faiss.rev_swig_ptr(storage.codes.data(), storage.ntotal * storage.code_size)
+        codes = codes.reshape(storage.ntotal, storage.code_size)
+        codes[ids[replace]] = storage.sa_encode(np.ascontiguousarray(vectors[replace]))
+    appended = vectors[~replace][order]
+    for start in range(0, len(appended), ADD_CHUNK_SIZE):
+        index.add(appended[start:start + ADD_CHUNK_SIZE])
@@ -1,9 +1,15 @@
 import argparse
+import os
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+from atomic_write import METADATA_ROW_GROUP_SIZE, atomic_path
+from embed_pipeline import add_embedding_args, encode_to_memmap, progress_path_for
+from incremental import add_incremental_args, update_outputs
+from index_builder import add_index_args, build_index, build_index_from_args
+
 
 def build_natural_text(row: pd.Series) -> str:
     title = str(row.get("title", "")).strip()
@@ -64,7 +70,17 @@ def generate_embeddings(texts: list[str], model_name: str, batch_size: int) -> n
     ).astype("float32")
 
 
-def save_outputs(df: pd.DataFrame, embeddings: np.ndarray, out_dir: Path) -> None:
+def save_outputs(
+    df: pd.DataFrame,
+    embeddings: np.ndarray,
+    out_dir: Path,
+    index_args: argparse.Namespace | None = None,
+) -> None:
+    """
+    Writes metadata, embeddings and the FAISS index to `out_dir`. `embeddings`
+    may be the memmap returned by encode_to_memmap for a file inside
+    `out_dir`; it is then renamed into place instead of copied.
+    """
     import faiss
 
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -73,12 +89,20 @@ def save_outputs(df: pd.DataFrame, embeddings: np.ndarray, out_dir: Path) -> Non
     embeddings_path = out_dir / "embeddings.npy"
     faiss_path = out_dir / "faiss_index.faiss"
 
-    df.to_parquet(metadata_path, index=False)
-    np.save(embeddings_path, embeddings)
-
-    index = faiss.IndexFlatIP(embeddings.shape[1])
-    index.add(embeddings)
-    faiss.write_index(index, str(faiss_path))
+    # Each file is written aside and renamed into place, so a running server can keep mapping the old ones
+    with atomic_path(metadata_path) as tmp_path:
+        df.to_parquet(tmp_path, index=False, row_group_size=METADATA_ROW_GROUP_SIZE)
+    streamed_path = Path(embeddings.filename) if isinstance(embeddings, np.memmap) and embeddings.filename else None
+    if streamed_path is not None and streamed_path.parent.resolve() == out_dir.resolve():
+        os.replace(streamed_path, embeddings_path)
+        progress_path_for(streamed_path).unlink(missing_ok=True)
+    else:
+        with atomic_path(embeddings_path) as tmp_path:
+            np.save(tmp_path, embeddings)
+
+    index = build_index_from_args(embeddings, index_args) if index_args else build_index(embeddings)
+    with atomic_path(faiss_path) as tmp_path:
+        faiss.write_index(index, str(tmp_path))
 
     print(f"Saved metadata: {metadata_path}")
     print(f"Saved embeddings: {embeddings_path} ({embeddings.shape})")
@@ -92,6 +116,9 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--min-votes", type=int, default=30, help="Minimum vote_count filter")
     parser.add_argument("--model-name", default="nomic-ai/nomic-embed-text-v1.5", help="SentenceTransformer model name")
     parser.add_argument("--batch-size", type=int, default=128, help="Embedding batch size")
+    add_embedding_args(parser)
+    add_incremental_args(parser)
+    add_index_args(parser)
     return parser.parse_args()
 
 
@@ -100,16 +127,33 @@ def main() -> None:
 
     movies_df = load_tmdb_csv()
     prepared_df = prepare_metadata(movies_df, min_votes=args.min_votes, top_n=args.top_n)
-    embeddings = generate_embeddings(
+
+    out_dir = Path(args.output_dir)
+    if args.incremental and (out_dir / "metadata.parquet").exists():
+        update_outputs(
+            prepared_df,
+            out_dir,
+            model_name=args.model_name,
+            batch_size=args.batch_size,
+            row_group_size=METADATA_ROW_GROUP_SIZE,
+        )
+        return
+
+    # Streamed into a checkpointed memmap next to the outputs; rerunning after a crash resumes it
+    out_dir.mkdir(parents=True, exist_ok=True)
+    embeddings = encode_to_memmap(
         prepared_df["text_for_embedding"].tolist(),
+        out_dir / "embeddings.building.npy",
         model_name=args.model_name,
         batch_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
     )
 
     if len(prepared_df) != embeddings.shape[0]:
         raise RuntimeError("Row count mismatch between metadata and embeddings.")
 
-    save_outputs(prepared_df, embeddings, Path(args.output_dir))
+    save_outputs(prepared_df, embeddings, out_dir, index_args=args)
 
 
 if __name__ == "__main__":
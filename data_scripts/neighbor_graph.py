@@ -0,0 +1,117 @@
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from atomic_write import atomic_path
+from index_builder import truncate_vectors
+
+SEARCH_CHUNK = 16384
+
+
+def _drop_self(ids: np.ndarray, scores: np.ndarray, self_ids: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Removes each row's own id from its hit list and keeps the first `k` remaining hits (-1 padded)."""
+    keep = (ids != self_ids[:, None]) & (ids >= 0)
+    order = np.argsort(~keep, axis=1, kind="stable")[:, :k]
+    ids = np.where(np.take_along_axis(keep, order, axis=1), np.take_along_axis(ids, order, axis=1), -1)
+    return ids, np.take_along_axis(scores, order, axis=1)
+
+
+def umap_neighbors(coords: np.ndarray, vector_ids: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Exact k nearest stars in 3D galaxy space: neighbor vector_ids and euclidean distances."""
+    import faiss
+
+    coords = np.ascontiguousarray(coords, dtype=np.float32)
+    index = faiss.IndexFlatL2(3)
+    index.add(coords)
+    ids, distances = [], []
+    for start in range(0, len(coords), SEARCH_CHUNK):
+        squared, rows = index.search(coords[start:start + SEARCH_CHUNK], k + 1)
+        hits = np.where(rows >= 0, vector_ids[np.maximum(rows, 0)], -1)
+        hit_ids, hit_sq = _drop_self(hits, squared, vector_ids[start:start + SEARCH_CHUNK], k)
+        ids.append(hit_ids)
+        distances.append(np.sqrt(np.maximum(hit_sq, 0)))
+    return np.concatenate(ids), np.concatenate(distances)
+
+
+def embedding_neighbors(
+    data_dir: Path,
+    vector_ids: np.ndarray,
+    k: int,
+    nprobe: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    k most similar galaxy stars by embedding, found with the built FAISS index
+    (so approximate indexes keep this step sub-quadratic). Hits outside the
+    galaxy are skipped; returns neighbor vector_ids and inner-product scores.
+    """
+    import faiss
+
+    embeddings = np.load(data_dir / "embeddings.npy", mmap_mode="r")
+    index = faiss.read_index(str(data_dir / "faiss_index.faiss"), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    if nprobe:
+        try:
+            faiss.extract_index_ivf(index).nprobe = nprobe
+        except RuntimeError:
+            pass
+    in_galaxy = np.zeros(len(embeddings), dtype=bool)
+    in_galaxy[vector_ids] = True
+    # Over-fetch so stars outside the galaxy can be dropped and k still remain
+    fetch = min(index.ntotal, k * 2 + 1)
+
+    ids, scores = [], []
+    order = np.argsort(vector_ids, kind="stable")  # Sequential reads from the embeddings mmap
+    for start in range(0, len(order), SEARCH_CHUNK):
+        rows = order[start:start + SEARCH_CHUNK]
+        queries = truncate_vectors(embeddings[vector_ids[rows]], index.d)
+        similarity, hits = index.search(queries, fetch)
+        hits = np.where((hits >= 0) & in_galaxy[np.clip(hits, 0, len(in_galaxy) - 1)], hits, -1)
+        hit_ids, hit_scores = _drop_self(hits, similarity, vector_ids[rows], k)
+        ids.append(hit_ids)
+        scores.append(hit_scores)
+
+    restore = np.empty_like(order)
+    restore[order] = np.arange(len(order))
+    return np.concatenate(ids)[restore], np.concatenate(scores)[restore]
+
+
+def create_neighbor_graph(data_dir: Path, k: int, nprobe: int | None = None, skip_embedding: bool = False) -> None:
+    galaxy_df = pd.read_parquet(data_dir / "galaxy_coords.parquet")
+    vector_ids = galaxy_df["vector_id"].to_numpy(dtype=np.int64)
+
+    umap_ids, umap_distances = umap_neighbors(galaxy_df[["x", "y", "z"]].to_numpy(), vector_ids, k)
+    arrays = {
+        "vector_id": vector_ids,
+        "umap_neighbors": umap_ids.astype(np.int32),
+        "umap_scores": umap_distances.astype(np.float16),
+        "k": np.int64(k),
+    }
+    if not skip_embedding:
+        embedding_ids, similarities = embedding_neighbors(data_dir, vector_ids, k, nprobe=nprobe)
+        arrays["embedding_neighbors"] = embedding_ids.astype(np.int32)
+        arrays["embedding_scores"] = similarities.astype(np.float16)
+
+    out_path = data_dir / "neighbor_graph.npz"
+    with atomic_path(out_path) as tmp_path:
+        np.savez(tmp_path, **arrays)
+    spaces = [name[:-len("_neighbors")] for name in arrays if name.endswith("_neighbors")]
+    print(f"Saved neighbor graph: {out_path} stars={len(vector_ids)} k={k} spaces={spaces}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Precompute top-k galaxy neighbors for /api/galaxy/neighbors?mode=knn.")
+    parser.add_argument("--data-dir", default="data_dev", help="Directory with galaxy_coords.parquet, embeddings.npy and faiss_index.faiss")
+    parser.add_argument("-k", "--neighbors", type=int, default=32, help="Neighbors stored per star")
+    parser.add_argument("--nprobe", type=int, default=None, help="IVF nprobe for the embedding-space search")
+    parser.add_argument("--skip-embedding", action="store_true", help="Only build the 3D (UMAP space) graph")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    create_neighbor_graph(Path(args.data_dir), k=args.neighbors, nprobe=args.nprobe, skip_embedding=args.skip_embedding)
+
+
+if __name__ == "__main__":
+    main()
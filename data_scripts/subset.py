@@ -1,18 +1,48 @@
 import argparse
+import pickle
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+from atomic_write import METADATA_ROW_GROUP_SIZE, atomic_path
+from index_builder import add_index_args, build_index, build_index_from_args
 
-def create_dev_subset(data_full_dir: Path, data_dev_dir: Path, dev_size: int) -> tuple[pd.DataFrame, np.ndarray]:
+UMAP_MODEL_NAME = "umap_model.pkl"
+# Rows per gather/normalize/transform step; bounds the working set for out-of-core builds
+ROW_CHUNK = 65536
+
+
+def gather_rows(source: np.ndarray, positions: np.ndarray, out: np.ndarray, chunk: int = ROW_CHUNK) -> None:
+    """Copies `source[positions]` into `out` chunk by chunk; sorted positions keep reads sequential on a memmap."""
+    for start in range(0, len(positions), chunk):
+        stop = min(start + chunk, len(positions))
+        out[start:stop] = source[positions[start:stop]]
+
+
+def l2_normalize_inplace(array: np.ndarray, chunk: int = ROW_CHUNK) -> np.ndarray:
+    """Scales each row of a float32 array to unit length without allocating a full-size copy."""
+    for start in range(0, len(array), chunk):
+        block = array[start:start + chunk]
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        np.divide(block, np.maximum(norms, 1e-12), out=block)
+    return array
+
+
+def create_dev_subset(
+    data_full_dir: Path,
+    data_dev_dir: Path,
+    dev_size: int,
+    index_args: argparse.Namespace | None = None,
+) -> tuple[pd.DataFrame, np.ndarray]:
     import faiss
 
     metadata_path = data_full_dir / "metadata.parquet"
     embeddings_path = data_full_dir / "embeddings.npy"
 
     meta = pd.read_parquet(metadata_path)
-    emb = np.load(embeddings_path).astype("float32")
+    # Mapped, not loaded: only the selected rows are ever read
+    emb = np.load(embeddings_path, mmap_mode="r")
 
     if len(meta) != emb.shape[0]:
         raise RuntimeError(f"Input mismatch: metadata rows={len(meta)} embeddings rows={emb.shape[0]}")
@@ -26,18 +56,25 @@ def create_dev_subset(data_full_dir: Path, data_dev_dir: Path, dev_size: int) ->
 
     selected_positions = np.sort(top_meta.index.to_numpy())
     meta_dev = meta.iloc[selected_positions].reset_index(drop=True).copy()
-    emb_dev = emb[selected_positions]
+    del meta
 
     # Keep IDs aligned with FAISS positions.
     meta_dev["vector_id"] = np.arange(len(meta_dev), dtype=np.int64)
 
     data_dev_dir.mkdir(parents=True, exist_ok=True)
-    meta_dev.to_parquet(data_dev_dir / "metadata.parquet", index=False)
-    np.save(data_dev_dir / "embeddings.npy", emb_dev)
-
-    index = faiss.IndexFlatIP(emb_dev.shape[1])
-    index.add(emb_dev)
-    faiss.write_index(index, str(data_dev_dir / "faiss_index.faiss"))
+    with atomic_path(data_dev_dir / "metadata.parquet") as tmp_path:
+        meta_dev.to_parquet(tmp_path, index=False, row_group_size=METADATA_ROW_GROUP_SIZE)
+    with atomic_path(data_dev_dir / "embeddings.npy") as tmp_path:
+        out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(len(selected_positions), emb.shape[1]))
+        gather_rows(emb, selected_positions, out)
+        out.flush()
+        del out
+    del emb
+    emb_dev = np.load(data_dev_dir / "embeddings.npy", mmap_mode="r")
+
+    index = build_index_from_args(emb_dev, index_args) if index_args else build_index(emb_dev)
+    with atomic_path(data_dev_dir / "faiss_index.faiss") as tmp_path:
+        faiss.write_index(index, str(tmp_path))
 
     print(f"Saved metadata: {data_dev_dir / 'metadata.parquet'} rows={len(meta_dev)}")
     print(f"Saved embeddings: {data_dev_dir / 'embeddings.npy'} shape={emb_dev.shape}")
@@ -46,20 +83,38 @@ def create_dev_subset(data_full_dir: Path, data_dev_dir: Path, dev_size: int) ->
     return meta_dev, emb_dev
 
 
-def create_galaxy_coords(data_dev_dir: Path, n_neighbors: int, min_dist: float, random_state: int) -> None:
+def transform_galaxy_coords(umap_model: dict, embeddings: np.ndarray) -> np.ndarray:
+    """Places embeddings into an existing galaxy with the reducer saved by create_galaxy_coords."""
+    coords = umap_model["reducer"].transform(l2_normalize_inplace(np.array(embeddings, dtype=np.float32)))
+    return (coords - umap_model["mean"]) / umap_model["std"]
+
+
+def create_galaxy_coords(
+    data_dev_dir: Path,
+    n_neighbors: int,
+    min_dist: float,
+    random_state: int,
+    fit_sample: int | None = None,
+    transform_batch: int = ROW_CHUNK,
+) -> None:
+    """
+    Projects embeddings.npy to 3D galaxy coordinates with UMAP.
+
+    By default UMAP is fitted on every row (one normalized float32 copy in
+    RAM). With `fit_sample`, it is fitted on that many randomly chosen rows
+    and the whole file is then transformed from the memmap in batches of
+    `transform_batch`, which keeps large catalogs within workstation memory.
+    """
     try:
         import umap
-        from sklearn.preprocessing import normalize
     except ImportError as exc:
         raise RuntimeError(
-            "UMAP coordinate generation requires `umap-learn` and `scikit-learn`. "
-            "Install them or run with --skip-umap."
+            "UMAP coordinate generation requires `umap-learn`. Install it or run with --skip-umap."
         ) from exc
 
-    meta = pd.read_parquet(data_dev_dir / "metadata.parquet")
-    emb = np.load(data_dev_dir / "embeddings.npy")
+    vector_ids = pd.read_parquet(data_dev_dir / "metadata.parquet", columns=["vector_id"])["vector_id"]
+    emb = np.load(data_dev_dir / "embeddings.npy", mmap_mode="r")
 
-    emb_norm = normalize(emb, norm="l2")
     reducer = umap.UMAP(
         n_components=3,
         n_neighbors=n_neighbors,
@@ -68,22 +123,42 @@ def create_galaxy_coords(data_dev_dir: Path, n_neighbors: int, min_dist: float,
         random_state=random_state,
         verbose=True,
     )
-    coords = reducer.fit_transform(emb_norm)
+    if fit_sample and fit_sample < len(emb):
+        rng = np.random.default_rng(random_state)
+        sample = np.sort(rng.choice(len(emb), size=fit_sample, replace=False))
+        fit_rows = np.empty((len(sample), emb.shape[1]), dtype=np.float32)
+        gather_rows(emb, sample, fit_rows)
+        reducer.fit(l2_normalize_inplace(fit_rows))
+        del fit_rows
+
+        coords = np.empty((len(emb), 3), dtype=np.float32)
+        for start in range(0, len(emb), transform_batch):
+            stop = min(start + transform_batch, len(emb))
+            batch = l2_normalize_inplace(np.array(emb[start:stop], dtype=np.float32))
+            coords[start:stop] = reducer.transform(batch)
+            print(f"Transformed {stop}/{len(emb)} rows")
+    else:
+        coords = reducer.fit_transform(l2_normalize_inplace(np.array(emb, dtype=np.float32)))
+
+    # Standardize each axis; the fitted reducer and these stats let movies.py --incremental place new stars
+    mean, std = coords.mean(axis=0), coords.std(axis=0, ddof=1)
+    with atomic_path(data_dev_dir / UMAP_MODEL_NAME) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"reducer": reducer, "mean": mean, "std": std}, f)
+    coords = (coords - mean) / std
 
     galaxy_df = pd.DataFrame(
         {
-            "vector_id": meta["vector_id"].astype(int),
+            "vector_id": vector_ids.astype(int),
             "x": coords[:, 0],
             "y": coords[:, 1],
             "z": coords[:, 2],
         }
     )
 
-    for col in ["x", "y", "z"]:
-        galaxy_df[col] = (galaxy_df[col] - galaxy_df[col].mean()) / galaxy_df[col].std()
-
     out_path = data_dev_dir / "galaxy_coords.parquet"
-    galaxy_df.to_parquet(out_path, index=False)
+    with atomic_path(out_path) as tmp_path:
+        galaxy_df.to_parquet(tmp_path, index=False)
     print(f"Saved galaxy coordinates: {out_path} rows={len(galaxy_df)}")
 
 
@@ -96,6 +171,14 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--n-neighbors", type=int, default=30, help="UMAP n_neighbors")
     parser.add_argument("--min-dist", type=float, default=0.05, help="UMAP min_dist")
     parser.add_argument("--random-state", type=int, default=42, help="UMAP random_state")
+    parser.add_argument(
+        "--umap-fit-sample",
+        type=int,
+        default=None,
+        help="Fit UMAP on this many sampled rows and transform the rest in batches (for large catalogs)",
+    )
+    parser.add_argument("--umap-batch-size", type=int, default=ROW_CHUNK, help="Rows per UMAP transform batch")
+    add_index_args(parser)
     return parser.parse_args()
 
 
@@ -104,7 +187,7 @@ def main() -> None:
     data_full_dir = Path(args.data_full)
     data_dev_dir = Path(args.data_dev)
 
-    create_dev_subset(data_full_dir, data_dev_dir, dev_size=args.dev_size)
+    create_dev_subset(data_full_dir, data_dev_dir, dev_size=args.dev_size, index_args=args)
 
     if not args.skip_umap:
         create_galaxy_coords(
@@ -112,6 +195,8 @@ def main() -> None:
             n_neighbors=args.n_neighbors,
             min_dist=args.min_dist,
             random_state=args.random_state,
+            fit_sample=args.umap_fit_sample,
+            transform_batch=args.umap_batch_size,
         )
 
 
@@ -210,11 +210,17 @@ function GalaxyPoints({ stars }: { stars: GalaxyStar[] }) {
 }
 
 // ─── Dynamic LOD Manager ────────────────────────────────────────────────────────
+// Streams the stars in the camera's view: the server culls to the view, sends the most
+// prominent stars first and skips what the cursor says we already have.
 function LODManager({ starsMap, setStarsMap }: { starsMap: Map<number, GalaxyStar>, setStarsMap: React.Dispatch<React.SetStateAction<Map<number, GalaxyStar>>> }) {
     const { camera } = useThree();
     const { isExploreMode } = useGalaxy();
     const lastFetchTime = useRef(0);
     const lastFetchTarget = useRef<THREE.Vector3>(new THREE.Vector3());
+    const lastFetchDirection = useRef<THREE.Vector3>(new THREE.Vector3());
+    const direction = useRef<THREE.Vector3>(new THREE.Vector3());
+    const cursor = useRef<string | null>(null);
+    const complete = useRef(false);
     const isFetching = useRef(false);
 
     useFrame(() => {
@@ -223,34 +229,34 @@ function LODManager({ starsMap, setStarsMap }: { starsMap: Map<number, GalaxySta
         const now = performance.now();
         if (now - lastFetchTime.current < 800) return; // Debounce 800ms
 
-        // If camera hasn't moved much from the last fetched area, skip
-        if (camera.position.distanceToSquared(lastFetchTarget.current) < 400) return; // 20 units dist
-
-        // Calculate region in UMAP coordinates
-        const regionX = camera.position.x / COORD_SCALE;
-        const regionY = camera.position.y / COORD_SCALE;
-        const regionZ = camera.position.z / COORD_SCALE;
-
-        // Radius based on how far zoomed out we are
-        const distFromCore = camera.position.length() / COORD_SCALE;
-        const radius = Math.max(0.1, Math.min(distFromCore * 0.5, 0.4));
+        // Skip while the view is fully loaded and the camera hasn't moved (20 units) or turned (~10°) much
+        camera.getWorldDirection(direction.current);
+        const moved = camera.position.distanceToSquared(lastFetchTarget.current) >= 400;
+        const turned = direction.current.dot(lastFetchDirection.current) < 0.985;
+        if (complete.current && !moved && !turned) return;
 
+        const perspective = camera as THREE.PerspectiveCamera;
         isFetching.current = true;
         lastFetchTarget.current.copy(camera.position);
-
-        api.getGalaxyData(5000, regionX, regionY, regionZ, radius)
-            .then(newStars => {
-                if (newStars && newStars.length > 0) {
+        lastFetchDirection.current.copy(direction.current);
+
+        api.getGalaxyView({
+            position: [camera.position.x / COORD_SCALE, camera.position.y / COORD_SCALE, camera.position.z / COORD_SCALE],
+            direction: [direction.current.x, direction.current.y, direction.current.z],
+            fov: perspective.fov,
+            aspect: perspective.aspect,
+            far: perspective.far / COORD_SCALE,
+        }, 5000, cursor.current)
+            .then(view => {
+                if (!view) return;
+                cursor.current = view.cursor;
+                // Without a cursor the server can't send more for this view; wait for the camera to move
+                complete.current = view.complete || view.cursor === null;
+                if (view.stars.length > 0) {
                     setStarsMap(prev => {
                         const next = new Map(prev);
-                        let added = 0;
-                        newStars.forEach(s => {
-                            if (!next.has(s.vector_id)) {
-                                next.set(s.vector_id, s);
-                                added++;
-                            }
-                        });
-                        console.log(`[LOD] Fetched ${newStars.length}, added ${added} new stars. Total: ${next.size}`);
+                        view.stars.forEach(s => next.set(s.vector_id, s));
+                        console.log(`[LOD] Fetched ${view.stars.length} stars in view. Total: ${next.size}`);
                         return next;
                     });
                 }
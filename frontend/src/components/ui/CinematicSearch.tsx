@@ -15,6 +15,7 @@ export default function CinematicSearch({ initialQuery = '' }: CinematicSearchPr
     const [query, setQuery] = useState(initialQuery);
     const [debouncedQuery, setDebouncedQuery] = useState(initialQuery);
     const [results, setResults] = useState<Movie[]>([]);
+    const [suggestions, setSuggestions] = useState<Movie[]>([]);
     const [isLoading, setIsLoading] = useState(false);
     const [hasSearched, setHasSearched] = useState(!!initialQuery);
     const [focused, setFocused] = useState(false);
@@ -37,6 +38,23 @@ export default function CinematicSearch({ initialQuery = '' }: CinematicSearchPr
         return () => clearTimeout(timer);
     }, [query]);
 
+    // Title suggestions come from the lexical index, which answers without the embedding model
+    useEffect(() => {
+        if (!query.trim()) {
+            setSuggestions([]);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            const data = await api.autocomplete(query, 6);
+            if (!cancelled) setSuggestions(data);
+        }, 120);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [query]);
+
     // Perform search
     useEffect(() => {
         const performSearch = async () => {
@@ -106,7 +124,7 @@ export default function CinematicSearch({ initialQuery = '' }: CinematicSearchPr
                             value={query}
                             onChange={(e) => setQuery(e.target.value)}
                             onFocus={() => setFocused(true)}
-                            onBlur={() => setFocused(false)}
+                            onBlur={() => setTimeout(() => setFocused(false), 200)}
                             placeholder="Search a movie, vibe, feeling, or plot..."
                             autoComplete="off"
                             className="flex-1 bg-transparent outline-none"
@@ -134,6 +152,25 @@ export default function CinematicSearch({ initialQuery = '' }: CinematicSearchPr
                             </button>
                         )}
                     </div>
+
+                    {/* Title suggestions */}
+                    {focused && suggestions.length > 0 && (
+                        <div className="absolute left-4 right-4 sm:left-6 sm:right-6 mt-2 bg-black/90 backdrop-blur-xl border border-white/10 rounded-2xl shadow-2xl overflow-hidden py-2 animate-fade-in">
+                            <div className="px-4 py-2 text-xs font-semibold text-gray-500 uppercase tracking-wide">
+                                Title Matches
+                            </div>
+                            {suggestions.map((movie) => (
+                                <div
+                                    key={movie.vector_id}
+                                    onClick={() => router.push(`/movie/${movie.vector_id}`)}
+                                    className="flex items-center justify-between gap-4 px-4 py-2.5 hover:bg-white/5 cursor-pointer transition-colors"
+                                >
+                                    <span className="text-white text-sm truncate">{movie.title}</span>
+                                    <span className="text-gray-500 text-xs flex-shrink-0">{movie.release_date?.substring(0, 4)}</span>
+                                </div>
+                            ))}
+                        </div>
+                    )}
                 </div>
 
                 {/* Semantic search indicator */}
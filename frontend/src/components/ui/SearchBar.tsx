@@ -1,6 +1,6 @@
 'use client';
 
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { Search, Loader2 } from 'lucide-react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { api, Movie } from '@/lib/api';
@@ -11,8 +11,29 @@ export default function SearchBar() {
     const [isSearching, setIsSearching] = useState(false);
     const [results, setResults] = useState<Movie[]>([]);
     const [isOpen, setIsOpen] = useState(false);
+    const [matchKind, setMatchKind] = useState<'title' | 'semantic'>('title');
     const router = useRouter();
 
+    // Title suggestions while typing come from the lexical index, which answers without the embedding model
+    useEffect(() => {
+        if (!query.trim()) {
+            setResults([]);
+            return;
+        }
+        let cancelled = false;
+        const timer = setTimeout(async () => {
+            const data = await api.autocomplete(query, 3);
+            if (cancelled) return;
+            setMatchKind('title');
+            setResults(data);
+            setIsOpen(data.length > 0);
+        }, 120);
+        return () => {
+            cancelled = true;
+            clearTimeout(timer);
+        };
+    }, [query]);
+
     const handleSearch = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!query.trim()) return;
@@ -21,6 +42,7 @@ export default function SearchBar() {
         setIsOpen(true);
         // Only fetch top 3 for the dropdown preview
         const data = await api.searchSemantic(query, 3);
+        setMatchKind('semantic');
         setResults(data);
         setIsSearching(false);
     };
@@ -65,7 +87,7 @@ export default function SearchBar() {
                         ) : (
                             <>
                                 <div className="px-4 py-2 text-xs font-semibold text-gray-500 uppercase tracking-wide">
-                                    Semantic Matches
+                                    {matchKind === 'title' ? 'Title Matches' : 'Semantic Matches'}
                                 </div>
                                 {results.map((movie) => (
                                     <div
@@ -26,10 +26,146 @@ export interface GalaxyStar {
     genres: string | null;
 }
 
+// Columnar stars from `format=binary` (layout documented in backend/core/wire.py).
+// `positions` is interleaved xyz and can back a BufferGeometry attribute directly.
+export interface GalaxyStarBuffers {
+    count: number;
+    vectorIds: Int32Array;
+    positions: Float32Array;
+    voteAverages: Float32Array;
+    titles: string[];
+    genres: string[];
+}
+
+const STAR_FORMAT_VERSION = 1;
+
+export const decodeGalaxyStars = (buffer: ArrayBuffer): GalaxyStarBuffers => {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    const version = view.getUint16(4, true);
+    if (magic !== 'MVGS' || version !== STAR_FORMAT_VERSION) {
+        throw new Error(`Unsupported star payload (${magic} v${version})`);
+    }
+    const count = view.getUint32(8, true);
+    const genreCount = view.getUint32(12, true);
+
+    let offset = 16;
+    const take = <T>(make: (buf: ArrayBuffer, byteOffset: number, length: number) => T, length: number): T => {
+        const arr = make(buffer, offset, length);
+        offset += length * 4;
+        return arr;
+    };
+    const vectorIds = take((b, o, n) => new Int32Array(b, o, n), count);
+    const positions = take((b, o, n) => new Float32Array(b, o, n), count * 3);
+    const voteAverages = take((b, o, n) => new Float32Array(b, o, n), count);
+    const genreIndex = take((b, o, n) => new Uint32Array(b, o, n), count);
+    const titleOffsets = take((b, o, n) => new Uint32Array(b, o, n), count + 1);
+    const genreOffsets = take((b, o, n) => new Uint32Array(b, o, n), genreCount + 1);
+
+    const decoder = new TextDecoder();
+    const titleBytes = new Uint8Array(buffer, offset, titleOffsets[count]);
+    const genreBytes = new Uint8Array(buffer, offset + titleOffsets[count], genreOffsets[genreCount]);
+
+    const titles = new Array<string>(count);
+    for (let i = 0; i < count; i++) {
+        titles[i] = decoder.decode(titleBytes.subarray(titleOffsets[i], titleOffsets[i + 1]));
+    }
+    const genreTable = new Array<string>(genreCount);
+    for (let i = 0; i < genreCount; i++) {
+        genreTable[i] = decoder.decode(genreBytes.subarray(genreOffsets[i], genreOffsets[i + 1]));
+    }
+    const genres = Array.from(genreIndex, (g) => genreTable[g]);
+
+    return { count, vectorIds, positions, voteAverages, titles, genres };
+};
+
+export interface GalaxyTileManifest {
+    origin: [number, number, number];
+    size: number;
+    max_depth: number;
+    capacity: number;
+    // [level, x, y, z, star_count] for every non-empty tile
+    tiles: [number, number, number, number, number][];
+}
+
+export interface GalaxyTile {
+    level: number;
+    x: number;
+    y: number;
+    z: number;
+    bounds_min: [number, number, number];
+    bounds_max: [number, number, number];
+    count: number;
+    stars: GalaxyStar[];
+}
+
+// Camera for `getGalaxyView`, in galaxy (UMAP) units; fov is vertical, in degrees
+export interface GalaxyCamera {
+    position: [number, number, number];
+    direction: [number, number, number];
+    fov: number;
+    aspect: number;
+    far: number;
+}
+
+export interface GalaxyView {
+    stars: GalaxyStar[];
+    // Pass back on the next call so already received stars are not sent again
+    cursor: string | null;
+    // False while visible stars remain beyond `limit`
+    complete: boolean;
+}
+
+export interface SearchFilters {
+    genres?: string[];
+    year_min?: number;
+    year_max?: number;
+    min_rating?: number;
+    languages?: string[];
+}
+
+// Semantic searches started in the same tick (e.g. the homepage's MovieRows) go out as one batch
+// request, so the backend encodes their queries in a single model call.
+interface PendingSearch {
+    query: string;
+    limit: number;
+    filters?: SearchFilters;
+    resolve: (movies: Movie[]) => void;
+}
+
+const MAX_BATCH_SEARCHES = 16;
+let pendingSearches: PendingSearch[] = [];
+
+const postSearches = async (searches: PendingSearch[]) => {
+    try {
+        if (searches.length === 1) {
+            const { query, limit, filters } = searches[0];
+            const response = await axios.post(`${API_BASE_URL}/search/semantic`, { query, limit, filters });
+            searches[0].resolve(response.data.results || []);
+            return;
+        }
+        const response = await axios.post(`${API_BASE_URL}/search/semantic/batch`, {
+            searches: searches.map(({ query, limit, filters }) => ({ query, limit, filters })),
+        });
+        searches.forEach((search, i) => search.resolve(response.data.results?.[i]?.results || []));
+    } catch (error) {
+        console.error('Error performing semantic search:', error);
+        searches.forEach((search) => search.resolve([]));
+    }
+};
+
+const flushSearches = () => {
+    const queued = pendingSearches;
+    pendingSearches = [];
+    for (let i = 0; i < queued.length; i += MAX_BATCH_SEARCHES) {
+        postSearches(queued.slice(i, i + MAX_BATCH_SEARCHES));
+    }
+};
+
 export const api = {
-    getTrending: async (limit: number = 20): Promise<Movie[]> => {
+    getTrending: async (limit: number = 20, offset: number = 0): Promise<Movie[]> => {
         try {
-            const response = await axios.get(`${API_BASE_URL}/movies/trending?limit=${limit}`);
+            const response = await axios.get(`${API_BASE_URL}/movies/trending?limit=${limit}&offset=${offset}`);
             return response.data.results || [];
         } catch (error) {
             console.error('Error fetching trending movies:', error);
@@ -37,12 +173,21 @@ export const api = {
         }
     },
 
-    searchSemantic: async (query: string, limit: number = 10): Promise<Movie[]> => {
+    searchSemantic: (query: string, limit: number = 10, filters?: SearchFilters): Promise<Movie[]> => {
+        return new Promise((resolve) => {
+            if (pendingSearches.length === 0) setTimeout(flushSearches, 0);
+            pendingSearches.push({ query, limit, filters, resolve });
+        });
+    },
+
+    // Title prefix/typo matches from the in-memory index; never runs the embedding model.
+    // 'hybrid' fills the remaining slots with semantic hits (that part does encode the query).
+    autocomplete: async (query: string, limit: number = 8, mode: 'lexical' | 'hybrid' = 'lexical'): Promise<Movie[]> => {
         try {
-            const response = await axios.post(`${API_BASE_URL}/search/semantic`, { query, limit });
+            const response = await axios.get(`${API_BASE_URL}/search/autocomplete`, { params: { q: query, limit, mode } });
             return response.data.results || [];
         } catch (error) {
-            console.error('Error performing semantic search:', error);
+            console.error('Error fetching autocomplete results:', error);
             return [];
         }
     },
@@ -57,6 +202,28 @@ export const api = {
         }
     },
 
+    // Many movies in one request (one vectorized take on the server); unknown ids are skipped
+    getMovies: async (vectorIds: number[], fields: 'card' | 'full' = 'full'): Promise<Movie[]> => {
+        if (vectorIds.length === 0) return [];
+        try {
+            const response = await axios.post(`${API_BASE_URL}/movies/batch`, { vector_ids: vectorIds, fields });
+            return response.data.results || [];
+        } catch (error) {
+            console.error('Error fetching movies:', error);
+            return [];
+        }
+    },
+
+    getSimilarMovies: async (vectorId: number, limit: number = 12): Promise<Movie[]> => {
+        try {
+            const response = await axios.get(`${API_BASE_URL}/movies/${vectorId}/similar?limit=${limit}`);
+            return response.data.results || [];
+        } catch (error) {
+            console.error(`Error fetching movies similar to ${vectorId}:`, error);
+            return [];
+        }
+    },
+
     getGalaxyData: async (
         limit: number = 20000,
         regionX?: number,
@@ -80,6 +247,68 @@ export const api = {
         }
     },
 
+    getGalaxyView: async (camera: GalaxyCamera, limit: number = 5000, cursor: string | null = null): Promise<GalaxyView | null> => {
+        try {
+            const [camX, camY, camZ] = camera.position;
+            const [dirX, dirY, dirZ] = camera.direction;
+            const params: Record<string, number | string> = {
+                limit,
+                cam_x: camX, cam_y: camY, cam_z: camZ,
+                dir_x: dirX, dir_y: dirY, dir_z: dirZ,
+                fov: camera.fov, aspect: camera.aspect, far: camera.far,
+            };
+            if (cursor) params.cursor = cursor;
+            const response = await axios.get(`${API_BASE_URL}/galaxy`, { params });
+            return { stars: response.data.stars || [], cursor: response.data.cursor ?? null, complete: response.data.complete };
+        } catch (error) {
+            console.error('Error fetching galaxy view:', error);
+            return null;
+        }
+    },
+
+    getGalaxyDataBinary: async (
+        limit: number = 20000,
+        regionX?: number,
+        regionY?: number,
+        regionZ?: number,
+        radius?: number
+    ): Promise<GalaxyStarBuffers | null> => {
+        try {
+            const params: Record<string, number | string> = { limit, format: 'binary' };
+            if (regionX !== undefined && regionY !== undefined && regionZ !== undefined && radius !== undefined) {
+                params.region_x = regionX;
+                params.region_y = regionY;
+                params.region_z = regionZ;
+                params.radius = radius;
+            }
+            const response = await axios.get(`${API_BASE_URL}/galaxy`, { params, responseType: 'arraybuffer' });
+            return decodeGalaxyStars(response.data);
+        } catch (error) {
+            console.error('Error fetching binary galaxy data:', error);
+            return null;
+        }
+    },
+
+    getGalaxyTileManifest: async (): Promise<GalaxyTileManifest | null> => {
+        try {
+            const response = await axios.get(`${API_BASE_URL}/galaxy/tiles`);
+            return response.data;
+        } catch (error) {
+            console.error('Error fetching galaxy tile manifest:', error);
+            return null;
+        }
+    },
+
+    getGalaxyTile: async (level: number, x: number, y: number, z: number): Promise<GalaxyTile | null> => {
+        try {
+            const response = await axios.get(`${API_BASE_URL}/galaxy/tiles/${level}/${x}/${y}/${z}`);
+            return response.data;
+        } catch (error) {
+            console.error(`Error fetching galaxy tile ${level}/${x}/${y}/${z}:`, error);
+            return null;
+        }
+    },
+
     getPosterUrl: (path: string | null, size: string = 'w500') => {
         if (!path) return null;
         return `https://image.tmdb.org/t/p/${size}${path}`;